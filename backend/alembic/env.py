@@ -18,10 +18,19 @@ if config.config_file_name is not None:
 target_metadata = Base.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    # search_vector columns and their GIN indexes are managed by hand in
+    # the full_text_search migration; keep autogenerate from dropping them
+    if reflected and compare_to is None and name and "search_vector" in name:
+        return False
+    return True
+
+
 def run_migrations_offline():
     context.configure(
         url=settings.DATABASE_URL,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -41,6 +50,7 @@ def run_migrations_online():
         context.configure(
             connection=connection,
             target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
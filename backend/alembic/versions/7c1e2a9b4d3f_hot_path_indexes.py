@@ -0,0 +1,44 @@
+"""hot path indexes
+
+Revision ID: 7c1e2a9b4d3f
+Revises: 04593d98ecc8
+Create Date: 2026-10-18 09:12:31.402118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1e2a9b4d3f'
+down_revision = '04593d98ecc8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Membership becomes unique per (project, user); keep the oldest row of
+    # any duplicates so the unique index can be built.
+    op.execute(
+        "DELETE FROM project_members WHERE id NOT IN ("
+        "SELECT MIN(id) FROM project_members GROUP BY project_id, user_id)"
+    )
+    op.create_index('ix_project_members_project_id_user_id', 'project_members', ['project_id', 'user_id'], unique=True)
+    op.create_index('ix_project_members_user_id', 'project_members', ['user_id'], unique=False)
+    op.create_index('ix_issues_project_id_status', 'issues', ['project_id', 'status'], unique=False)
+    op.create_index('ix_issues_project_id_created_at', 'issues', ['project_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_issues_project_id_priority', 'issues', ['project_id', 'priority', 'id'], unique=False)
+    op.create_index('ix_issues_assignee_id', 'issues', ['assignee_id'], unique=False)
+    op.create_index('ix_comments_issue_id_created_at', 'comments', ['issue_id', 'created_at'], unique=False)
+    op.create_index('ix_attachments_issue_id', 'attachments', ['issue_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_attachments_issue_id', table_name='attachments')
+    op.drop_index('ix_comments_issue_id_created_at', table_name='comments')
+    op.drop_index('ix_issues_assignee_id', table_name='issues')
+    op.drop_index('ix_issues_project_id_priority', table_name='issues')
+    op.drop_index('ix_issues_project_id_created_at', table_name='issues')
+    op.drop_index('ix_issues_project_id_status', table_name='issues')
+    op.drop_index('ix_project_members_user_id', table_name='project_members')
+    op.drop_index('ix_project_members_project_id_user_id', table_name='project_members')
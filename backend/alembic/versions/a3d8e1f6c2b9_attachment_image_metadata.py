@@ -0,0 +1,32 @@
+"""attachment image metadata
+
+Revision ID: a3d8e1f6c2b9
+Revises: f1c9a5e2b7d4
+Create Date: 2026-10-18 16:48:39.514062
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3d8e1f6c2b9'
+down_revision = 'f1c9a5e2b7d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('attachments', sa.Column('mime_type', sa.String(), nullable=True))
+    op.add_column('attachments', sa.Column('width', sa.Integer(), nullable=True))
+    op.add_column('attachments', sa.Column('height', sa.Integer(), nullable=True))
+    op.add_column('attachments', sa.Column('thumbnail_key', sa.String(), nullable=True))
+    op.add_column('attachments', sa.Column('thumbnail_url', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('attachments', 'thumbnail_url')
+    op.drop_column('attachments', 'thumbnail_key')
+    op.drop_column('attachments', 'height')
+    op.drop_column('attachments', 'width')
+    op.drop_column('attachments', 'mime_type')
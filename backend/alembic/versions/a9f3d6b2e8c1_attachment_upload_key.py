@@ -0,0 +1,26 @@
+"""attachment upload key
+
+Revision ID: a9f3d6b2e8c1
+Revises: e5a9c2f7b1d3
+Create Date: 2026-10-18 23:12:47.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9f3d6b2e8c1'
+down_revision = 'e5a9c2f7b1d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('attachments', sa.Column('upload_key', sa.String(), nullable=True))
+    op.create_index('ix_attachments_issue_id_upload_key', 'attachments', ['issue_id', 'upload_key'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_attachments_issue_id_upload_key', table_name='attachments')
+    op.drop_column('attachments', 'upload_key')
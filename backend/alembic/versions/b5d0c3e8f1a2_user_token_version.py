@@ -0,0 +1,24 @@
+"""user token version
+
+Revision ID: b5d0c3e8f1a2
+Revises: 7c1e2a9b4d3f
+Create Date: 2026-10-18 11:40:05.918377
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5d0c3e8f1a2'
+down_revision = '7c1e2a9b4d3f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'token_version')
@@ -0,0 +1,46 @@
+"""full text search
+
+Revision ID: b7e2d9a4c1f8
+Revises: a3d8e1f6c2b9
+Create Date: 2026-10-18 17:32:10.604419
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2d9a4c1f8'
+down_revision = 'a3d8e1f6c2b9'
+branch_labels = None
+depends_on = None
+
+
+# Generated tsvector columns backing app.crud.select_search_postgres. They
+# are not mapped on the models, so other databases simply skip them.
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name != 'postgresql':
+        return
+    op.execute(
+        "ALTER TABLE issues ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+        ") STORED"
+    )
+    op.execute("CREATE INDEX ix_issues_search_vector ON issues USING gin (search_vector)")
+    op.execute(
+        "ALTER TABLE comments ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "to_tsvector('english', coalesce(content, ''))"
+        ") STORED"
+    )
+    op.execute("CREATE INDEX ix_comments_search_vector ON comments USING gin (search_vector)")
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name != 'postgresql':
+        return
+    op.execute("DROP INDEX ix_comments_search_vector")
+    op.execute("ALTER TABLE comments DROP COLUMN search_vector")
+    op.execute("DROP INDEX ix_issues_search_vector")
+    op.execute("ALTER TABLE issues DROP COLUMN search_vector")
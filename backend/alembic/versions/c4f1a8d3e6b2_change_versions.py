@@ -0,0 +1,32 @@
+"""change versions
+
+Revision ID: c4f1a8d3e6b2
+Revises: b7e2d9a4c1f8
+Create Date: 2026-10-18 18:05:27.118342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4f1a8d3e6b2'
+down_revision = 'b7e2d9a4c1f8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'projects',
+        sa.Column('change_version', sa.BigInteger(), server_default='0', nullable=False),
+    )
+    op.add_column(
+        'issues',
+        sa.Column('change_version', sa.BigInteger(), server_default='0', nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('issues', 'change_version')
+    op.drop_column('projects', 'change_version')
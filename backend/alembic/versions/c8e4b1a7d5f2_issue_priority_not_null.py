@@ -0,0 +1,25 @@
+"""issue priority not null
+
+Revision ID: c8e4b1a7d5f2
+Revises: a9f3d6b2e8c1
+Create Date: 2026-10-18 23:58:06.381740
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8e4b1a7d5f2'
+down_revision = 'a9f3d6b2e8c1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("UPDATE issues SET priority = 3 WHERE priority IS NULL")
+    op.alter_column('issues', 'priority', existing_type=sa.Integer(), nullable=False, server_default='3')
+
+
+def downgrade() -> None:
+    op.alter_column('issues', 'priority', existing_type=sa.Integer(), nullable=True, server_default=None)
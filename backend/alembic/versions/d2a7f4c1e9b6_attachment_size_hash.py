@@ -0,0 +1,26 @@
+"""attachment size and content hash
+
+Revision ID: d2a7f4c1e9b6
+Revises: b5d0c3e8f1a2
+Create Date: 2026-10-18 14:02:31.447120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2a7f4c1e9b6'
+down_revision = 'b5d0c3e8f1a2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('attachments', sa.Column('size', sa.BigInteger(), nullable=True))
+    op.add_column('attachments', sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('attachments', 'content_hash')
+    op.drop_column('attachments', 'size')
@@ -0,0 +1,26 @@
+"""comment thread indexes
+
+Revision ID: e5a9c2f7b1d3
+Revises: c4f1a8d3e6b2
+Create Date: 2026-10-18 21:40:12.583907
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a9c2f7b1d3'
+down_revision = 'c4f1a8d3e6b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_comments_issue_id_parent_id', 'comments', ['issue_id', 'parent_id', 'id'], unique=False)
+    op.create_index('ix_comments_parent_id', 'comments', ['parent_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_comments_parent_id', table_name='comments')
+    op.drop_index('ix_comments_issue_id_parent_id', table_name='comments')
@@ -0,0 +1,32 @@
+"""storage blobs
+
+Revision ID: e8b3c6d0a4f7
+Revises: d2a7f4c1e9b6
+Create Date: 2026-10-18 15:21:47.203518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8b3c6d0a4f7'
+down_revision = 'd2a7f4c1e9b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('storage_blobs',
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('content_hash'),
+    sa.UniqueConstraint('key')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('storage_blobs')
@@ -0,0 +1,34 @@
+"""storage deletions outbox
+
+Revision ID: f1c9a5e2b7d4
+Revises: e8b3c6d0a4f7
+Create Date: 2026-10-18 16:05:12.880231
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c9a5e2b7d4'
+down_revision = 'e8b3c6d0a4f7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('storage_deletions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_storage_deletions_next_attempt_at', 'storage_deletions', ['next_attempt_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_storage_deletions_next_attempt_at', table_name='storage_deletions')
+    op.drop_table('storage_deletions')
@@ -0,0 +1,379 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from app import crud_async, events, models, schemas
+from app.api.deps import (
+    CommentAccess,
+    IssueAccess,
+    ProjectAccess,
+    get_current_user_async,
+    require_comment_access_async,
+    require_issue_access_async,
+    require_project_access_async,
+)
+from app.db.session import get_async_db
+from app.utils.etags import etag_headers, if_none_match, not_modified, params_digest, weak_etag
+from app.utils.pagination import InvalidCursor, decode_cursor, encode_cursor
+from app.utils.response_cache import (
+    PROJECTS_SCOPE,
+    USERS_SCOPE,
+    project_scope,
+    response_cache,
+    user_scope,
+)
+
+# AsyncSession versions of the read-heavy and board routes, mounted by
+# app.main ahead of the sync routers when DB_ASYNC is enabled. Routes
+# without an async version here keep being served by the sync routers.
+# Board events and cache invalidations published from these handlers run
+# on the event loop; broker.publish only queues them (see PostgresBroker).
+
+projects_router = APIRouter(prefix="/projects", tags=["Projects"])
+issues_router = APIRouter(prefix="/issues", tags=["Issues"])
+comments_router = APIRouter(prefix="/comments", tags=["Comments"])
+users_router = APIRouter(prefix="/users", tags=["Users"])
+
+
+# ---------- PROJECTS ----------
+
+@projects_router.post("/", response_model=schemas.ProjectOut)
+async def create_project_async(
+    payload: schemas.ProjectCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async),
+):
+    return await crud_async.create_project(
+        db,
+        name=payload.name,
+        description=payload.description,
+        creator_id=current_user.id,
+        creator_role=current_user.role,
+    )
+
+
+@projects_router.get("/", response_model=List[schemas.ProjectOut])
+async def list_projects_async(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async),
+):
+    key = response_cache.key("projects", [user_scope(current_user.id), PROJECTS_SCOPE])
+    cached = response_cache.response(key)
+    if cached is not None:
+        return cached
+
+    projects = await crud_async.list_projects_for_user(db, current_user.id)
+    return response_cache.render(key, List[schemas.ProjectOut], projects)
+
+
+@projects_router.get("/{project_id}/board", response_model=schemas.BoardOut)
+async def get_board_async(
+    project_id: int,
+    per_column: Optional[int] = Query(None, ge=1, le=500),
+    access: ProjectAccess = Depends(require_project_access_async()),
+    db: AsyncSession = Depends(get_async_db),
+):
+    key = response_cache.key("board", [project_scope(project_id)], per_column)
+    cached = response_cache.response(key)
+    if cached is not None:
+        return cached
+
+    board = {
+        "project_id": project_id,
+        "columns": await crud_async.get_board(db, project_id, per_column),
+    }
+    return response_cache.render(key, schemas.BoardOut, board)
+
+
+@projects_router.get("/{project_id}/members", response_model=List[schemas.ProjectMemberOut])
+async def list_project_members_async(
+    project_id: int,
+    access: ProjectAccess = Depends(require_project_access_async()),
+    db: AsyncSession = Depends(get_async_db),
+):
+    key = response_cache.key("members", [project_scope(project_id), USERS_SCOPE])
+    cached = response_cache.response(key)
+    if cached is not None:
+        return cached
+
+    result = await db.execute(
+        select(models.ProjectMember.role, models.User)
+        .join(models.User, models.ProjectMember.user_id == models.User.id)
+        .where(models.ProjectMember.project_id == project_id)
+    )
+    members = [
+        schemas.ProjectMemberOut(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            role=role,
+        )
+        for role, user in result.all()
+    ]
+    return response_cache.render(key, List[schemas.ProjectMemberOut], members)
+
+
+# ---------- ISSUES ----------
+
+@issues_router.post("/projects/{project_id}", response_model=schemas.IssueOut)
+async def create_issue_async(
+    project_id: int,
+    payload: schemas.IssueCreate,
+    access: ProjectAccess = Depends(require_project_access_async()),
+    db: AsyncSession = Depends(get_async_db),
+):
+    if payload.assignee_id:
+        if not await crud_async.get_user(db, payload.assignee_id):
+            raise HTTPException(status_code=400, detail="Assignee user not found")
+
+    issue = await crud_async.create_issue(
+        db,
+        project_id=project_id,
+        title=payload.title,
+        description=payload.description,
+        type_=payload.type,
+        priority=payload.priority,
+        assignee_id=payload.assignee_id,
+    )
+    events.issue_created(issue)
+    return issue
+
+
+@issues_router.get("/projects/{project_id}", response_model=schemas.IssuePage)
+async def list_issues_async(
+    project_id: int,
+    request: Request,
+    status: Optional[schemas.IssueStatusEnum] = None,
+    type: Optional[schemas.IssueTypeEnum] = None,
+    assignee_id: Optional[int] = None,
+    min_priority: Optional[int] = None,
+    max_priority: Optional[int] = None,
+    sort: schemas.IssueSortEnum = schemas.IssueSortEnum.created_at,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    access: ProjectAccess = Depends(require_project_access_async()),
+    db: AsyncSession = Depends(get_async_db),
+):
+    params = (status, type, assignee_id, min_priority, max_priority, sort, cursor, limit)
+    key = response_cache.key("issues", [project_scope(project_id)], *params)
+    cached = response_cache.response(key)
+    if cached is not None:
+        etag = cached.headers["etag"]
+    else:
+        version = await crud_async.get_project_version(db, project_id)
+        etag = weak_etag("issues", project_id, version, params_digest(*params))
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    if cached is not None:
+        return cached
+
+    try:
+        after = decode_cursor(cursor, sort.value) if cursor else None
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    issues = await crud_async.list_issues_for_project(
+        db,
+        project_id,
+        status=models.IssueStatus(status.value) if status else None,
+        type_=models.IssueTypeEnum(type.value) if type else None,
+        assignee_id=assignee_id,
+        min_priority=min_priority,
+        max_priority=max_priority,
+        sort=sort.value,
+        after=after,
+        limit=limit + 1,
+    )
+
+    next_cursor = None
+    if len(issues) > limit:
+        issues = issues[:limit]
+        last = issues[-1]
+        next_cursor = encode_cursor(getattr(last, sort.value.lstrip("-")), last.id, sort.value)
+
+    page = {"items": issues, "next_cursor": next_cursor}
+    return response_cache.render(key, schemas.IssuePage, page, etag_headers(etag))
+
+
+@issues_router.get("/{issue_id}", response_model=schemas.IssueDetail)
+async def get_issue_async(
+    issue_id: int,
+    access: IssueAccess = Depends(require_issue_access_async()),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # Nothing may lazy load under AsyncSession; see crud.select_issue_detail
+    return await crud_async.get_issue_detail(db, issue_id)
+
+
+@issues_router.patch("/{issue_id}/status", response_model=schemas.IssueOut)
+async def update_issue_status_async(
+    issue_id: int,
+    status: schemas.IssueStatusEnum,
+    access: IssueAccess = Depends(require_issue_access_async()),
+    db: AsyncSession = Depends(get_async_db),
+):
+    issue = access.issue
+    from_status = issue.status
+    issue = await crud_async.update_issue_status(db, issue, models.IssueStatus(status.value))
+    if issue.status != from_status:
+        events.issue_moved(issue, from_status)
+    return issue
+
+
+# ---------- COMMENTS ----------
+
+@comments_router.post("/issues/{issue_id}", response_model=schemas.CommentOut)
+async def post_comment_async(
+    issue_id: int,
+    payload: schemas.CommentCreate,
+    access: IssueAccess = Depends(require_issue_access_async()),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async),
+):
+    if payload.parent_id:
+        parent = await db.execute(
+            select(models.Comment.id).where(
+                models.Comment.id == payload.parent_id,
+                models.Comment.issue_id == issue_id,
+            )
+        )
+        if parent.first() is None:
+            raise HTTPException(status_code=400, detail="Parent comment not found")
+
+    comment = await crud_async.create_comment(
+        db,
+        issue_id=issue_id,
+        author_id=current_user.id,
+        content=payload.content,
+        parent_id=payload.parent_id,
+    )
+    events.comment_added(access.issue.project_id, comment)
+    return comment
+
+
+@comments_router.get("/issues/{issue_id}", response_model=List[schemas.CommentOut])
+async def list_comments_async(
+    issue_id: int,
+    request: Request,
+    response: Response,
+    access: IssueAccess = Depends(require_issue_access_async()),
+    db: AsyncSession = Depends(get_async_db),
+):
+    etag = weak_etag("comments", issue_id, access.issue.change_version)
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    response.headers.update(etag_headers(etag))
+    return await crud_async.list_comments(db, issue_id)
+
+
+def _after_id(cursor: Optional[str]) -> Optional[int]:
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor)[1]
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@comments_router.get("/issues/{issue_id}/tree", response_model=schemas.CommentThreadPage)
+async def list_comment_threads_async(
+    issue_id: int,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    max_depth: int = Query(3, ge=0, le=20),
+    replies: int = Query(5, ge=0, le=100),
+    access: IssueAccess = Depends(require_issue_access_async()),
+    db: AsyncSession = Depends(get_async_db),
+):
+    after_id = _after_id(cursor)
+    etag = weak_etag(
+        "threads",
+        issue_id,
+        access.issue.change_version,
+        after_id or 0,
+        limit,
+        max_depth,
+        replies,
+    )
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    response.headers.update(etag_headers(etag))
+    return await crud_async.get_comment_tree(
+        db,
+        issue_id,
+        after_id=after_id,
+        limit=limit,
+        max_depth=max_depth,
+        replies=replies,
+    )
+
+
+@comments_router.get("/{comment_id}/replies", response_model=schemas.CommentThreadPage)
+async def list_comment_replies_async(
+    comment_id: int,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    max_depth: int = Query(3, ge=0, le=20),
+    replies: int = Query(5, ge=0, le=100),
+    access: CommentAccess = Depends(require_comment_access_async()),
+    db: AsyncSession = Depends(get_async_db),
+):
+    after_id = _after_id(cursor)
+    etag = weak_etag(
+        "replies",
+        comment_id,
+        access.issue.change_version,
+        after_id or 0,
+        limit,
+        max_depth,
+        replies,
+    )
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    response.headers.update(etag_headers(etag))
+    return await crud_async.get_comment_tree(
+        db,
+        access.issue.id,
+        parent_id=comment_id,
+        after_id=after_id,
+        limit=limit,
+        max_depth=max_depth,
+        replies=replies,
+    )
+
+
+@comments_router.delete("/{comment_id}")
+async def delete_comment_async(
+    comment_id: int,
+    access: CommentAccess = Depends(require_comment_access_async()),
+    db: AsyncSession = Depends(get_async_db),
+):
+    comment, issue = access.comment, access.issue
+    await db.delete(comment)
+    await db.commit()
+    events.comment_deleted(issue.project_id, issue.id, comment_id)
+    return {"ok": True}
+
+
+# ---------- USERS ----------
+
+@users_router.get("/", response_model=List[schemas.UserOut])
+async def list_users_async(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(get_current_user_async),
+):
+    key = response_cache.key("users", [USERS_SCOPE])
+    cached = response_cache.response(key)
+    if cached is not None:
+        return cached
+
+    users = await crud_async.list_users(db)
+    return response_cache.render(key, List[schemas.UserOut], users)
+
+
+routers = [projects_router, issues_router, comments_router, users_router]
@@ -1,54 +1,267 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+import mimetypes
+import os
+import tempfile
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, UploadFile, File
+from fastapi.responses import FileResponse, Response
+from jose import JWTError
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional
 
-from app import models, schemas
-from app.api.deps import get_db, get_current_user
-from app.utils.storage import upload_fileobj_to_storage, delete_file_from_storage
+from app import crud, models, schemas, events
+from app.api.deps import (
+    AttachmentAccess,
+    IssueAccess,
+    get_db,
+    authorize_issue,
+    get_current_user,
+    require_attachment_access,
+    require_issue_access,
+)
+from app.core.config import settings
+from app.core.security import create_upload_token, decode_upload_token
+from app.utils.etags import etag_headers, if_none_match, not_modified, weak_etag
+from app.utils.storage import (
+    LocalStorage,
+    UploadTooLarge,
+    blob_key,
+    get_storage,
+    hash_fileobj,
+    new_object_key,
+)
+from app.utils.thumbnails import generate_thumbnail
 
 router = APIRouter(prefix="/attachments", tags=["Attachments"])
 
 
+def _record_attachment(
+    db: Session,
+    issue: models.Issue,
+    filename: str,
+    key: str,
+    size: int,
+    content_hash: str,
+    background_tasks: BackgroundTasks,
+    content_type: Optional[str] = None,
+    write=None,
+) -> models.Attachment:
+    """
+    Create an Attachment referencing the blob for `content_hash`. When
+    this is the first copy, `key` becomes the blob's object and `write`
+    (if given) stores it. The blob row is committed first, so the
+    deletion worker treats the key as live during the upload, and no
+    transaction is held open while it runs. When the content already
+    exists the write is skipped and a separately uploaded `key` is
+    discarded, unless other attachments still use it. Without `write`,
+    `key` is a direct upload and is kept as the row's upload_key so
+    completing it again finds this row. Image
+    metadata and thumbnails are filled in afterwards by a background
+    task.
+    """
+    shared = write is None and crud.attachment_key_in_use(db, key)
+    if shared and crud.get_blob(db, content_hash) is None:
+        # An object from before deduplication that other attachments use;
+        # a blob adopting it would delete it once its own references went
+        stored_key = key
+    else:
+        blob, created = crud.reference_blob(db, content_hash, size, key)
+        if created and write is not None:
+            db.commit()
+            try:
+                write()
+            except Exception:
+                released = crud.release_blob(db, key)
+                if released is not None:
+                    crud.enqueue_storage_deletion(db, released)
+                db.commit()
+                raise
+        stored_key = blob.key
+
+    attachment = models.Attachment(
+        issue_id=issue.id,
+        filename=filename,
+        s3_key=stored_key,
+        upload_key=key if write is None else None,
+        url=get_storage().url(stored_key),
+        size=size,
+        content_hash=content_hash,
+        mime_type=(
+            content_type
+            if content_type and content_type != "application/octet-stream"
+            else mimetypes.guess_type(filename)[0]
+        ),
+    )
+    db.add(attachment)
+    if stored_key != key and write is None and not shared:
+        crud.enqueue_storage_deletion(db, key)
+    db.commit()
+    db.refresh(attachment)
+    events.attachment_added(issue.project_id, attachment)
+    background_tasks.add_task(generate_thumbnail, attachment.id, db.get_bind())
+    return attachment
+
+
+def _find_upload(db: Session, issue_id: int, key: str) -> Optional[models.Attachment]:
+    return (
+        db.query(models.Attachment)
+        .filter(
+            models.Attachment.issue_id == issue_id,
+            or_(models.Attachment.upload_key == key, models.Attachment.s3_key == key),
+        )
+        .first()
+    )
+
+
+def _register_stored_object(
+    db: Session,
+    issue: models.Issue,
+    filename: str,
+    key: str,
+    background_tasks: BackgroundTasks,
+) -> models.Attachment:
+    """
+    Create the Attachment row for an object a client uploaded directly,
+    after checking it exists and measuring it ourselves. Registering the
+    same key again returns the existing row.
+    """
+    existing = _find_upload(db, issue.id, key)
+    if existing:
+        return existing
+
+    storage = get_storage()
+    try:
+        size, content_hash = storage.digest(key, settings.UPLOAD_MAX_BYTES)
+    except FileNotFoundError:
+        raise HTTPException(status_code=400, detail="Uploaded object not found")
+    except UploadTooLarge as exc:
+        crud.enqueue_storage_deletion(db, key)
+        db.commit()
+        raise HTTPException(status_code=413, detail=str(exc))
+
+    try:
+        return _record_attachment(db, issue, filename, key, size, content_hash, background_tasks)
+    except IntegrityError:
+        # A concurrent request registered the same key first
+        db.rollback()
+        existing = _find_upload(db, issue.id, key)
+        if existing is None:
+            raise
+        return existing
+
+
 @router.post(
     "/issues/{issue_id}",
     response_model=schemas.AttachmentOut,
 )
 def upload_attachment(
     issue_id: int,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
+    access: IssueAccess = Depends(require_issue_access()),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
 ):
-    issue = db.query(models.Issue).filter_by(id=issue_id).first()
-    if not issue:
-        raise HTTPException(status_code=404, detail="Issue not found")
+    issue = access.issue
 
-    member = (
-        db.query(models.ProjectMember)
-        .filter_by(project_id=issue.project_id, user_id=current_user.id)
-        .first()
-    )
-    if not member:
-        raise HTTPException(status_code=403, detail="Not a member")
+    try:
+        size, content_hash = hash_fileobj(file.file, settings.UPLOAD_MAX_BYTES)
+    except UploadTooLarge as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
+
+    key = blob_key(content_hash)
+
+    def write():
+        get_storage().put(key, file.file, file.content_type, settings.UPLOAD_MAX_BYTES)
 
     try:
-        key, url = upload_fileobj_to_storage(file.file, file.filename)
+        return _record_attachment(
+            db,
+            issue,
+            file.filename,
+            key,
+            size,
+            content_hash,
+            background_tasks,
+            file.content_type,
+            write,
+        )
     except RuntimeError as exc:
         raise HTTPException(status_code=500, detail=str(exc))
+    except HTTPException:
+        raise
     except Exception:
         raise HTTPException(status_code=500, detail="File upload failed")
 
-    attachment = models.Attachment(
-        issue_id=issue_id,
-        filename=file.filename,
-        s3_key=key,
-        url=url,
+
+@router.post(
+    "/issues/{issue_id}/upload-url",
+    response_model=schemas.AttachmentUploadTicket,
+)
+def create_upload_url(
+    issue_id: int,
+    payload: schemas.AttachmentUploadRequest,
+    access: IssueAccess = Depends(require_issue_access()),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Issue a short-lived URL the client uploads to directly, plus a token
+    scoped to this user, issue and key for POST /attachments/complete.
+    """
+    if payload.size is not None and payload.size > settings.UPLOAD_MAX_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File exceeds {settings.UPLOAD_MAX_BYTES} bytes",
+        )
+
+    expires_in = settings.UPLOAD_URL_EXPIRE_SECONDS
+    key = new_object_key(payload.filename)
+    try:
+        target = get_storage().presign_upload(key, expires_in, payload.content_type)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=500, detail=str(exc))
+
+    token = create_upload_token(
+        {
+            "uid": current_user.id,
+            "iid": issue_id,
+            "key": key,
+            "filename": payload.filename,
+        },
+        expires_in,
     )
-    db.add(attachment)
-    db.commit()
-    db.refresh(attachment)
+    return {
+        "key": key,
+        "upload_url": target.url,
+        "method": target.method,
+        "headers": target.headers,
+        "token": token,
+        "expires_in": expires_in,
+    }
 
-    return attachment
+
+@router.post(
+    "/complete",
+    response_model=schemas.AttachmentOut,
+)
+def complete_upload(
+    payload: schemas.AttachmentUploadComplete,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    try:
+        claims = decode_upload_token(payload.token)
+    except JWTError:
+        raise HTTPException(status_code=400, detail="Invalid upload token")
+    if claims.get("uid") != current_user.id:
+        raise HTTPException(status_code=403, detail="Upload token belongs to another user")
+
+    issue = authorize_issue(db, claims["iid"], current_user.id).issue
+    return _register_stored_object(
+        db, issue, claims["filename"], claims["key"], background_tasks
+    )
 
 
 @router.post(
@@ -57,36 +270,21 @@ def upload_attachment(
 )
 def register_attachment(
     payload: schemas.AttachmentCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
     """
     Register an already-uploaded file (Supabase/S3).
+    The object must exist under attachments/; its URL, size and hash are
+    taken from storage, not from the request.
     """
-    issue = db.query(models.Issue).filter_by(id=payload.issue_id).first()
-    if not issue:
-        raise HTTPException(status_code=404, detail="Issue not found")
-
-    member = (
-        db.query(models.ProjectMember)
-        .filter_by(project_id=issue.project_id, user_id=current_user.id)
-        .first()
-    )
-    if not member:
-        raise HTTPException(status_code=403, detail="Not a member")
-
-    attachment = models.Attachment(
-        issue_id=payload.issue_id,
-        filename=payload.filename,
-        s3_key=payload.key,
-        url=payload.url,
-    )
+    issue = authorize_issue(db, payload.issue_id, current_user.id).issue
 
-    db.add(attachment)
-    db.commit()
-    db.refresh(attachment)
+    if not payload.key.startswith("attachments/"):
+        raise HTTPException(status_code=400, detail="Invalid storage key")
 
-    return attachment
+    return _register_stored_object(db, issue, payload.filename, payload.key, background_tasks)
 
 
 @router.get(
@@ -95,20 +293,17 @@ def register_attachment(
 )
 def list_attachments(
     issue_id: int,
+    request: Request,
+    response: Response,
+    access: IssueAccess = Depends(require_issue_access()),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
 ):
-    issue = db.query(models.Issue).filter_by(id=issue_id).first()
-    if not issue:
-        raise HTTPException(status_code=404, detail="Issue not found")
+    issue = access.issue
 
-    member = (
-        db.query(models.ProjectMember)
-        .filter_by(project_id=issue.project_id, user_id=current_user.id)
-        .first()
-    )
-    if not member:
-        raise HTTPException(status_code=403, detail="Not a member")
+    etag = weak_etag("attachments", issue.id, issue.change_version)
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    response.headers.update(etag_headers(etag))
 
     return (
         db.query(models.Attachment)
@@ -120,30 +315,60 @@ def list_attachments(
 @router.delete("/{attachment_id}")
 def delete_attachment(
     attachment_id: int,
+    access: AttachmentAccess = Depends(require_attachment_access()),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
 ):
-    attachment = db.query(models.Attachment).filter_by(id=attachment_id).first()
-    if not attachment:
-        raise HTTPException(status_code=404, detail="Attachment not found")
+    attachment, issue = access.attachment, access.issue
 
-    issue = db.query(models.Issue).filter_by(id=attachment.issue_id).first()
-    if not issue:
-        raise HTTPException(status_code=404, detail="Issue not found")
+    # The object is released and queued for deletion on flush, see
+    # app.utils.outbox
+    db.delete(attachment)
+    db.commit()
+    events.attachment_deleted(issue.project_id, issue.id, attachment_id)
+    return {"ok": True}
 
-    member = (
-        db.query(models.ProjectMember)
-        .filter_by(project_id=issue.project_id, user_id=current_user.id)
-        .first()
-    )
-    if not member:
-        raise HTTPException(status_code=403, detail="Not a member")
 
-    try:
-        delete_file_from_storage(attachment.s3_key)
-    except Exception:
-        pass
+# ---------- LOCAL STORAGE FILES ----------
 
-    db.delete(attachment)
-    db.commit()
+def _local_storage(key: str, expires: Optional[int], sig: str, method: str) -> LocalStorage:
+    storage = get_storage()
+    if not isinstance(storage, LocalStorage) or not storage.verify(key, expires, sig, method):
+        raise HTTPException(status_code=404, detail="File not found")
+    return storage
+
+
+@router.get("/files/{key:path}")
+def download_file(key: str, sig: str, expires: Optional[int] = None):
+    """
+    Serve a file from the local storage backend. Access is granted by the
+    HMAC in the URL, like a public or signed bucket URL.
+    """
+    storage = _local_storage(key, expires, sig, "GET")
+
+    path = storage.path(key)
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="File not found")
+    return FileResponse(path)
+
+
+@router.put("/files/{key:path}")
+async def upload_file(key: str, sig: str, expires: int, request: Request):
+    """
+    Presigned upload target for the local storage backend. The body is
+    spooled to disk as it arrives, then moved into place.
+    """
+    storage = _local_storage(key, expires, sig, "PUT")
+    max_bytes = settings.UPLOAD_MAX_BYTES
+
+    with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as spool:
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(status_code=413, detail=f"File exceeds {max_bytes} bytes")
+            spool.write(chunk)
+        spool.seek(0)
+        await run_in_threadpool(
+            storage.put, key, spool, request.headers.get("content-type"), max_bytes
+        )
     return {"ok": True}
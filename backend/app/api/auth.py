@@ -1,42 +1,87 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.db.session import get_db
-from app import schemas, crud
+from app import models, schemas, crud
+from app.api.deps import get_current_user
 from app.core import security
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
+# Auth handlers are async so bcrypt work waits on the dedicated password
+# pool instead of holding a request thread; DB calls go to the threadpool.
+
+
+def _busy():
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is busy, retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
 
 @router.post("/register", response_model=schemas.UserOut)
-def register(user_in: schemas.UserCreate, db: Session = Depends(get_db)):
-    existing = crud.get_user_by_email(db, user_in.email)
+async def register(user_in: schemas.UserCreate, db: Session = Depends(get_db)):
+    existing = await run_in_threadpool(crud.get_user_by_email, db, user_in.email)
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    user = crud.create_user(
+    try:
+        hashed_password = await security.hash_password_async(user_in.password)
+    except security.PasswordHasherBusy:
+        raise _busy()
+
+    user = await run_in_threadpool(
+        crud.create_user,
         db,
         email=user_in.email,
-        password=user_in.password,
         full_name=user_in.full_name,
+        hashed_password=hashed_password,
     )
     return user
 
 
 @router.post("/login", response_model=schemas.Token)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db),
 ):
-    user = crud.get_user_by_email(db, form_data.username)
-    if not user or not security.verify_password(
-        form_data.password, user.hashed_password
-    ):
+    user = await run_in_threadpool(crud.get_user_by_email, db, form_data.username)
+    verified, new_hash = False, None
+    if user:
+        try:
+            verified, new_hash = await security.verify_and_update_password(
+                form_data.password, user.hashed_password
+            )
+        except security.PasswordHasherBusy:
+            raise _busy()
+
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect credentials",
         )
 
-    token = security.create_access_token(subject=str(user.id))
-    return {"access_token": token, "token_type": "bearer"}
\ No newline at end of file
+    if new_hash:
+        await run_in_threadpool(crud.update_password_hash, db, user, new_hash)
+
+    token = security.create_access_token(
+        subject=str(user.id),
+        claims={"role": user.role.value, "ver": user.token_version or 0},
+    )
+    return {"access_token": token, "token_type": "bearer"}
+
+
+@router.post("/logout-all")
+def logout_all(
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Revoke every token issued to the current user.
+    """
+    user = db.query(models.User).filter_by(id=current_user.id).first()
+    crud.revoke_user_tokens(db, user)
+    return {"ok": True}
\ No newline at end of file
@@ -1,10 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
-from app import models, schemas
-from app.api.deps import get_current_user
+from app import models, schemas, crud, events
+from app.api.deps import (
+    CommentAccess,
+    IssueAccess,
+    get_current_user,
+    require_comment_access,
+    require_issue_access,
+)
 from app.db.session import get_db
+from app.utils.etags import etag_headers, if_none_match, not_modified, weak_etag
+from app.utils.pagination import InvalidCursor, decode_cursor
 
 router = APIRouter(prefix="/comments", tags=["Comments"])
 
@@ -13,18 +21,20 @@ router = APIRouter(prefix="/comments", tags=["Comments"])
 def post_comment(
     issue_id: int,
     payload: schemas.CommentCreate,
+    access: IssueAccess = Depends(require_issue_access()),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
-    issue = db.query(models.Issue).filter_by(id=issue_id).first()
-    if not issue:
-        raise HTTPException(status_code=404, detail="Issue not found")
+    issue = access.issue
 
-    member = db.query(models.ProjectMember).filter_by(
-        project_id=issue.project_id, user_id=current_user.id
-    ).first()
-    if not member:
-        raise HTTPException(status_code=403, detail="Not a member")
+    if payload.parent_id:
+        parent = (
+            db.query(models.Comment.id)
+            .filter_by(id=payload.parent_id, issue_id=issue_id)
+            .first()
+        )
+        if not parent:
+            raise HTTPException(status_code=400, detail="Parent comment not found")
 
     comment = models.Comment(
         issue_id=issue_id,
@@ -35,22 +45,24 @@ def post_comment(
     db.add(comment)
     db.commit()
     db.refresh(comment)
+    events.comment_added(issue.project_id, comment)
     return comment
+
+
 @router.get("/issues/{issue_id}", response_model=List[schemas.CommentOut])
 def list_comments(
     issue_id: int,
+    request: Request,
+    response: Response,
+    access: IssueAccess = Depends(require_issue_access()),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
 ):
-    issue = db.query(models.Issue).filter_by(id=issue_id).first()
-    if not issue:
-        raise HTTPException(status_code=404, detail="Issue not found")
+    issue = access.issue
 
-    member = db.query(models.ProjectMember).filter_by(
-        project_id=issue.project_id, user_id=current_user.id
-    ).first()
-    if not member:
-        raise HTTPException(status_code=403, detail="Not a member")
+    etag = weak_etag("comments", issue.id, issue.change_version)
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    response.headers.update(etag_headers(etag))
 
     return (
         db.query(models.Comment)
@@ -60,26 +72,97 @@ def list_comments(
     )
 
 
-@router.delete("/{comment_id}")
-def delete_comment(
+def _after_id(cursor: Optional[str]) -> Optional[int]:
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor)[1]
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("/issues/{issue_id}/tree", response_model=schemas.CommentThreadPage)
+def list_comment_threads(
+    issue_id: int,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    max_depth: int = Query(3, ge=0, le=20),
+    replies: int = Query(5, ge=0, le=100),
+    access: IssueAccess = Depends(require_issue_access()),
+    db: Session = Depends(get_db),
+):
+    """
+    Top-level comments, `limit` per page, each with up to `replies`
+    replies per comment nested `max_depth` levels deep.
+    """
+    issue = access.issue
+
+    after_id = _after_id(cursor)
+    etag = weak_etag(
+        "threads", issue.id, issue.change_version, after_id or 0, limit, max_depth, replies
+    )
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    response.headers.update(etag_headers(etag))
+
+    return crud.get_comment_tree(
+        db,
+        issue_id,
+        after_id=after_id,
+        limit=limit,
+        max_depth=max_depth,
+        replies=replies,
+    )
+
+
+@router.get("/{comment_id}/replies", response_model=schemas.CommentThreadPage)
+def list_comment_replies(
     comment_id: int,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    max_depth: int = Query(3, ge=0, le=20),
+    replies: int = Query(5, ge=0, le=100),
+    access: CommentAccess = Depends(require_comment_access()),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
 ):
-    comment = db.query(models.Comment).filter_by(id=comment_id).first()
-    if not comment:
-        raise HTTPException(status_code=404, detail="Comment not found")
+    """
+    Direct replies of a comment, paged like the threads of an issue, for
+    expanding what the tree left out.
+    """
+    issue = access.issue
 
-    issue = db.query(models.Issue).filter_by(id=comment.issue_id).first()
-    if not issue:
-        raise HTTPException(status_code=404, detail="Issue not found")
+    after_id = _after_id(cursor)
+    etag = weak_etag(
+        "replies", comment_id, issue.change_version, after_id or 0, limit, max_depth, replies
+    )
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    response.headers.update(etag_headers(etag))
+
+    return crud.get_comment_tree(
+        db,
+        issue.id,
+        parent_id=comment_id,
+        after_id=after_id,
+        limit=limit,
+        max_depth=max_depth,
+        replies=replies,
+    )
 
-    member = db.query(models.ProjectMember).filter_by(
-        project_id=issue.project_id, user_id=current_user.id
-    ).first()
-    if not member:
-        raise HTTPException(status_code=403, detail="Not a member")
+
+@router.delete("/{comment_id}")
+def delete_comment(
+    comment_id: int,
+    access: CommentAccess = Depends(require_comment_access()),
+    db: Session = Depends(get_db),
+):
+    comment, issue = access.comment, access.issue
 
     db.delete(comment)
     db.commit()
+    events.comment_deleted(issue.project_id, issue.id, comment_id)
     return {"ok": True}
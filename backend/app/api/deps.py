@@ -1,50 +1,326 @@
-from fastapi import Depends, HTTPException, status, WebSocket
+from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from typing import NamedTuple, Optional, Tuple
 
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db
+from app.core.config import settings
+from app.core.principals import Principal, principal_cache
 from app.core.security import decode_access_token
-from app import models
+from app.utils.cache import TTLCache
+from app.utils.response_cache import project_scope, response_cache
+from app import crud, crud_async, models
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
+class AuthError(Exception):
+    pass
+
+
+def _decode_token(token: str) -> Tuple[int, int]:
+    try:
+        payload = decode_access_token(token)
+        return int(payload.get("sub")), int(payload.get("ver", 0))
+    except Exception:
+        raise AuthError("Could not validate credentials")
+
+
+def _cache_principal(user: Optional[models.User]) -> Optional[Principal]:
+    if user is None:
+        return None
+    principal = Principal.from_user(user)
+    principal_cache.set(user.id, principal)
+    return principal
+
+
+def _check_user(user, token_version: int):
+    if not user:
+        raise AuthError("User not found")
+    if not user.is_active or (user.token_version or 0) != token_version:
+        raise AuthError("Token revoked")
+    return user
+
+
+def authenticate_token(token: str, db: Session):
+    """
+    Resolve a bearer token to the current user.
+
+    In "stateless" AUTH_MODE a cached Principal is returned and the
+    database is only read on a cache miss; otherwise the User row is
+    loaded. Either way the token's "ver" claim must match the user's
+    token_version, so bumping it revokes outstanding tokens.
+    """
+    user_id, token_version = _decode_token(token)
+
+    if settings.AUTH_MODE == "stateless":
+        user = principal_cache.get(user_id)
+        if user is None:
+            user = _cache_principal(db.query(models.User).get(user_id))
+    else:
+        user = db.query(models.User).filter(models.User.id == user_id).first()
+
+    return _check_user(user, token_version)
+
+
+async def authenticate_token_async(token: str, db: AsyncSession):
+    user_id, token_version = _decode_token(token)
+
+    if settings.AUTH_MODE == "stateless":
+        user = principal_cache.get(user_id)
+        if user is None:
+            user = _cache_principal(await crud_async.get_user(db, user_id))
+    else:
+        user = await crud_async.get_user(db, user_id)
+
+    return _check_user(user, token_version)
+
+
 def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db),
 ) -> models.User:
     try:
-        payload = decode_access_token(token)
-        user_id = int(payload.get("sub"))
-    except Exception:
+        return authenticate_token(token, db)
+    except AuthError as exc:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
+            detail=str(exc),
         )
 
-    user = db.query(models.User).filter(models.User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
 
-    return user
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> models.User:
+    try:
+        return await authenticate_token_async(token, db)
+    except AuthError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(exc),
+        )
 
 
-async def get_current_user_ws(websocket: WebSocket, db: Session):
-    token = websocket.query_params.get("token")
-    if not token:
-        await websocket.close(code=1008)
-        return None
+# ---------- AUTHORIZATION ----------
 
-    try:
-        payload = decode_access_token(token)
-        user_id = int(payload.get("sub"))
-    except Exception:
-        await websocket.close(code=1008)
+ROLE_RANK = {
+    models.RoleEnum.viewer: 0,
+    models.RoleEnum.developer: 1,
+    models.RoleEnum.admin: 2,
+}
+
+
+class Membership(NamedTuple):
+    """
+    Detached snapshot of a ProjectMember row, cached per project.
+    """
+
+    project_id: int
+    user_id: int
+    role: models.RoleEnum
+
+
+class ProjectAccess(NamedTuple):
+    member: Membership
+
+
+class IssueAccess(NamedTuple):
+    issue: models.Issue
+    member: models.ProjectMember
+
+
+class CommentAccess(NamedTuple):
+    comment: models.Comment
+    issue: models.Issue
+    member: models.ProjectMember
+
+
+class AttachmentAccess(NamedTuple):
+    attachment: models.Attachment
+    issue: models.Issue
+    member: models.ProjectMember
+
+
+def _check_role(member: Optional[models.ProjectMember], min_role: models.RoleEnum):
+    if not member:
+        raise HTTPException(status_code=403, detail="Not a member")
+    if ROLE_RANK[member.role] < ROLE_RANK[min_role]:
+        raise HTTPException(status_code=403, detail="Insufficient role")
+
+
+_MISSING = object()
+
+membership_cache = TTLCache(
+    maxsize=settings.RESPONSE_CACHE_MAX_SIZE,
+    ttl=settings.MEMBERSHIP_CACHE_TTL_SECONDS,
+)
+
+
+def _membership_key(project_id: int, user_id: int):
+    if not settings.MEMBERSHIP_CACHE_TTL_SECONDS:
         return None
+    return response_cache.key("member", [project_scope(project_id)], user_id)
 
-    user = db.query(models.User).filter(models.User.id == user_id).first()
-    if not user:
-        await websocket.close(code=1008)
+
+def _cached_membership(key):
+    if key is None:
+        return _MISSING
+    return membership_cache.get(key, _MISSING)
+
+
+def _cache_membership(key, member: Optional[Membership]):
+    if key is not None:
+        membership_cache.set(key, member)
+
+
+def _membership(member: Optional[models.ProjectMember]) -> Optional[Membership]:
+    if member is None:
         return None
+    return Membership(member.project_id, member.user_id, member.role)
+
+
+def get_membership(db: Session, project_id: int, user_id: int) -> Optional[Membership]:
+    """
+    The caller's membership. With MEMBERSHIP_CACHE_TTL_SECONDS set it is
+    cached under the project's version, so repeated reads skip this query
+    until membership changes or the entry expires.
+    """
+    key = _membership_key(project_id, user_id)
+    member = _cached_membership(key)
+    if member is _MISSING:
+        member = _membership(crud.is_project_member(db, project_id, user_id))
+        _cache_membership(key, member)
+    return member
+
+
+async def get_membership_async(
+    db: AsyncSession, project_id: int, user_id: int
+) -> Optional[Membership]:
+    key = _membership_key(project_id, user_id)
+    member = _cached_membership(key)
+    if member is _MISSING:
+        member = _membership(await crud_async.is_project_member(db, project_id, user_id))
+        _cache_membership(key, member)
+    return member
+
+
+def require_project_access(min_role: models.RoleEnum = models.RoleEnum.viewer):
+    def dependency(
+        project_id: int,
+        db: Session = Depends(get_db),
+        current_user: models.User = Depends(get_current_user),
+    ) -> ProjectAccess:
+        member = get_membership(db, project_id, current_user.id)
+        _check_role(member, min_role)
+        return ProjectAccess(member)
+
+    return dependency
+
+
+def authorize_issue(
+    db: Session,
+    issue_id: int,
+    user_id: int,
+    min_role: models.RoleEnum = models.RoleEnum.viewer,
+) -> IssueAccess:
+    """
+    Resolve the issue and the caller's membership/role in one query.
+    """
+    row = crud.get_issue_with_membership(db, issue_id, user_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Issue not found")
+    issue, member = row
+    _check_role(member, min_role)
+    return IssueAccess(issue, member)
+
+
+def require_issue_access(min_role: models.RoleEnum = models.RoleEnum.viewer):
+    def dependency(
+        issue_id: int,
+        db: Session = Depends(get_db),
+        current_user: models.User = Depends(get_current_user),
+    ) -> IssueAccess:
+        return authorize_issue(db, issue_id, current_user.id, min_role)
+
+    return dependency
+
+
+def require_comment_access(min_role: models.RoleEnum = models.RoleEnum.viewer):
+    def dependency(
+        comment_id: int,
+        db: Session = Depends(get_db),
+        current_user: models.User = Depends(get_current_user),
+    ) -> CommentAccess:
+        row = crud.get_comment_with_membership(db, comment_id, current_user.id)
+        if row is None:
+            raise HTTPException(status_code=404, detail="Comment not found")
+        comment, issue, member = row
+        _check_role(member, min_role)
+        return CommentAccess(comment, issue, member)
+
+    return dependency
+
+
+def require_attachment_access(min_role: models.RoleEnum = models.RoleEnum.viewer):
+    def dependency(
+        attachment_id: int,
+        db: Session = Depends(get_db),
+        current_user: models.User = Depends(get_current_user),
+    ) -> AttachmentAccess:
+        row = crud.get_attachment_with_membership(db, attachment_id, current_user.id)
+        if row is None:
+            raise HTTPException(status_code=404, detail="Attachment not found")
+        attachment, issue, member = row
+        _check_role(member, min_role)
+        return AttachmentAccess(attachment, issue, member)
+
+    return dependency
+
+
+# ---------- AUTHORIZATION (DB_ASYNC) ----------
+
+def require_project_access_async(min_role: models.RoleEnum = models.RoleEnum.viewer):
+    async def dependency(
+        project_id: int,
+        db: AsyncSession = Depends(get_async_db),
+        current_user: models.User = Depends(get_current_user_async),
+    ) -> ProjectAccess:
+        member = await get_membership_async(db, project_id, current_user.id)
+        _check_role(member, min_role)
+        return ProjectAccess(member)
+
+    return dependency
+
+
+def require_issue_access_async(min_role: models.RoleEnum = models.RoleEnum.viewer):
+    async def dependency(
+        issue_id: int,
+        db: AsyncSession = Depends(get_async_db),
+        current_user: models.User = Depends(get_current_user_async),
+    ) -> IssueAccess:
+        row = await crud_async.get_issue_with_membership(db, issue_id, current_user.id)
+        if row is None:
+            raise HTTPException(status_code=404, detail="Issue not found")
+        issue, member = row
+        _check_role(member, min_role)
+        return IssueAccess(issue, member)
+
+    return dependency
+
+
+def require_comment_access_async(min_role: models.RoleEnum = models.RoleEnum.viewer):
+    async def dependency(
+        comment_id: int,
+        db: AsyncSession = Depends(get_async_db),
+        current_user: models.User = Depends(get_current_user_async),
+    ) -> CommentAccess:
+        row = await crud_async.get_comment_with_membership(db, comment_id, current_user.id)
+        if row is None:
+            raise HTTPException(status_code=404, detail="Comment not found")
+        comment, issue, member = row
+        _check_role(member, min_role)
+        return CommentAccess(comment, issue, member)
 
-    return user
\ No newline at end of file
+    return dependency
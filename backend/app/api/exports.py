@@ -0,0 +1,125 @@
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import List
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app import crud, schemas
+from app.api.deps import ProjectAccess, require_project_access
+from app.core.config import settings
+from app.db.session import get_db
+
+router = APIRouter(prefix="/projects", tags=["Export"])
+
+# Issues, comments and attachments share one CSV header; the "record"
+# column says which kind a row is and the other kinds' columns stay empty.
+CSV_COLUMNS = [
+    "record",
+    "id",
+    "issue_id",
+    "title",
+    "description",
+    "status",
+    "type",
+    "priority",
+    "assignee_id",
+    "author_id",
+    "parent_id",
+    "content",
+    "filename",
+    "url",
+    "size",
+    "mime_type",
+    "created_at",
+]
+
+MEDIA_TYPES = {
+    schemas.ExportFormat.csv: "text/csv; charset=utf-8",
+    schemas.ExportFormat.ndjson: "application/x-ndjson",
+}
+
+
+def _value(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _records(db: Session, project_id: int, include: List[schemas.ExportInclude]):
+    sections = [("issue", crud.select_issue_export(project_id))]
+    if schemas.ExportInclude.comments in include:
+        sections.append(("comment", crud.select_comment_export(project_id)))
+    if schemas.ExportInclude.attachments in include:
+        sections.append(("attachment", crud.select_attachment_export(project_id)))
+
+    for record, stmt in sections:
+        for row in crud.stream_rows(db, stmt, settings.EXPORT_BATCH_SIZE):
+            yield {"record": record, **{k: _value(v) for k, v in row._mapping.items()}}
+
+
+def _csv_chunks(records):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+    for record in records:
+        writer.writerow(record)
+        if buffer.tell() >= settings.EXPORT_CHUNK_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _ndjson_chunks(records):
+    lines, size = [], 0
+    for record in records:
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        lines.append(line)
+        size += len(line)
+        if size >= settings.EXPORT_CHUNK_BYTES:
+            yield "".join(lines)
+            lines, size = [], 0
+    yield "".join(lines)
+
+
+def _export(bind, project_id: int, format: schemas.ExportFormat, include):
+    """
+    Runs while the response streams, after the request's own session may
+    be gone, so it reads through a session of its own on the same engine.
+    """
+    db = Session(bind=bind)
+    try:
+        records = _records(db, project_id, include)
+        if format == schemas.ExportFormat.csv:
+            yield from _csv_chunks(records)
+        else:
+            yield from _ndjson_chunks(records)
+    finally:
+        db.close()
+
+
+@router.get("/{project_id}/export")
+def export_project(
+    project_id: int,
+    format: schemas.ExportFormat = schemas.ExportFormat.ndjson,
+    include: List[schemas.ExportInclude] = Query([]),
+    access: ProjectAccess = Depends(require_project_access()),
+    db: Session = Depends(get_db),
+):
+    """
+    Stream the project's issues, and optionally their comments and
+    attachments, as CSV or NDJSON in constant memory.
+    """
+    filename = f"project-{project_id}.{format.value}"
+    return StreamingResponse(
+        _export(db.get_bind(), project_id, format, include),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,30 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from sqlalchemy.orm import Session
+
+from app import schemas
+from app.api.deps import ProjectAccess, require_project_access
+from app.db.session import get_db
+from app.utils.importer import ImportFileError, guess_format, import_issues
+
+router = APIRouter(prefix="/projects", tags=["Import"])
+
+
+@router.post("/{project_id}/import", response_model=schemas.ImportReport)
+def import_project_issues(
+    project_id: int,
+    format: Optional[schemas.ImportFormat] = None,
+    file: UploadFile = File(...),
+    access: ProjectAccess = Depends(require_project_access()),
+    db: Session = Depends(get_db),
+):
+    """
+    Bulk-load issues from CSV, NDJSON or a JIRA JSON export (the format
+    defaults to the file extension). Invalid rows are skipped and listed
+    in the report; for very large files use `python -m app.cli`.
+    """
+    try:
+        return import_issues(db, project_id, file.file, format or guess_format(file.filename))
+    except ImportFileError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
@@ -1,10 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Optional
 
-from app import models, schemas, crud
-from app.api.deps import get_current_user
+from app import models, schemas, crud, events
+from app.api.deps import (
+    IssueAccess,
+    ProjectAccess,
+    require_issue_access,
+    require_project_access,
+)
 from app.db.session import get_db
+from app.utils.etags import etag_headers, if_none_match, not_modified, params_digest, weak_etag
+from app.utils.pagination import InvalidCursor, decode_cursor, encode_cursor
+from app.utils.response_cache import project_scope, response_cache
 
 router = APIRouter(prefix="/issues", tags=["Issues"])
 
@@ -13,18 +21,15 @@ router = APIRouter(prefix="/issues", tags=["Issues"])
 def create_issue(
     project_id: int,
     payload: schemas.IssueCreate,
+    access: ProjectAccess = Depends(require_project_access()),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
 ):
-    if not crud.is_project_member(db, project_id, current_user.id):
-        raise HTTPException(status_code=403, detail="Not a member")
-
     if payload.assignee_id:
         assignee = db.query(models.User).filter_by(id=payload.assignee_id).first()
         if not assignee:
             raise HTTPException(status_code=400, detail="Assignee user not found")
 
-    return crud.create_issue(
+    issue = crud.create_issue(
         db,
         project_id=project_id,
         title=payload.title,
@@ -33,59 +38,193 @@ def create_issue(
         priority=payload.priority,
         assignee_id=payload.assignee_id,
     )
+    events.issue_created(issue)
+    return issue
+
+
+@router.post("/projects/{project_id}/bulk", response_model=schemas.IssueBulkOut)
+def bulk_create_issues(
+    project_id: int,
+    payload: schemas.IssueBulkCreate,
+    access: ProjectAccess = Depends(require_project_access()),
+    db: Session = Depends(get_db),
+):
+    """
+    Create many issues in one transaction. Items with an unknown assignee
+    are reported as failed; the rest are created.
+    """
+    known = crud.existing_user_ids(
+        db, (item.assignee_id for item in payload.items if item.assignee_id)
+    )
+
+    results, valid = [], []
+    for index, item in enumerate(payload.items):
+        if item.assignee_id and item.assignee_id not in known:
+            results.append({"index": index, "ok": False, "error": "Assignee user not found"})
+            continue
+        results.append({"index": index, "ok": True})
+        valid.append(
+            {
+                "title": item.title,
+                "description": item.description,
+                "type_": item.type,
+                "priority": item.priority,
+                "assignee_id": item.assignee_id,
+            }
+        )
+
+    issues = crud.bulk_create_issues(db, project_id, valid) if valid else []
+    created = iter(issues)
+    for result in results:
+        if result["ok"]:
+            issue = next(created)
+            result.update(id=issue.id, issue=issue)
+
+    if issues:
+        events.issues_created(project_id, issues)
+    return {"results": results}
+
+
+def _bulk_update_results(issue_ids, before) -> list:
+    return [
+        {"index": index, "id": issue_id, "ok": True}
+        if issue_id in before
+        else {"index": index, "id": issue_id, "ok": False, "error": "Issue not found"}
+        for index, issue_id in enumerate(issue_ids)
+    ]
+
+
+@router.patch("/projects/{project_id}/bulk/status", response_model=schemas.IssueBulkOut)
+def bulk_update_issue_status(
+    project_id: int,
+    payload: schemas.IssueBulkStatus,
+    access: ProjectAccess = Depends(require_project_access()),
+    db: Session = Depends(get_db),
+):
+    status = models.IssueStatus(payload.status.value)
+    before = crud.bulk_update_issues(db, project_id, payload.issue_ids, {"status": status})
+
+    moves = [(row.id, row.status) for row in before.values() if row.status != status]
+    if moves:
+        events.issues_moved(project_id, moves, status)
+    return {"results": _bulk_update_results(payload.issue_ids, before)}
+
+
+@router.patch("/projects/{project_id}/bulk/assignee", response_model=schemas.IssueBulkOut)
+def bulk_assign_issues(
+    project_id: int,
+    payload: schemas.IssueBulkAssign,
+    access: ProjectAccess = Depends(require_project_access()),
+    db: Session = Depends(get_db),
+):
+    if payload.assignee_id and not crud.existing_user_ids(db, [payload.assignee_id]):
+        raise HTTPException(status_code=400, detail="Assignee user not found")
+
+    before = crud.bulk_update_issues(
+        db, project_id, payload.issue_ids, {"assignee_id": payload.assignee_id}
+    )
+
+    changed = [row.id for row in before.values() if row.assignee_id != payload.assignee_id]
+    if changed:
+        events.issues_assigned(project_id, changed, payload.assignee_id)
+    return {"results": _bulk_update_results(payload.issue_ids, before)}
 
 
-@router.get("/projects/{project_id}", response_model=List[schemas.IssueOut])
+@router.get("/projects/{project_id}", response_model=schemas.IssuePage)
 def list_issues(
     project_id: int,
+    request: Request,
+    status: Optional[schemas.IssueStatusEnum] = None,
+    type: Optional[schemas.IssueTypeEnum] = None,
+    assignee_id: Optional[int] = None,
+    min_priority: Optional[int] = None,
+    max_priority: Optional[int] = None,
+    sort: schemas.IssueSortEnum = schemas.IssueSortEnum.created_at,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    access: ProjectAccess = Depends(require_project_access()),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
 ):
-    if not crud.is_project_member(db, project_id, current_user.id):
-        raise HTTPException(status_code=403, detail="Not a member")
+    params = (status, type, assignee_id, min_priority, max_priority, sort, cursor, limit)
+    key = response_cache.key("issues", [project_scope(project_id)], *params)
+    cached = response_cache.response(key)
+    if cached is not None:
+        etag = cached.headers["etag"]
+    else:
+        version = crud.get_project_version(db, project_id)
+        etag = weak_etag("issues", project_id, version, params_digest(*params))
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    if cached is not None:
+        return cached
+
+    try:
+        after = decode_cursor(cursor, sort.value) if cursor else None
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    issues = crud.list_issues_for_project(
+        db,
+        project_id,
+        status=models.IssueStatus(status.value) if status else None,
+        type_=models.IssueTypeEnum(type.value) if type else None,
+        assignee_id=assignee_id,
+        min_priority=min_priority,
+        max_priority=max_priority,
+        sort=sort.value,
+        after=after,
+        limit=limit + 1,
+    )
+
+    next_cursor = None
+    if len(issues) > limit:
+        issues = issues[:limit]
+        last = issues[-1]
+        next_cursor = encode_cursor(getattr(last, sort.value.lstrip("-")), last.id, sort.value)
 
-    return crud.list_issues_for_project(db, project_id)
-@router.patch("/{issue_id}/status")
+    page = {"items": issues, "next_cursor": next_cursor}
+    return response_cache.render(key, schemas.IssuePage, page, etag_headers(etag))
+
+
+@router.get("/{issue_id}", response_model=schemas.IssueDetail)
+def get_issue(
+    issue_id: int,
+    access: IssueAccess = Depends(require_issue_access()),
+    db: Session = Depends(get_db),
+):
+    """
+    The issue with its assignee, comments with authors and attachments,
+    loaded eagerly in a fixed number of statements.
+    """
+    return crud.get_issue_detail(db, issue_id)
+
+
+@router.patch("/{issue_id}/status", response_model=schemas.IssueOut)
 def update_issue_status(
     issue_id: int,
-    status: str,
+    status: schemas.IssueStatusEnum,
+    access: IssueAccess = Depends(require_issue_access()),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
 ):
-    issue = db.query(models.Issue).filter_by(id=issue_id).first()
-    if not issue:
-        raise HTTPException(status_code=404, detail="Issue not found")
-
-    member = db.query(models.ProjectMember).filter_by(
-        project_id=issue.project_id,
-        user_id=current_user.id
-    ).first()
-    if not member:
-        raise HTTPException(status_code=403, detail="Not a member")
-
-    issue.status = status
-    db.commit()
-    db.refresh(issue)
+    issue = access.issue
+
+    from_status = issue.status
+    issue = crud.update_issue_status(db, issue, models.IssueStatus(status.value))
+    if issue.status != from_status:
+        events.issue_moved(issue, from_status)
     return issue
 
 
 @router.delete("/{issue_id}")
 def delete_issue(
     issue_id: int,
+    access: IssueAccess = Depends(require_issue_access()),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
 ):
-    issue = db.query(models.Issue).filter_by(id=issue_id).first()
-    if not issue:
-        raise HTTPException(status_code=404, detail="Issue not found")
-
-    member = db.query(models.ProjectMember).filter_by(
-        project_id=issue.project_id,
-        user_id=current_user.id
-    ).first()
-    if not member:
-        raise HTTPException(status_code=403, detail="Not a member")
+    issue = access.issue
 
+    project_id = issue.project_id
     db.delete(issue)
     db.commit()
+    events.issue_deleted(project_id, issue_id)
     return {"ok": True}
@@ -1,10 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app import models, schemas, crud
-from app.api.deps import get_current_user
+from app.api.deps import ProjectAccess, get_current_user, require_project_access
 from app.db.session import get_db
+from app.utils.response_cache import (
+    PROJECTS_SCOPE,
+    USERS_SCOPE,
+    project_scope,
+    response_cache,
+    user_scope,
+)
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
@@ -29,6 +37,11 @@ def list_projects(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
+    key = response_cache.key("projects", [user_scope(current_user.id), PROJECTS_SCOPE])
+    cached = response_cache.response(key)
+    if cached is not None:
+        return cached
+
     memberships = (
         db.query(models.ProjectMember)
         .filter(models.ProjectMember.user_id == current_user.id)
@@ -36,21 +49,46 @@ def list_projects(
     )
     project_ids = [m.project_id for m in memberships]
 
-    return (
+    projects = (
         db.query(models.Project)
         .filter(models.Project.id.in_(project_ids))
         .all()
     )
+    return response_cache.render(key, List[schemas.ProjectOut], projects)
+
+
+@router.get("/{project_id}/board", response_model=schemas.BoardOut)
+def get_board(
+    project_id: int,
+    per_column: Optional[int] = Query(None, ge=1, le=500),
+    access: ProjectAccess = Depends(require_project_access()),
+    db: Session = Depends(get_db),
+):
+    """
+    Per-status counts and lightweight cards for the Kanban board.
+    """
+    key = response_cache.key("board", [project_scope(project_id)], per_column)
+    cached = response_cache.response(key)
+    if cached is not None:
+        return cached
+
+    board = {
+        "project_id": project_id,
+        "columns": crud.get_board(db, project_id, per_column),
+    }
+    return response_cache.render(key, schemas.BoardOut, board)
 
 
 @router.get("/{project_id}/members", response_model=List[schemas.ProjectMemberOut])
 def list_project_members(
     project_id: int,
+    access: ProjectAccess = Depends(require_project_access()),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
 ):
-    if not crud.is_project_member(db, project_id, current_user.id):
-        raise HTTPException(status_code=403, detail="Not a member")
+    key = response_cache.key("members", [project_scope(project_id), USERS_SCOPE])
+    cached = response_cache.response(key)
+    if cached is not None:
+        return cached
 
     rows = (
         db.query(models.ProjectMember, models.User)
@@ -59,7 +97,7 @@ def list_project_members(
         .all()
     )
 
-    return [
+    members = [
         schemas.ProjectMemberOut(
             id=user.id,
             email=user.email,
@@ -68,18 +106,16 @@ def list_project_members(
         )
         for member, user in rows
     ]
+    return response_cache.render(key, List[schemas.ProjectMemberOut], members)
 
 
 @router.post("/{project_id}/members", response_model=schemas.ProjectMemberOut)
 def add_project_member(
     project_id: int,
     payload: schemas.ProjectMemberAdd,
+    access: ProjectAccess = Depends(require_project_access()),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
 ):
-    if not crud.is_project_member(db, project_id, current_user.id):
-        raise HTTPException(status_code=403, detail="Not a member")
-
     user = crud.get_user_by_email(db, payload.email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -94,7 +130,12 @@ def add_project_member(
         role=payload.role,
     )
     db.add(membership)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent request added them first
+        db.rollback()
+        raise HTTPException(status_code=400, detail="User already in project")
 
     return schemas.ProjectMemberOut(
         id=user.id,
@@ -107,13 +148,9 @@ def add_project_member(
 @router.delete("/{project_id}")
 def delete_project(
     project_id: int,
+    access: ProjectAccess = Depends(require_project_access()),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
 ):
-    member = crud.is_project_member(db, project_id, current_user.id)
-    if not member:
-        raise HTTPException(status_code=403, detail="Not a member")
-
     project = db.query(models.Project).filter_by(id=project_id).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -127,13 +164,9 @@ def delete_project(
 def remove_project_member(
     project_id: int,
     user_id: int,
+    access: ProjectAccess = Depends(require_project_access()),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
 ):
-    requester = crud.is_project_member(db, project_id, current_user.id)
-    if not requester:
-        raise HTTPException(status_code=403, detail="Not a member")
-
     membership = (
         db.query(models.ProjectMember)
         .filter_by(project_id=project_id, user_id=user_id)
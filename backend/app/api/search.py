@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from app import crud, models, schemas
+from app.api.deps import get_current_user
+from app.db.session import get_db
+from app.utils.pagination import InvalidCursor, decode_cursor, encode_cursor
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+
+@router.get("/", response_model=schemas.SearchPage)
+def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    project_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Ranked search over issue titles, descriptions and comments in the
+    projects the caller belongs to.
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+        if after is not None:
+            (rank, kind), _ = after
+            after = ((float(rank), str(kind)), after[1])
+    except (InvalidCursor, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    hits = crud.search(
+        db,
+        q,
+        current_user.id,
+        project_id=project_id,
+        after=after,
+        limit=limit + 1,
+    )
+
+    next_cursor = None
+    if len(hits) > limit:
+        hits = hits[:limit]
+        last = hits[-1]
+        next_cursor = encode_cursor([last.rank, last.kind], last.id)
+
+    return {"items": hits, "next_cursor": next_cursor}
@@ -5,6 +5,7 @@ from typing import List
 from app import models, schemas
 from app.api.deps import get_current_user
 from app.db.session import get_db
+from app.utils.response_cache import USERS_SCOPE, response_cache
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -14,4 +15,10 @@ def list_users(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
-    return db.query(models.User).order_by(models.User.id.asc()).all()
+    key = response_cache.key("users", [USERS_SCOPE])
+    cached = response_cache.response(key)
+    if cached is not None:
+        return cached
+
+    users = db.query(models.User).order_by(models.User.id.asc()).all()
+    return response_cache.render(key, List[schemas.UserOut], users)
@@ -1,51 +1,266 @@
+import asyncio
+from collections import deque
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from typing import List
+from starlette.concurrency import run_in_threadpool
+from typing import Deque, Dict, Optional, Set
 
-from app.api.deps import get_current_user_ws
+from app import crud
+from app.api.deps import AuthError, authenticate_token
+from app.core.config import settings
 from app.db.session import SessionLocal
+from app.utils.pubsub import EventBroker, broker
 
 router = APIRouter()
 
+# Close code sent to consumers that cannot keep up ("try again later").
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+# Broker topic carrying {"project_id", "data", "coalesce_key"} payloads.
+BOARD_TOPIC = "board"
+
+
+class BoardConnection:
+    """
+    One board socket with its own bounded outbound queue and writer task.
+
+    Enqueueing never awaits the network: a full queue either drops the
+    oldest pending message or evicts the socket, depending on policy.
+    Messages sharing a coalesce key replace each other while still queued;
+    the merged message keeps the first one's "from" (see issue:moved).
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        project_id: int,
+        max_queue: Optional[int] = None,
+        send_timeout: Optional[float] = None,
+        policy: Optional[str] = None,
+        max_dropped: Optional[int] = None,
+    ):
+        self.websocket = websocket
+        self.project_id = project_id
+        self.max_queue = max_queue or settings.WS_SEND_QUEUE_SIZE
+        self.send_timeout = send_timeout or settings.WS_SEND_TIMEOUT_SECONDS
+        self.policy = policy or settings.WS_SLOW_CONSUMER_POLICY
+        self.max_dropped = max_dropped or settings.WS_MAX_DROPPED_MESSAGES
+
+        self.dropped = 0
+        self.closed = False
+        self._queue: Deque[list] = deque()
+        self._by_key: Dict[str, list] = {}
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._writer())
+
+    def enqueue(self, data: dict, coalesce_key: Optional[str] = None) -> bool:
+        if self.closed:
+            return False
+
+        if coalesce_key is not None and coalesce_key in self._by_key:
+            entry = self._by_key[coalesce_key]
+            # The client never saw the replaced event, so a coalesced
+            # transition still starts where the first one did.
+            if "from" in entry[1] and "from" in data:
+                data = {**data, "from": entry[1]["from"]}
+            entry[1] = data
+            return True
+
+        if len(self._queue) >= self.max_queue:
+            if self.policy == "disconnect":
+                self._evict()
+                return False
+            self._forget(self._queue.popleft())
+            self.dropped += 1
+            if self.dropped >= self.max_dropped:
+                self._evict()
+                return False
+
+        entry = [coalesce_key, data]
+        self._queue.append(entry)
+        if coalesce_key is not None:
+            self._by_key[coalesce_key] = entry
+        self._ready.set()
+        return True
+
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def close(self):
+        self.closed = True
+        self._queue.clear()
+        self._by_key.clear()
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+
+    def _forget(self, entry: list):
+        key = entry[0]
+        if key is not None and self._by_key.get(key) is entry:
+            del self._by_key[key]
+
+    def _evict(self):
+        self.close()
+        asyncio.ensure_future(self._close_socket())
+
+    async def _close_socket(self):
+        try:
+            await self.websocket.close(code=SLOW_CONSUMER_CLOSE_CODE)
+        except Exception:
+            pass
+
+    async def _writer(self):
+        while not self.closed:
+            await self._ready.wait()
+            self._ready.clear()
+            while self._queue and not self.closed:
+                entry = self._queue.popleft()
+                self._forget(entry)
+                try:
+                    await asyncio.wait_for(
+                        self.websocket.send_json(entry[1]),
+                        timeout=self.send_timeout,
+                    )
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    self._evict()
+                    return
+
 
 class ConnectionManager:
-    def __init__(self):
-        self.active: List[WebSocket] = []
+    """
+    Tracks board sockets grouped into per-project rooms so a broadcast
+    only reaches the clients watching that project.
+
+    `publish` goes through the event broker so sockets held by other
+    workers receive the event too; `broadcast` delivers locally.
+    """
+
+    def __init__(self, event_broker: EventBroker):
+        self.rooms: Dict[int, Set[BoardConnection]] = {}
+        self.broker = event_broker
+        event_broker.subscribe(BOARD_TOPIC, self._on_board_event)
 
-    async def connect(self, websocket: WebSocket, user):
+    async def connect(self, websocket: WebSocket, user, project_id: int):
         await websocket.accept()
         websocket.state.user = user
-        self.active.append(websocket)
+        connection = BoardConnection(websocket, project_id)
+        websocket.state.connection = connection
+        self.rooms.setdefault(project_id, set()).add(connection)
+        connection.start()
+        return connection
 
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active:
-            self.active.remove(websocket)
+        connection = getattr(websocket.state, "connection", None)
+        if connection is None:
+            return
+        connection.close()
+        room = self.rooms.get(connection.project_id)
+        if room is None:
+            return
+        room.discard(connection)
+        if not room:
+            del self.rooms[connection.project_id]
 
-    async def broadcast(self, data: dict):
-        for ws in list(self.active):
-            try:
-                await ws.send_json(data)
-            except Exception:
-                self.disconnect(ws)
+    def room_size(self, project_id: int) -> int:
+        return len(self.rooms.get(project_id, ()))
 
+    def broadcast(
+        self,
+        project_id: int,
+        data: dict,
+        coalesce_key: Optional[str] = None,
+    ):
+        """
+        Queue `data` for every socket in the project's room without waiting
+        on any of them. Evicted slow consumers are removed from the room.
+        """
+        for connection in list(self.rooms.get(project_id, ())):
+            if not connection.enqueue(data, coalesce_key):
+                self.disconnect(connection.websocket)
 
-manager = ConnectionManager()
+    def publish(
+        self,
+        project_id: int,
+        data: dict,
+        coalesce_key: Optional[str] = None,
+    ):
+        self.broker.publish(
+            BOARD_TOPIC,
+            {"project_id": project_id, "data": data, "coalesce_key": coalesce_key},
+        )
 
+    def fits(
+        self,
+        project_id: int,
+        data: dict,
+        coalesce_key: Optional[str] = None,
+    ) -> bool:
+        return self.broker.fits(
+            BOARD_TOPIC,
+            {"project_id": project_id, "data": data, "coalesce_key": coalesce_key},
+        )
 
-@router.websocket("/ws/boards")
-async def board_ws(websocket: WebSocket):
+    def _on_board_event(self, payload: dict):
+        self.broadcast(
+            payload["project_id"],
+            payload["data"],
+            payload.get("coalesce_key"),
+        )
+
+
+manager = ConnectionManager(broker)
+
+
+def _parse_project_id(websocket: WebSocket):
+    try:
+        return int(websocket.query_params.get("project_id"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _authorize_board(token: Optional[str], project_id: Optional[int]):
+    """
+    The socket's user if the token is valid and the user is a member of
+    the project, else None. Runs in the threadpool on a session of its
+    own that is closed before the socket starts listening, so an open
+    board does not hold a pooled connection.
+    """
+    if not token or project_id is None:
+        return None
     db = SessionLocal()
     try:
-        user = await get_current_user_ws(websocket, db)
-        if not user:
-            return
+        user = authenticate_token(token, db)
+        if not crud.is_project_member(db, project_id, user.id):
+            return None
+        return user
+    except AuthError:
+        return None
+    finally:
+        db.close()
+
+
+@router.websocket("/ws/boards")
+async def board_ws(websocket: WebSocket):
+    project_id = _parse_project_id(websocket)
+    user = await run_in_threadpool(
+        _authorize_board, websocket.query_params.get("token"), project_id
+    )
+    if user is None:
+        await websocket.close(code=1008)
+        return
 
-        await manager.connect(websocket, user)
+    try:
+        await manager.connect(websocket, user, project_id)
 
+        # Board events are published by the REST handlers; anything the
+        # client sends is only read to notice disconnects.
         while True:
-            data = await websocket.receive_json()
-            await manager.broadcast(data)
+            await websocket.receive_text()
 
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
+        pass
     finally:
-        db.close()
\ No newline at end of file
+        manager.disconnect(websocket)
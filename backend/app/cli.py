@@ -0,0 +1,73 @@
+"""
+Command line entry points:
+
+    python -m app.cli import-issues PROJECT_ID FILE [--format csv|ndjson|jira]
+"""
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+from app import models, schemas
+from app.db.session import SessionLocal
+from app.utils.importer import ImportFileError, guess_format, import_issues
+
+
+def _print_progress(report: dict):
+    print(
+        f"{report['processed']} rows processed, {report['imported']} imported, "
+        f"{report['failed']} failed",
+        file=sys.stderr,
+        flush=True,
+    )
+
+
+def import_issues_command(args) -> int:
+    db = SessionLocal()
+    try:
+        if db.get(models.Project, args.project_id) is None:
+            print(f"Project {args.project_id} not found", file=sys.stderr)
+            return 1
+        with open(args.file, "rb") as fileobj:
+            report = import_issues(
+                db,
+                args.project_id,
+                fileobj,
+                args.format or guess_format(args.file),
+                batch_size=args.batch_size,
+                progress=_print_progress,
+            )
+    except ImportFileError as exc:
+        print(str(exc), file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    importer = commands.add_parser(
+        "import-issues", help="Bulk-load issues into a project from CSV, NDJSON or JIRA JSON"
+    )
+    importer.add_argument("project_id", type=int)
+    importer.add_argument("file")
+    importer.add_argument(
+        "--format",
+        type=schemas.ImportFormat,
+        choices=list(schemas.ImportFormat),
+        help="defaults to the file extension (.csv, .ndjson/.jsonl, .json)",
+    )
+    importer.add_argument("--batch-size", type=int, default=None)
+    importer.set_defaults(handler=import_issues_command)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
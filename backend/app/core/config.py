@@ -31,10 +31,45 @@ def _parse_cors(v):
 class Settings(BaseSettings):
     DATABASE_URL: str
 
+    # Connection pool (ignored for SQLite) and per-statement timeout
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_TIMEOUT: int = 30
+    DB_STATEMENT_TIMEOUT_MS: Optional[int] = None
+
+    # Serve the hot routes with AsyncSession (asyncpg / aiosqlite); the
+    # async URL is derived from DATABASE_URL unless given explicitly.
+    DB_ASYNC: bool = False
+    ASYNC_DATABASE_URL: Optional[str] = None
+
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7
 
+    # "db" loads the user on every request; "stateless" trusts the token
+    # claims and serves the principal from an in-memory TTL/LRU cache.
+    AUTH_MODE: str = "db"
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAX_SIZE: int = 10000
+
+    # Read-heavy project routes are served from an in-memory LRU; writes
+    # bump per-project version keys (see app.utils.response_cache). The TTL
+    # bounds staleness across workers when EVENT_BROKER is "memory".
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL_SECONDS: int = 30
+    RESPONSE_CACHE_MAX_SIZE: int = 5000
+    # Opt-in cache of permission checks, versioned like the response cache.
+    # Revocations reach other workers only through the broker, so only
+    # enable it (with a TTL of a few seconds) when EVENT_BROKER is
+    # "postgres"; 0 queries the membership on every request.
+    MEMBERSHIP_CACHE_TTL_SECONDS: float = 0
+
+    # bcrypt work runs on its own pool; callers beyond workers + queue get 503
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+
     CORS_ORIGINS: List[str] = ["http://localhost:3000"]
 
     SUPABASE_URL: Optional[str] = None
@@ -42,6 +77,49 @@ class Settings(BaseSettings):
     SUPABASE_SERVICE_ROLE_KEY: Optional[str] = None
     SUPABASE_BUCKET: Optional[str] = None
 
+    # "supabase" or "local" (files under STORAGE_LOCAL_ROOT, served by the
+    # API at /attachments/files/...; STORAGE_PUBLIC_BASE_URL is the API origin)
+    STORAGE_BACKEND: str = "supabase"
+    STORAGE_LOCAL_ROOT: str = "storage"
+    STORAGE_PUBLIC_BASE_URL: str = ""
+
+    # Uploads are streamed to storage in parts; larger files get 413
+    UPLOAD_MAX_BYTES: int = 500 * 1024 * 1024
+    UPLOAD_URL_EXPIRE_SECONDS: int = 900
+
+    # Storage objects are deleted in the background from the
+    # storage_deletions outbox, retried with exponential backoff
+    STORAGE_DELETE_BATCH_SIZE: int = 100
+    STORAGE_DELETE_INTERVAL_SECONDS: float = 5.0
+    STORAGE_DELETE_MAX_BACKOFF_SECONDS: int = 3600
+
+    # Image thumbnails (requires Pillow); larger sources are skipped
+    THUMBNAIL_SIZE: int = 320
+    THUMBNAIL_MAX_SOURCE_BYTES: int = 50 * 1024 * 1024
+    STORAGE_TIMEOUT_SECONDS: float = 60.0
+
+    # Exports stream rows from a server-side cursor in batches and flush
+    # the response in chunks of about this many bytes
+    EXPORT_BATCH_SIZE: int = 1000
+    EXPORT_CHUNK_BYTES: int = 64 * 1024
+
+    # Imports validate and insert this many rows per transaction (COPY on
+    # PostgreSQL) and list at most IMPORT_MAX_ERRORS failed rows
+    IMPORT_BATCH_SIZE: int = 5000
+    IMPORT_MAX_ERRORS: int = 100
+
+    # Per-socket outbound queue; see app.api.websockets.BoardConnection
+    WS_SEND_QUEUE_SIZE: int = 256
+    WS_SEND_TIMEOUT_SECONDS: float = 10.0
+    WS_SLOW_CONSUMER_POLICY: str = "drop_oldest"  # or "disconnect"
+    WS_MAX_DROPPED_MESSAGES: int = 1000
+
+    # "memory" (single process) or "postgres" (LISTEN/NOTIFY on DATABASE_URL);
+    # the postgres broker sends from a background thread through a queue
+    # of this size, dropping (and logging) events beyond it
+    EVENT_BROKER: str = "memory"
+    EVENT_PUBLISH_QUEUE_SIZE: int = 10000
+
     if _PYDANTIC_V2:
         @field_validator("CORS_ORIGINS", mode="before")
         @classmethod
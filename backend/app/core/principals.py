@@ -0,0 +1,54 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from app import models
+from app.core.config import settings
+from app.utils.cache import TTLCache
+from app.utils.pubsub import broker
+
+# Broker topic carrying {"user_id"} when a cached principal goes stale.
+AUTH_TOPIC = "auth"
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    Detached snapshot of the authenticated user, safe to share between
+    requests. Exposes the User attributes the routers read.
+    """
+
+    id: int
+    email: str
+    full_name: Optional[str]
+    role: models.RoleEnum
+    is_active: bool
+    token_version: int
+
+    @classmethod
+    def from_user(cls, user: models.User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            role=user.role,
+            is_active=bool(user.is_active),
+            token_version=user.token_version or 0,
+        )
+
+
+principal_cache = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAX_SIZE,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_principal(user_id: int):
+    """
+    Drop the cached principal here and, through the broker, in every
+    other worker.
+    """
+    principal_cache.delete(user_id)
+    broker.publish(AUTH_TOPIC, {"user_id": user_id})
+
+
+broker.subscribe(AUTH_TOPIC, lambda payload: principal_cache.delete(payload["user_id"]))
@@ -1,11 +1,32 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
 from jose import jwt, JWTError
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Dict, Any, Tuple
 
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+)
+
+# bcrypt releases the GIL, so a small thread pool gives real parallelism
+# without tying up the request threadpool.
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+_password_slots = threading.BoundedSemaphore(
+    settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_QUEUE
+)
+
+
+class PasswordHasherBusy(RuntimeError):
+    pass
 
 
 def get_password_hash(password: str) -> str:
@@ -16,9 +37,42 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def _run_password_task(fn, *args):
+    if not _password_slots.acquire(blocking=False):
+        raise PasswordHasherBusy("Password hashing queue is full")
+    try:
+        future = _password_executor.submit(fn, *args)
+    except BaseException:
+        _password_slots.release()
+        raise
+    # The slot belongs to the job, not to the awaiting request: a client
+    # that disconnects must not free it while bcrypt is still queued or
+    # running.
+    future.add_done_callback(lambda _: _password_slots.release())
+    return await asyncio.wrap_future(future)
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_password_task(pwd_context.hash, password)
+
+
+async def verify_and_update_password(
+    plain_password: str,
+    hashed_password: str,
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify on the password pool. The second item is a replacement hash
+    when the stored one uses outdated parameters (e.g. BCRYPT_ROUNDS).
+    """
+    return await _run_password_task(
+        pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+
 def create_access_token(
     subject: str,
     expires_delta: Optional[timedelta] = None,
+    claims: Optional[Dict[str, Any]] = None,
 ) -> str:
     expire = datetime.utcnow() + (
         expires_delta
@@ -26,10 +80,30 @@ def create_access_token(
         else timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     )
 
-    payload = {"sub": str(subject), "exp": expire}
+    payload = {**(claims or {}), "sub": str(subject), "exp": expire}
+    return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def create_upload_token(claims: Dict[str, Any], expires_in: int) -> str:
+    """
+    Scoped token for completing a direct-to-storage upload. It carries no
+    "sub", so it is never accepted as an access token.
+    """
+    payload = {
+        **claims,
+        "typ": "upload",
+        "exp": datetime.utcnow() + timedelta(seconds=expires_in),
+    }
     return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
+def decode_upload_token(token: str) -> dict:
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    if payload.get("typ") != "upload":
+        raise JWTError("Not an upload token")
+    return payload
+
+
 def decode_access_token(token: str) -> dict:
     try:
         return jwt.decode(
@@ -1,28 +1,57 @@
-from sqlalchemy.orm import Session
-from typing import Optional, List
+import csv
+import enum
+import io
+
+from sqlalchemy import (
+    Float,
+    and_,
+    case,
+    cast,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+    union_all,
+    update,
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased, joinedload, raiseload, selectinload
+from sqlalchemy.sql import Select
+from typing import Any, Dict, Iterable, Optional, List, Tuple
 
 from app import models
+from app.core.principals import invalidate_principal
 from app.core.security import get_password_hash
+from app.utils.etags import bump_change_versions
+from app.utils.pagination import encode_cursor
+from app.utils.response_cache import invalidate_project
+
+
+# Statements shared with app.crud_async are built by the select_* helpers
+# so the sync and async code paths run exactly the same SQL.
 
 
 # ---------- USERS ----------
 
+def select_user_by_email(email: str) -> Select:
+    return select(models.User).where(models.User.email == email)
+
+
 def get_user_by_email(db: Session, email: str) -> Optional[models.User]:
-    return (
-        db.query(models.User)
-        .filter(models.User.email == email)
-        .first()
-    )
+    return db.execute(select_user_by_email(email)).scalars().first()
 
 
 def create_user(
     db: Session,
     email: str,
-    password: str,
+    password: Optional[str] = None,
     full_name: Optional[str] = None,
     role: models.RoleEnum = models.RoleEnum.developer,
+    hashed_password: Optional[str] = None,
 ) -> models.User:
-    hashed_password = get_password_hash(password)
+    if hashed_password is None:
+        hashed_password = get_password_hash(password)
 
     user = models.User(
         email=email,
@@ -36,6 +65,33 @@ def create_user(
     return user
 
 
+def update_password_hash(
+    db: Session,
+    user: models.User,
+    hashed_password: str,
+) -> models.User:
+    user.hashed_password = hashed_password
+    db.commit()
+    return user
+
+
+def revoke_user_tokens(db: Session, user: models.User) -> models.User:
+    user.token_version = (user.token_version or 0) + 1
+    db.commit()
+    db.refresh(user)
+    invalidate_principal(user.id)
+    return user
+
+
+def set_user_active(db: Session, user: models.User, is_active: bool) -> models.User:
+    user.is_active = is_active
+    user.token_version = (user.token_version or 0) + 1
+    db.commit()
+    db.refresh(user)
+    invalidate_principal(user.id)
+    return user
+
+
 # ---------- PROJECTS ----------
 
 def create_project(
@@ -64,20 +120,117 @@ def create_project(
     return project
 
 
+def select_project_member(project_id: int, user_id: int) -> Select:
+    return select(models.ProjectMember).where(
+        models.ProjectMember.project_id == project_id,
+        models.ProjectMember.user_id == user_id,
+    )
+
+
 def is_project_member(
     db: Session,
     project_id: int,
     user_id: int,
 ) -> Optional[models.ProjectMember]:
-    return (
-        db.query(models.ProjectMember)
-        .filter_by(project_id=project_id, user_id=user_id)
-        .first()
+    return db.execute(select_project_member(project_id, user_id)).scalars().first()
+
+
+def select_project_version(project_id: int) -> Select:
+    return select(models.Project.change_version).where(models.Project.id == project_id)
+
+
+def get_project_version(db: Session, project_id: int) -> Optional[int]:
+    return db.execute(select_project_version(project_id)).scalar()
+
+
+# ---------- ACCESS ----------
+
+def _with_membership(stmt: Select, user_id: int) -> Select:
+    return stmt.outerjoin(
+        models.ProjectMember,
+        and_(
+            models.ProjectMember.project_id == models.Issue.project_id,
+            models.ProjectMember.user_id == user_id,
+        ),
+    )
+
+
+def select_issue_with_membership(issue_id: int, user_id: int) -> Select:
+    stmt = select(models.Issue, models.ProjectMember)
+    return _with_membership(stmt, user_id).where(models.Issue.id == issue_id)
+
+
+def select_comment_with_membership(comment_id: int, user_id: int) -> Select:
+    stmt = (
+        select(models.Comment, models.Issue, models.ProjectMember)
+        .join(models.Issue, models.Issue.id == models.Comment.issue_id)
     )
+    return _with_membership(stmt, user_id).where(models.Comment.id == comment_id)
+
+
+def select_attachment_with_membership(attachment_id: int, user_id: int) -> Select:
+    stmt = (
+        select(models.Attachment, models.Issue, models.ProjectMember)
+        .join(models.Issue, models.Issue.id == models.Attachment.issue_id)
+    )
+    return _with_membership(stmt, user_id).where(models.Attachment.id == attachment_id)
+
+
+def get_issue_with_membership(
+    db: Session,
+    issue_id: int,
+    user_id: int,
+) -> Optional[Tuple[models.Issue, Optional[models.ProjectMember]]]:
+    """
+    Issue and the user's membership in its project in one round-trip.
+    Returns None when the issue does not exist; the membership is None
+    when the user is not in the project.
+    """
+    return db.execute(select_issue_with_membership(issue_id, user_id)).first()
+
+
+def get_comment_with_membership(
+    db: Session,
+    comment_id: int,
+    user_id: int,
+) -> Optional[Tuple[models.Comment, models.Issue, Optional[models.ProjectMember]]]:
+    return db.execute(select_comment_with_membership(comment_id, user_id)).first()
+
+
+def get_attachment_with_membership(
+    db: Session,
+    attachment_id: int,
+    user_id: int,
+) -> Optional[Tuple[models.Attachment, models.Issue, Optional[models.ProjectMember]]]:
+    return db.execute(select_attachment_with_membership(attachment_id, user_id)).first()
 
 
 # ---------- ISSUES ----------
 
+def select_issue_detail(issue_id: int) -> Select:
+    """
+    The issue with its assignee joined in and its comments (with their
+    authors) and attachments fetched by one SELECT ... IN each, so the
+    whole detail costs three statements. Any other relationship raises
+    instead of lazy loading.
+    """
+    return (
+        select(models.Issue)
+        .where(models.Issue.id == issue_id)
+        .options(
+            joinedload(models.Issue.assignee),
+            selectinload(models.Issue.comments).joinedload(models.Comment.author),
+            selectinload(models.Issue.attachments),
+            raiseload("*"),
+        )
+        .execution_options(populate_existing=True)
+    )
+
+
+def get_issue_detail(db: Session, issue_id: int) -> Optional[models.Issue]:
+    return db.execute(select_issue_detail(issue_id)).unique().scalars().first()
+
+
 def create_issue(
     db: Session,
     project_id: int,
@@ -101,15 +254,79 @@ def create_issue(
     return issue
 
 
+ISSUE_SORT_COLUMNS = {
+    "created_at": models.Issue.created_at,
+    "priority": models.Issue.priority,
+}
+
+
+def select_issues_for_project(
+    project_id: int,
+    status: Optional[models.IssueStatus] = None,
+    type_: Optional[models.IssueTypeEnum] = None,
+    assignee_id: Optional[int] = None,
+    min_priority: Optional[int] = None,
+    max_priority: Optional[int] = None,
+    sort: str = "created_at",
+    after: Optional[Tuple[Any, int]] = None,
+    limit: Optional[int] = None,
+) -> Select:
+    """
+    Keyset pagination over (sort column, id); a leading "-" in `sort`
+    means descending. `after` is the (sort value, id) of the last row
+    of the previous page.
+    """
+    descending = sort.startswith("-")
+    column = ISSUE_SORT_COLUMNS[sort.lstrip("-")]
+
+    stmt = select(models.Issue).where(models.Issue.project_id == project_id)
+    if status is not None:
+        stmt = stmt.where(models.Issue.status == status)
+    if type_ is not None:
+        stmt = stmt.where(models.Issue.type == type_)
+    if assignee_id is not None:
+        stmt = stmt.where(models.Issue.assignee_id == assignee_id)
+    if min_priority is not None:
+        stmt = stmt.where(models.Issue.priority >= min_priority)
+    if max_priority is not None:
+        stmt = stmt.where(models.Issue.priority <= max_priority)
+
+    if after is not None:
+        value, last_id = after
+        if descending:
+            stmt = stmt.where(
+                or_(
+                    column < value,
+                    and_(column == value, models.Issue.id < last_id),
+                )
+            )
+        else:
+            stmt = stmt.where(
+                or_(
+                    column > value,
+                    and_(column == value, models.Issue.id > last_id),
+                )
+            )
+
+    if descending:
+        stmt = stmt.order_by(column.desc(), models.Issue.id.desc())
+    else:
+        stmt = stmt.order_by(column.asc(), models.Issue.id.asc())
+
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
 def list_issues_for_project(
     db: Session,
     project_id: int,
+    **filters,
 ) -> List[models.Issue]:
-    return (
-        db.query(models.Issue)
-        .filter_by(project_id=project_id)
-        .all()
-    )
+    """
+    See select_issues_for_project for the accepted filters.
+    """
+    return db.execute(select_issues_for_project(project_id, **filters)).scalars().all()
 
 
 def update_issue_status(
@@ -120,4 +337,631 @@ def update_issue_status(
     issue.status = status
     db.commit()
     db.refresh(issue)
-    return issue    
\ No newline at end of file
+    return issue    
+
+
+def existing_user_ids(db: Session, user_ids: Iterable[int]) -> set:
+    user_ids = set(user_ids)
+    if not user_ids:
+        return set()
+    return set(db.execute(select(models.User.id).where(models.User.id.in_(user_ids))).scalars())
+
+
+def bulk_create_issues(db: Session, project_id: int, items: List[dict]) -> List[models.Issue]:
+    """
+    Insert the issues in one flush (a single batched INSERT ... RETURNING
+    on PostgreSQL) and one commit, then reload them with one SELECT.
+    `items` hold the create_issue keyword arguments.
+    """
+    issues = [
+        models.Issue(
+            title=item["title"],
+            description=item.get("description"),
+            type=item["type_"],
+            priority=item["priority"],
+            project_id=project_id,
+            assignee_id=item.get("assignee_id"),
+        )
+        for item in items
+    ]
+    db.add_all(issues)
+    db.flush()
+    ids = [issue.id for issue in issues]
+    db.commit()
+
+    # Refreshes the expired instances (server defaults included) at once
+    db.execute(select(models.Issue).where(models.Issue.id.in_(ids))).scalars().all()
+    return issues
+
+
+def bulk_update_issues(
+    db: Session,
+    project_id: int,
+    issue_ids: Iterable[int],
+    values: dict,
+) -> Dict[int, models.Issue]:
+    """
+    Apply `values` to the project's issues among `issue_ids` with one
+    UPDATE ... WHERE id IN (...). Returns the matched issues keyed by id,
+    as they were before the update; ids not in the project are absent.
+    """
+    rows = db.execute(
+        select(models.Issue.id, models.Issue.status, models.Issue.assignee_id)
+        .where(
+            models.Issue.project_id == project_id,
+            models.Issue.id.in_(set(issue_ids)),
+        )
+        # Consistent lock order, so overlapping batches cannot deadlock
+        .order_by(models.Issue.id)
+        .with_for_update()
+    ).all()
+    before = {row.id: row for row in rows}
+
+    if before:
+        db.execute(
+            update(models.Issue)
+            .where(models.Issue.id.in_(before))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        # Bypasses the flush listeners, so bump versions and caches here
+        bump_change_versions(db, project_ids=[project_id])
+    db.commit()
+    if before:
+        invalidate_project(project_id)
+    return before
+
+
+ISSUE_COPY_COLUMNS = (
+    "project_id",
+    "title",
+    "description",
+    "status",
+    "type",
+    "priority",
+    "assignee_id",
+)
+
+
+def _copy_value(value):
+    if value is None:
+        return None
+    return value.name if isinstance(value, enum.Enum) else value
+
+
+def insert_issue_rows(db: Session, rows: List[dict]):
+    """
+    Insert plain issue rows (ISSUE_COPY_COLUMNS keys) without the ORM:
+    COPY ... FROM STDIN on psycopg2, a single executemany INSERT
+    elsewhere. Flush listeners do not run, so callers bump change
+    versions and caches themselves.
+    """
+    if not rows:
+        return
+    if db.get_bind().dialect.driver != "psycopg2":
+        db.execute(models.Issue.__table__.insert(), rows)
+        return
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_copy_value(row[column]) for column in ISSUE_COPY_COLUMNS])
+    buffer.seek(0)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY issues ({', '.join(ISSUE_COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+def select_board(project_id: int, per_column: Optional[int] = None) -> Select:
+    """
+    Card columns of every issue in the project, numbered within its
+    status column (oldest first) and carrying that column's total, so
+    counts and the first `per_column` cards come back in one query.
+    """
+    issue = models.Issue
+    ranked = (
+        select(
+            issue.id,
+            issue.title,
+            issue.status,
+            issue.type,
+            issue.priority,
+            issue.assignee_id,
+            func.row_number()
+            .over(
+                partition_by=issue.status,
+                order_by=(issue.created_at.asc(), issue.id.asc()),
+            )
+            .label("position"),
+            func.count().over(partition_by=issue.status).label("total"),
+        )
+        .where(issue.project_id == project_id)
+        .subquery()
+    )
+
+    stmt = select(ranked)
+    if per_column is not None:
+        stmt = stmt.where(ranked.c.position <= per_column)
+    return stmt.order_by(ranked.c.status, ranked.c.position)
+
+
+def board_columns(rows) -> List[dict]:
+    """
+    Group select_board rows into one column per status, empty ones included.
+    """
+    columns = {
+        status: {"status": status, "count": 0, "issues": []}
+        for status in models.IssueStatus
+    }
+    for row in rows:
+        column = columns[row.status]
+        column["count"] = row.total
+        column["issues"].append(row)
+    return list(columns.values())
+
+
+def get_board(db: Session, project_id: int, per_column: Optional[int] = None) -> List[dict]:
+    return board_columns(db.execute(select_board(project_id, per_column)).all())
+
+
+# ---------- COMMENTS ----------
+
+def select_comment_tree(
+    issue_id: int,
+    parent_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+    limit: int = 20,
+    max_depth: int = 3,
+    replies: int = 5,
+) -> Select:
+    """
+    One page of the issue's threads: up to limit + 1 comments under
+    `parent_id` (top-level when None) after `after_id`, and their replies
+    down to `max_depth` levels, walked by a recursive CTE. Each row has
+    its depth, its direct reply count and its rank among its siblings;
+    replies ranked past `replies` are left out. The extra top-level row
+    only tells whether there is a next page, so its replies are not
+    walked. Ids follow creation order, so pages and siblings go by id.
+    """
+    comment = models.Comment
+    top = select(comment.id, comment.parent_id).where(comment.issue_id == issue_id)
+    if parent_id is None:
+        top = top.where(comment.parent_id.is_(None))
+    else:
+        top = top.where(comment.parent_id == parent_id)
+    if after_id is not None:
+        top = top.where(comment.id > after_id)
+    page = top.order_by(comment.id).limit(limit + 1).subquery()
+
+    tree = select(
+        page.c.id,
+        page.c.parent_id,
+        literal_column("0").label("depth"),
+        func.row_number().over(order_by=page.c.id).label("thread_rank"),
+    ).cte("comment_tree", recursive=True)
+    reply = aliased(comment)
+    tree = tree.union_all(
+        select(reply.id, reply.parent_id, tree.c.depth + 1, tree.c.thread_rank)
+        .join(tree, reply.parent_id == tree.c.id)
+        .where(
+            reply.issue_id == issue_id,
+            tree.c.depth < max_depth,
+            tree.c.thread_rank <= limit,
+        )
+    )
+
+    children = aliased(comment)
+    reply_count = (
+        select(func.count())
+        .where(children.parent_id == tree.c.id)
+        .scalar_subquery()
+    )
+    ranked = (
+        select(
+            comment,
+            tree.c.depth,
+            reply_count.label("reply_count"),
+            func.row_number()
+            .over(partition_by=tree.c.parent_id, order_by=tree.c.id)
+            .label("sibling_rank"),
+        )
+        .join(tree, tree.c.id == comment.id)
+        .subquery()
+    )
+    return (
+        select(ranked)
+        .where(or_(ranked.c.depth == 0, ranked.c.sibling_rank <= replies))
+        .order_by(ranked.c.depth, ranked.c.id)
+    )
+
+
+def comment_tree_page(rows, limit: int) -> dict:
+    """
+    Nest the rows of select_comment_tree in one pass; parents come
+    before their replies since rows are ordered by depth. Replies whose
+    parent was left out are dropped. A comment with more replies than it
+    shows gets a replies_cursor, from the start when none are shown
+    (e.g. at max_depth). Cursors hold only the id the keyset goes by.
+    """
+    nodes, items = {}, []
+    for row in rows:
+        node = dict(row._mapping)
+        del node["sibling_rank"]
+        node["replies"] = []
+        if row.depth == 0:
+            items.append(node)
+        elif row.parent_id in nodes:
+            nodes[row.parent_id]["replies"].append(node)
+        else:
+            continue
+        nodes[row.id] = node
+
+    for node in nodes.values():
+        shown = node["replies"]
+        if len(shown) < node["reply_count"]:
+            node["replies_cursor"] = encode_cursor(None, shown[-1]["id"] if shown else 0)
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(None, items[-1]["id"])
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def get_comment_tree(
+    db: Session,
+    issue_id: int,
+    parent_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+    limit: int = 20,
+    max_depth: int = 3,
+    replies: int = 5,
+) -> dict:
+    stmt = select_comment_tree(issue_id, parent_id, after_id, limit, max_depth, replies)
+    return comment_tree_page(db.execute(stmt), limit)
+
+
+# ---------- EXPORT ----------
+# Column selects (no ORM entities) for the streaming export; each is
+# ordered by primary key and read through a server-side cursor.
+
+def select_issue_export(project_id: int) -> Select:
+    return (
+        select(
+            models.Issue.id,
+            models.Issue.title,
+            models.Issue.description,
+            models.Issue.status,
+            models.Issue.type,
+            models.Issue.priority,
+            models.Issue.assignee_id,
+            models.Issue.created_at,
+        )
+        .where(models.Issue.project_id == project_id)
+        .order_by(models.Issue.id)
+    )
+
+
+def select_comment_export(project_id: int) -> Select:
+    return (
+        select(
+            models.Comment.id,
+            models.Comment.issue_id,
+            models.Comment.author_id,
+            models.Comment.parent_id,
+            models.Comment.content,
+            models.Comment.created_at,
+        )
+        .join(models.Issue, models.Issue.id == models.Comment.issue_id)
+        .where(models.Issue.project_id == project_id)
+        .order_by(models.Comment.id)
+    )
+
+
+def select_attachment_export(project_id: int) -> Select:
+    return (
+        select(
+            models.Attachment.id,
+            models.Attachment.issue_id,
+            models.Attachment.filename,
+            models.Attachment.url,
+            models.Attachment.size,
+            models.Attachment.mime_type,
+            models.Attachment.uploaded_at.label("created_at"),
+        )
+        .join(models.Issue, models.Issue.id == models.Attachment.issue_id)
+        .where(models.Issue.project_id == project_id)
+        .order_by(models.Attachment.id)
+    )
+
+
+def stream_rows(db: Session, stmt: Select, batch_size: int):
+    """
+    Yield the rows of `stmt` fetched `batch_size` at a time from a
+    server-side cursor, so memory stays flat however many rows match.
+    """
+    result = db.execute(stmt.execution_options(stream_results=True))
+    try:
+        for partition in result.partitions(batch_size):
+            yield from partition
+    finally:
+        result.close()
+
+
+# ---------- SEARCH ----------
+
+SEARCH_CONFIG = "english"
+SEARCH_SNIPPET_CHARS = 200
+
+
+def _search_after(hits, after: Optional[Tuple[Any, int]]):
+    """
+    Keyset condition for hits ordered by (rank desc, kind, id).
+    """
+    if after is None:
+        return None
+    (rank, kind), last_id = after
+    return or_(
+        hits.c.rank < rank,
+        and_(
+            hits.c.rank == rank,
+            or_(
+                hits.c.kind > kind,
+                and_(hits.c.kind == kind, hits.c.id > last_id),
+            ),
+        ),
+    )
+
+
+def _search_hits(issue_match, issue_rank, comment_match, comment_rank, user_id, project_id):
+    """
+    Issue and comment hits, as one (kind, id, issue_id, project_id,
+    title, body, rank) union, restricted to the user's projects.
+
+    The rank is cast to double precision: ts_rank_cd returns real, which
+    would not compare equal to the float8 a cursor carries back, so hits
+    tied with the last row of a page would be skipped.
+    """
+    def visible(stmt):
+        stmt = stmt.join(
+            models.ProjectMember,
+            and_(
+                models.ProjectMember.project_id == models.Issue.project_id,
+                models.ProjectMember.user_id == user_id,
+            ),
+        )
+        if project_id is not None:
+            stmt = stmt.where(models.Issue.project_id == project_id)
+        return stmt
+
+    issues = visible(
+        select(
+            literal("issue").label("kind"),
+            models.Issue.id.label("id"),
+            models.Issue.id.label("issue_id"),
+            models.Issue.project_id.label("project_id"),
+            models.Issue.title.label("title"),
+            func.coalesce(models.Issue.description, models.Issue.title).label("body"),
+            cast(issue_rank, Float(53)).label("rank"),
+        ).where(issue_match)
+    )
+    comments = visible(
+        select(
+            literal("comment").label("kind"),
+            models.Comment.id.label("id"),
+            models.Comment.issue_id.label("issue_id"),
+            models.Issue.project_id.label("project_id"),
+            models.Issue.title.label("title"),
+            models.Comment.content.label("body"),
+            cast(comment_rank, Float(53)).label("rank"),
+        )
+        .join(models.Issue, models.Issue.id == models.Comment.issue_id)
+        .where(comment_match)
+    )
+    return union_all(issues, comments).subquery("hits")
+
+
+def select_search_postgres(
+    q: str,
+    user_id: int,
+    project_id: Optional[int] = None,
+    after: Optional[Tuple[Any, int]] = None,
+    limit: int = 20,
+) -> Select:
+    """
+    Ranked full-text search over the generated search_vector columns and
+    their GIN indexes (see the full_text_search migration). Snippets are
+    only built for the rows of the returned page.
+    """
+    query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    issue_vector = literal_column("issues.search_vector")
+    comment_vector = literal_column("comments.search_vector")
+
+    hits = _search_hits(
+        issue_vector.op("@@")(query),
+        func.ts_rank_cd(issue_vector, query),
+        comment_vector.op("@@")(query),
+        func.ts_rank_cd(comment_vector, query),
+        user_id,
+        project_id,
+    )
+    page = select(hits)
+    condition = _search_after(hits, after)
+    if condition is not None:
+        page = page.where(condition)
+    page = (
+        page.order_by(hits.c.rank.desc(), hits.c.kind, hits.c.id)
+        .limit(limit)
+        .subquery("page")
+    )
+
+    return select(
+        page.c.kind,
+        page.c.id,
+        page.c.issue_id,
+        page.c.project_id,
+        page.c.title,
+        func.ts_headline(
+            SEARCH_CONFIG,
+            page.c.body,
+            query,
+            "MaxFragments=2, MaxWords=20, MinWords=5",
+        ).label("snippet"),
+        page.c.rank,
+    ).order_by(page.c.rank.desc(), page.c.kind, page.c.id)
+
+
+def select_search_fallback(
+    q: str,
+    user_id: int,
+    project_id: Optional[int] = None,
+    after: Optional[Tuple[Any, int]] = None,
+    limit: int = 20,
+) -> Select:
+    """
+    Portable stand-in for select_search_postgres (used on SQLite): every
+    word must appear somewhere, case-insensitively; title matches rank
+    above description matches.
+    """
+    terms = [t.lower() for t in q.split()] or [q.lower()]
+
+    def contains(column, term):
+        return func.lower(func.coalesce(column, "")).contains(term, autoescape=True)
+
+    def score(*weighted):
+        return sum(
+            case((contains(column, term), weight), else_=0)
+            for term in terms
+            for column, weight in weighted
+        )
+
+    issue_fields = (models.Issue.title, models.Issue.description)
+    hits = _search_hits(
+        and_(*(or_(*(contains(c, t) for c in issue_fields)) for t in terms)),
+        score((models.Issue.title, 2.0), (models.Issue.description, 1.0)),
+        and_(*(contains(models.Comment.content, t) for t in terms)),
+        score((models.Comment.content, 1.0)),
+        user_id,
+        project_id,
+    )
+    stmt = select(
+        hits.c.kind,
+        hits.c.id,
+        hits.c.issue_id,
+        hits.c.project_id,
+        hits.c.title,
+        func.substr(hits.c.body, 1, SEARCH_SNIPPET_CHARS).label("snippet"),
+        hits.c.rank,
+    )
+    condition = _search_after(hits, after)
+    if condition is not None:
+        stmt = stmt.where(condition)
+    return stmt.order_by(hits.c.rank.desc(), hits.c.kind, hits.c.id).limit(limit)
+
+
+def search(db: Session, q: str, user_id: int, **filters) -> List[Any]:
+    if db.get_bind().dialect.name == "postgresql":
+        stmt = select_search_postgres(q, user_id, **filters)
+    else:
+        stmt = select_search_fallback(q, user_id, **filters)
+    return db.execute(stmt).all()
+
+
+# ---------- ATTACHMENT BLOBS ----------
+
+def get_blob(
+    db: Session,
+    content_hash: str,
+    for_update: bool = False,
+) -> Optional[models.StorageBlob]:
+    query = db.query(models.StorageBlob).filter(
+        models.StorageBlob.content_hash == content_hash
+    )
+    if for_update:
+        query = query.with_for_update()
+    return query.first()
+
+
+def reference_blob(
+    db: Session,
+    content_hash: str,
+    size: int,
+    key: str,
+) -> Tuple[models.StorageBlob, bool]:
+    """
+    Take a reference on the blob for `content_hash`, registering `key` as
+    its object if this is the first copy. Returns (blob, created).
+
+    A new blob cancels any pending deletion of `key`; removing the outbox
+    rows waits for a worker that has claimed them, so once this commits
+    the key is safe to (re)write. Flushes without committing; the blob row
+    stays locked until the caller commits.
+    """
+    blob = get_blob(db, content_hash, for_update=True)
+    if blob is None:
+        try:
+            with db.begin_nested():
+                blob = models.StorageBlob(
+                    content_hash=content_hash,
+                    key=key,
+                    size=size,
+                    ref_count=1,
+                )
+                db.add(blob)
+                db.query(models.StorageDeletion).filter(
+                    models.StorageDeletion.key == key
+                ).delete(synchronize_session=False)
+            return blob, True
+        except IntegrityError:
+            # Lost a race with a concurrent first copy of the same content
+            blob = get_blob(db, content_hash, for_update=True)
+
+    blob.ref_count += 1
+    db.flush()
+    return blob, False
+
+
+def release_blob(db: Session, key: str) -> Optional[str]:
+    """
+    Drop one reference to the object at `key`. Returns the key once
+    nothing references it any more, for the caller to delete after
+    committing. Keys without a blob row predate deduplication and are
+    returned as-is.
+    """
+    blob = (
+        db.query(models.StorageBlob)
+        .filter(models.StorageBlob.key == key)
+        .with_for_update()
+        .first()
+    )
+    if blob is None:
+        return key
+
+    blob.ref_count -= 1
+    if blob.ref_count > 0:
+        return None
+    db.delete(blob)
+    return key
+
+
+def attachment_key_in_use(db: Session, key: str) -> bool:
+    """
+    Whether an attachment stores its object at `key`. Objects uploaded
+    before deduplication have no blob row, so this is their only guard.
+    """
+    query = db.query(models.Attachment.id).filter(models.Attachment.s3_key == key)
+    return query.first() is not None
+
+
+def enqueue_storage_deletion(db: Session, key: str) -> models.StorageDeletion:
+    """
+    Queue `key` for deletion by the outbox worker once the caller commits.
+    """
+    deletion = models.StorageDeletion(key=key, attempts=0)
+    db.add(deletion)
+    return deletion
@@ -0,0 +1,198 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
+
+from app import crud, models
+
+
+# Async counterparts of app.crud for DB_ASYNC mode. Queries come from
+# the shared crud.select_* builders.
+
+
+# ---------- USERS ----------
+
+async def get_user(db: AsyncSession, user_id: int) -> Optional[models.User]:
+    return await db.get(models.User, user_id)
+
+
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[models.User]:
+    result = await db.execute(crud.select_user_by_email(email))
+    return result.scalars().first()
+
+
+async def list_users(db: AsyncSession) -> List[models.User]:
+    result = await db.execute(select(models.User).order_by(models.User.id.asc()))
+    return result.scalars().all()
+
+
+# ---------- PROJECTS ----------
+
+async def create_project(
+    db: AsyncSession,
+    name: str,
+    description: Optional[str],
+    creator_id: int,
+    creator_role: models.RoleEnum,
+) -> models.Project:
+    project = models.Project(
+        name=name,
+        description=description,
+    )
+    db.add(project)
+    await db.flush()
+
+    db.add(
+        models.ProjectMember(
+            project_id=project.id,
+            user_id=creator_id,
+            role=creator_role,
+        )
+    )
+    await db.commit()
+    await db.refresh(project)
+    return project
+
+
+async def list_projects_for_user(db: AsyncSession, user_id: int) -> List[models.Project]:
+    result = await db.execute(
+        select(models.Project)
+        .join(models.ProjectMember, models.ProjectMember.project_id == models.Project.id)
+        .where(models.ProjectMember.user_id == user_id)
+    )
+    return result.scalars().all()
+
+
+async def is_project_member(
+    db: AsyncSession,
+    project_id: int,
+    user_id: int,
+) -> Optional[models.ProjectMember]:
+    result = await db.execute(crud.select_project_member(project_id, user_id))
+    return result.scalars().first()
+
+
+async def get_project_version(db: AsyncSession, project_id: int) -> Optional[int]:
+    result = await db.execute(crud.select_project_version(project_id))
+    return result.scalar()
+
+
+# ---------- ACCESS ----------
+
+async def get_issue_with_membership(
+    db: AsyncSession,
+    issue_id: int,
+    user_id: int,
+) -> Optional[Tuple[models.Issue, Optional[models.ProjectMember]]]:
+    result = await db.execute(crud.select_issue_with_membership(issue_id, user_id))
+    return result.first()
+
+
+async def get_comment_with_membership(
+    db: AsyncSession,
+    comment_id: int,
+    user_id: int,
+) -> Optional[Tuple[models.Comment, models.Issue, Optional[models.ProjectMember]]]:
+    result = await db.execute(crud.select_comment_with_membership(comment_id, user_id))
+    return result.first()
+
+
+# ---------- ISSUES ----------
+
+async def get_issue_detail(db: AsyncSession, issue_id: int) -> Optional[models.Issue]:
+    result = await db.execute(crud.select_issue_detail(issue_id))
+    return result.unique().scalars().first()
+
+
+async def create_issue(
+    db: AsyncSession,
+    project_id: int,
+    title: str,
+    description: Optional[str],
+    type_: models.IssueTypeEnum,
+    priority: int,
+    assignee_id: Optional[int] = None,
+) -> models.Issue:
+    issue = models.Issue(
+        title=title,
+        description=description,
+        type=type_,
+        priority=priority,
+        project_id=project_id,
+        assignee_id=assignee_id,
+    )
+    db.add(issue)
+    await db.commit()
+    await db.refresh(issue)
+    return issue
+
+
+async def list_issues_for_project(
+    db: AsyncSession,
+    project_id: int,
+    **filters,
+) -> List[models.Issue]:
+    result = await db.execute(crud.select_issues_for_project(project_id, **filters))
+    return result.scalars().all()
+
+
+async def get_board(
+    db: AsyncSession,
+    project_id: int,
+    per_column: Optional[int] = None,
+) -> List[dict]:
+    result = await db.execute(crud.select_board(project_id, per_column))
+    return crud.board_columns(result.all())
+
+
+async def update_issue_status(
+    db: AsyncSession,
+    issue: models.Issue,
+    status: models.IssueStatus,
+) -> models.Issue:
+    issue.status = status
+    await db.commit()
+    await db.refresh(issue)
+    return issue
+
+
+# ---------- COMMENTS ----------
+
+async def create_comment(
+    db: AsyncSession,
+    issue_id: int,
+    author_id: int,
+    content: str,
+    parent_id: Optional[int] = None,
+) -> models.Comment:
+    comment = models.Comment(
+        issue_id=issue_id,
+        author_id=author_id,
+        content=content,
+        parent_id=parent_id,
+    )
+    db.add(comment)
+    await db.commit()
+    await db.refresh(comment)
+    return comment
+
+
+async def list_comments(db: AsyncSession, issue_id: int) -> List[models.Comment]:
+    result = await db.execute(
+        select(models.Comment)
+        .where(models.Comment.issue_id == issue_id)
+        .order_by(models.Comment.created_at.asc())
+    )
+    return result.scalars().all()
+
+
+async def get_comment_tree(
+    db: AsyncSession,
+    issue_id: int,
+    parent_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+    limit: int = 20,
+    max_depth: int = 3,
+    replies: int = 5,
+) -> dict:
+    stmt = crud.select_comment_tree(issue_id, parent_id, after_id, limit, max_depth, replies)
+    return crud.comment_tree_page(await db.execute(stmt), limit)
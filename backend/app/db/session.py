@@ -1,11 +1,50 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 
+# SQLAlchemy driver used for each backend when DB_ASYNC is enabled.
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def _engine_options(url) -> dict:
+    options = {"pool_pre_ping": True}
+    if url.get_backend_name() != "sqlite":
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+    return options
+
+
+def _connect_args(url) -> dict:
+    timeout = settings.DB_STATEMENT_TIMEOUT_MS
+    if not timeout or url.get_backend_name() != "postgresql":
+        return {}
+    if url.get_driver_name() == "asyncpg":
+        return {"server_settings": {"statement_timeout": str(timeout)}}
+    return {"options": f"-c statement_timeout={timeout}"}
+
+
+def async_database_url(database_url: str) -> str:
+    url = make_url(database_url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise RuntimeError(f"No async driver for {url.get_backend_name()}")
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+_url = make_url(settings.DATABASE_URL)
 engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
+    _url,
+    connect_args=_connect_args(_url),
+    **_engine_options(_url),
 )
 
 SessionLocal = sessionmaker(
@@ -20,4 +59,33 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# ---------- ASYNC (DB_ASYNC=true) ----------
+
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.DB_ASYNC:
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    _async_url = make_url(
+        settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+    )
+    async_engine = create_async_engine(
+        _async_url,
+        connect_args=_connect_args(_async_url),
+        **_engine_options(_async_url),
+    )
+    AsyncSessionLocal = sessionmaker(
+        async_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
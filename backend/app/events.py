@@ -0,0 +1,150 @@
+from typing import List, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+
+from app import models, schemas
+from app.api.websockets import manager
+
+
+# ---------- BOARD DELTA EVENTS ----------
+# Published by the REST handlers after their transaction commits. Every
+# event carries a "type" ("<entity>:<change>") and the project id so
+# boards can patch local state instead of refetching the whole list.
+
+def _publish(
+    project_id: int,
+    event: dict,
+    coalesce_key: str = None,
+    fallback: Optional[dict] = None,
+):
+    """
+    An event too large for the broker (PostgreSQL NOTIFY caps payloads
+    at 8000 bytes) is replaced by `fallback`, its ID-only form, or else
+    by "board:stale", so clients always hear of the change.
+    """
+    candidates = [(event, coalesce_key), (fallback, None), ({"type": "board:stale"}, None)]
+    for candidate, key in candidates:
+        if candidate is None:
+            continue
+        candidate["project_id"] = project_id
+        data = jsonable_encoder(candidate)
+        if manager.fits(project_id, data, key):
+            manager.publish(project_id, data, key)
+            return
+
+
+def issue_created(issue: models.Issue):
+    _publish(
+        issue.project_id,
+        {"type": "issue:created", "issue": schemas.IssueOut.from_orm(issue)},
+    )
+
+
+def issue_moved(issue: models.Issue, from_status: models.IssueStatus):
+    _publish(
+        issue.project_id,
+        {
+            "type": "issue:moved",
+            "issue_id": issue.id,
+            "from": from_status,
+            "to": issue.status,
+        },
+        coalesce_key=f"issue:{issue.id}:status",
+    )
+
+
+def issue_deleted(project_id: int, issue_id: int):
+    _publish(project_id, {"type": "issue:deleted", "issue_id": issue_id})
+
+
+# Bulk operations publish one event per request. One that is too large
+# for the broker becomes a "board:stale" hint (see _publish) and clients
+# refetch the board.
+
+def board_stale(project_id: int):
+    _publish(project_id, {"type": "board:stale"})
+
+
+def issues_created(project_id: int, issues: List[models.Issue]):
+    _publish(
+        project_id,
+        {
+            "type": "issues:created",
+            "issues": [schemas.IssueCard.from_orm(issue) for issue in issues],
+        },
+    )
+
+
+def issues_moved(
+    project_id: int,
+    moves: List[Tuple[int, models.IssueStatus]],
+    to_status: models.IssueStatus,
+):
+    """
+    `moves` are (issue id, previous status) pairs.
+    """
+    _publish(
+        project_id,
+        {
+            "type": "issues:moved",
+            "moves": [{"issue_id": issue_id, "from": from_status} for issue_id, from_status in moves],
+            "to": to_status,
+        },
+    )
+
+
+def issues_assigned(project_id: int, issue_ids: List[int], assignee_id: Optional[int]):
+    _publish(
+        project_id,
+        {"type": "issues:assigned", "issue_ids": issue_ids, "assignee_id": assignee_id},
+    )
+
+
+def comment_added(project_id: int, comment: models.Comment):
+    _publish(
+        project_id,
+        {
+            "type": "comment:added",
+            "issue_id": comment.issue_id,
+            "comment": schemas.CommentOut.from_orm(comment),
+        },
+        fallback={
+            "type": "comment:added",
+            "issue_id": comment.issue_id,
+            "comment_id": comment.id,
+        },
+    )
+
+
+def comment_deleted(project_id: int, issue_id: int, comment_id: int):
+    _publish(
+        project_id,
+        {"type": "comment:deleted", "issue_id": issue_id, "comment_id": comment_id},
+    )
+
+
+def attachment_added(project_id: int, attachment: models.Attachment):
+    _publish(
+        project_id,
+        {
+            "type": "attachment:added",
+            "issue_id": attachment.issue_id,
+            "attachment": schemas.AttachmentOut.from_orm(attachment),
+        },
+        fallback={
+            "type": "attachment:added",
+            "issue_id": attachment.issue_id,
+            "attachment_id": attachment.id,
+        },
+    )
+
+
+def attachment_deleted(project_id: int, issue_id: int, attachment_id: int):
+    _publish(
+        project_id,
+        {
+            "type": "attachment:deleted",
+            "issue_id": issue_id,
+            "attachment_id": attachment_id,
+        },
+    )
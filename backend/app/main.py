@@ -1,8 +1,12 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api import auth, projects, issues, comments, attachments, websockets, users
+from app.api import auth, projects, issues, comments, attachments, websockets, users, search, exports, imports
 from app.core.config import settings
+from app.core.principals import principal_cache
+from app.utils.outbox import deletion_worker
+from app.utils.pubsub import broker
+from app.utils.response_cache import response_cache
 
 app = FastAPI(
     title="TrackSys API",
@@ -19,6 +23,14 @@ app.add_middleware(
 )
 
 # ---------- ROUTERS ----------
+if settings.DB_ASYNC:
+    from app.api import async_routes
+
+    # Registered first so the AsyncSession handlers win for the paths they
+    # cover; everything else falls through to the sync routers below.
+    for router in async_routes.routers:
+        app.include_router(router)
+
 app.include_router(auth.router)
 app.include_router(projects.router)
 app.include_router(issues.router)
@@ -26,8 +38,43 @@ app.include_router(comments.router)
 app.include_router(attachments.router)
 app.include_router(websockets.router)  # /ws/...
 app.include_router(users.router)
+app.include_router(search.router)
+app.include_router(exports.router)
+app.include_router(imports.router)
+
+# ---------- LIFECYCLE ----------
+@app.on_event("startup")
+async def start_event_broker():
+    await broker.start()
+
+
+@app.on_event("startup")
+async def start_deletion_worker():
+    await deletion_worker.start()
+
+
+@app.on_event("shutdown")
+async def stop_event_broker():
+    await broker.stop()
+
+
+@app.on_event("shutdown")
+async def stop_deletion_worker():
+    await deletion_worker.stop()
+
 
 # ---------- HEALTH CHECK ----------
 @app.get("/", tags=["Health"])
 def root():
     return {"app": "TrackSys", "status": "ok"}
+
+
+@app.get("/metrics/cache", tags=["Health"])
+def cache_metrics():
+    """
+    Hit/miss counters of this worker's in-memory caches.
+    """
+    return {
+        "responses": response_cache.stats(),
+        "principals": principal_cache.stats(),
+    }
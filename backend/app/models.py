@@ -1,4 +1,5 @@
 from sqlalchemy import (
+    BigInteger,
     Column,
     Integer,
     String,
@@ -7,6 +8,7 @@ from sqlalchemy import (
     DateTime,
     Enum,
     Boolean,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -46,6 +48,8 @@ class User(Base):
     full_name = Column(String, nullable=True)
     role = Column(Enum(RoleEnum), default=RoleEnum.developer, nullable=False)
     is_active = Column(Boolean, default=True)
+    # Bumped to revoke every token issued so far (carried as the "ver" claim).
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     memberships = relationship(
@@ -64,6 +68,8 @@ class Project(Base):
     name = Column(String, index=True, nullable=False)
     description = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Bumped whenever one of the project's issues changes; see app.utils.etags
+    change_version = Column(BigInteger, nullable=False, default=0, server_default="0")
 
     members = relationship(
         "ProjectMember",
@@ -79,6 +85,15 @@ class Project(Base):
 
 class ProjectMember(Base):
     __tablename__ = "project_members"
+    __table_args__ = (
+        Index(
+            "ix_project_members_project_id_user_id",
+            "project_id",
+            "user_id",
+            unique=True,
+        ),
+        Index("ix_project_members_user_id", "user_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
@@ -91,6 +106,12 @@ class ProjectMember(Base):
 
 class Issue(Base):
     __tablename__ = "issues"
+    __table_args__ = (
+        Index("ix_issues_project_id_status", "project_id", "status"),
+        Index("ix_issues_project_id_created_at", "project_id", "created_at", "id"),
+        Index("ix_issues_project_id_priority", "project_id", "priority", "id"),
+        Index("ix_issues_assignee_id", "assignee_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True, nullable=False)
@@ -106,10 +127,13 @@ class Issue(Base):
         default=IssueTypeEnum.task,
         nullable=False,
     )
-    priority = Column(Integer, default=3)
+    # Part of the (priority, id) keyset, which has no place for NULLs
+    priority = Column(Integer, nullable=False, default=3, server_default="3")
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
     assignee_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Bumped whenever a comment or attachment of the issue changes
+    change_version = Column(BigInteger, nullable=False, default=0, server_default="0")
 
     project = relationship("Project", back_populates="issues")
     assignee = relationship("User", back_populates="issues_assigned")
@@ -117,16 +141,24 @@ class Issue(Base):
         "Comment",
         back_populates="issue",
         cascade="all, delete-orphan",
+        order_by="[Comment.created_at, Comment.id]",
     )
     attachments = relationship(
         "Attachment",
         back_populates="issue",
         cascade="all, delete-orphan",
+        order_by="[Attachment.uploaded_at, Attachment.id]",
     )
 
 
 class Comment(Base):
     __tablename__ = "comments"
+    __table_args__ = (
+        Index("ix_comments_issue_id_created_at", "issue_id", "created_at"),
+        # Top-level threads of an issue, and the replies of a comment
+        Index("ix_comments_issue_id_parent_id", "issue_id", "parent_id", "id"),
+        Index("ix_comments_parent_id", "parent_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     issue_id = Column(Integer, ForeignKey("issues.id"), nullable=False)
@@ -142,12 +174,58 @@ class Comment(Base):
 
 class Attachment(Base):
     __tablename__ = "attachments"
+    __table_args__ = (
+        Index("ix_attachments_issue_id", "issue_id"),
+        Index("ix_attachments_issue_id_upload_key", "issue_id", "upload_key", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     issue_id = Column(Integer, ForeignKey("issues.id"), nullable=False)
     filename = Column(String, nullable=False)
     s3_key = Column(String, nullable=False)
+    # Key a client uploaded to directly; differs from s3_key when the
+    # content was folded into an existing blob
+    upload_key = Column(String, nullable=True)
     url = Column(String, nullable=False)
+    size = Column(BigInteger, nullable=True)
+    content_hash = Column(String(64), nullable=True)
+    mime_type = Column(String, nullable=True)
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    thumbnail_key = Column(String, nullable=True)
+    thumbnail_url = Column(String, nullable=True)
     uploaded_at = Column(DateTime(timezone=True), server_default=func.now())
 
-    issue = relationship("Issue", back_populates="attachments")
\ No newline at end of file
+    issue = relationship("Issue", back_populates="attachments")
+
+
+class StorageBlob(Base):
+    """
+    One stored object per distinct content; attachments with the same
+    content_hash share it and ref_count tracks how many do.
+    """
+    __tablename__ = "storage_blobs"
+
+    content_hash = Column(String(64), primary_key=True)
+    key = Column(String, nullable=False, unique=True)
+    size = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class StorageDeletion(Base):
+    """
+    Outbox of storage objects to delete, drained by
+    app.utils.outbox.StorageDeletionWorker.
+    """
+    __tablename__ = "storage_deletions"
+    __table_args__ = (
+        Index("ix_storage_deletions_next_attempt_at", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    key = Column(String, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
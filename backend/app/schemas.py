@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, conlist
+from typing import Dict, Optional, List
 from enum import Enum
 from datetime import datetime
 
@@ -24,6 +24,13 @@ class IssueTypeEnum(str, Enum):
     feature = "feature"
 
 
+class IssueSortEnum(str, Enum):
+    created_at = "created_at"
+    created_at_desc = "-created_at"
+    priority = "priority"
+    priority_desc = "-priority"
+
+
 # ---------- USER ----------
 
 class UserCreate(BaseModel):
@@ -86,6 +93,29 @@ class IssueCreate(BaseModel):
     assignee_id: Optional[int] = None
 
 
+class IssueCard(BaseModel):
+    id: int
+    title: str
+    status: IssueStatusEnum
+    type: IssueTypeEnum
+    priority: int
+    assignee_id: Optional[int]
+
+    class Config:
+        orm_mode = True
+
+
+class BoardColumn(BaseModel):
+    status: IssueStatusEnum
+    count: int
+    issues: List[IssueCard]
+
+
+class BoardOut(BaseModel):
+    project_id: int
+    columns: List[BoardColumn]
+
+
 class IssueOut(BaseModel):
     id: int
     title: str
@@ -101,6 +131,44 @@ class IssueOut(BaseModel):
         orm_mode = True
 
 
+class IssuePage(BaseModel):
+    items: List[IssueOut]
+    next_cursor: Optional[str] = None
+
+
+# Requests larger than this are rejected with 422; split them client side.
+BULK_MAX_ITEMS = 1000
+
+
+class IssueBulkCreate(BaseModel):
+    items: conlist(IssueCreate, min_items=1, max_items=BULK_MAX_ITEMS)
+
+
+class IssueBulkStatus(BaseModel):
+    issue_ids: conlist(int, min_items=1, max_items=BULK_MAX_ITEMS)
+    status: IssueStatusEnum
+
+
+class IssueBulkAssign(BaseModel):
+    issue_ids: conlist(int, min_items=1, max_items=BULK_MAX_ITEMS)
+    assignee_id: Optional[int] = None
+
+
+class IssueBulkResult(BaseModel):
+    """
+    Outcome for the request item at `index`; `issue` is set for creates.
+    """
+    index: int
+    id: Optional[int] = None
+    ok: bool
+    error: Optional[str] = None
+    issue: Optional[IssueOut] = None
+
+
+class IssueBulkOut(BaseModel):
+    results: List[IssueBulkResult]
+
+
 # ---------- COMMENT ----------
 
 class CommentCreate(BaseModel):
@@ -120,13 +188,78 @@ class CommentOut(BaseModel):
         orm_mode = True
 
 
+class CommentNode(CommentOut):
+    """
+    A comment in a thread. `depth` counts from the requested level (0);
+    when `reply_count` exceeds len(`replies`), fetch the rest from
+    /comments/{id}/replies, passing `replies_cursor` if it is set.
+    """
+    depth: int
+    reply_count: int
+    replies: List["CommentNode"] = []
+    replies_cursor: Optional[str] = None
+
+
+CommentNode.update_forward_refs()
+
+
+class CommentThreadPage(BaseModel):
+    items: List[CommentNode]
+    next_cursor: Optional[str] = None
+
+
+# ---------- SEARCH ----------
+
+class SearchHitKind(str, Enum):
+    issue = "issue"
+    comment = "comment"
+
+
+class SearchHit(BaseModel):
+    kind: SearchHitKind
+    id: int
+    issue_id: int
+    project_id: int
+    title: str
+    snippet: Optional[str]
+    rank: float
+
+    class Config:
+        orm_mode = True
+
+
+class SearchPage(BaseModel):
+    items: List[SearchHit]
+    next_cursor: Optional[str] = None
+
+
 # ---------- ATTACHMENT ----------
 
 class AttachmentCreate(BaseModel):
     issue_id: int
     filename: str
     key: str
-    url: str
+    # Ignored: the URL is derived from the storage backend
+    url: Optional[str] = None
+
+
+class AttachmentUploadRequest(BaseModel):
+    filename: str
+    content_type: Optional[str] = None
+    size: Optional[int] = None
+
+
+class AttachmentUploadTicket(BaseModel):
+    key: str
+    upload_url: str
+    method: str
+    headers: Dict[str, str]
+    token: str
+    expires_in: int
+
+
+class AttachmentUploadComplete(BaseModel):
+    token: str
 
 
 class AttachmentOut(BaseModel):
@@ -134,7 +267,70 @@ class AttachmentOut(BaseModel):
     issue_id: int
     filename: str
     url: str
+    size: Optional[int] = None
+    content_hash: Optional[str] = None
+    mime_type: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    thumbnail_url: Optional[str] = None
     uploaded_at: datetime
 
     class Config:
         orm_mode = True
+
+
+# ---------- ISSUE DETAIL ----------
+
+class CommentWithAuthor(CommentOut):
+    author: UserOut
+
+
+class IssueDetail(IssueOut):
+    """
+    An issue with its assignee, comments (oldest first, with authors) and
+    attachments, as the issue modal shows it.
+    """
+    assignee: Optional[UserOut]
+    comments: List[CommentWithAuthor]
+    attachments: List[AttachmentOut]
+
+
+# ---------- EXPORT ----------
+
+class ExportFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+class ExportInclude(str, Enum):
+    comments = "comments"
+    attachments = "attachments"
+
+
+# ---------- IMPORT ----------
+
+class ImportFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+    jira = "jira"
+
+
+class IssueImport(IssueCreate):
+    """
+    One imported row: an IssueCreate plus the fields a migration carries
+    over. The assignee is given by email (or by id on this server).
+    """
+    status: IssueStatusEnum = IssueStatusEnum.todo
+    assignee_email: Optional[EmailStr] = None
+
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+
+class ImportReport(BaseModel):
+    processed: int = 0
+    imported: int = 0
+    failed: int = 0
+    errors: List[ImportRowError] = []
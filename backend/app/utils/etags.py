@@ -0,0 +1,90 @@
+import hashlib
+from typing import Dict, Iterable, Optional, Set
+
+from fastapi import Request
+from fastapi.responses import Response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import models
+
+
+def weak_etag(*parts) -> str:
+    return 'W/"' + "-".join(str(part) for part in parts) + '"'
+
+
+def params_digest(*params) -> str:
+    """
+    Short digest of the query parameters behind a filtered or paged list,
+    so each page or filter gets its own ETag.
+    """
+    return hashlib.sha1(repr(params).encode()).hexdigest()[:16]
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def if_none_match(request: Request, etag: Optional[str]) -> bool:
+    """
+    Weak comparison of `etag` against the request's If-None-Match.
+    """
+    header = request.headers.get("if-none-match")
+    if not header or not etag:
+        return False
+    if header.strip() == "*":
+        return True
+    return _opaque(etag) in {_opaque(tag) for tag in header.split(",")}
+
+
+def etag_headers(etag: str) -> Dict[str, str]:
+    # Browsers keep the body but revalidate it on every request
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=etag_headers(etag))
+
+
+# ---------- CHANGE VERSIONS ----------
+
+def _bump(session, table, ids: Iterable[int]):
+    ids = sorted(set(ids))
+    if ids:
+        session.execute(
+            table.update()
+            .where(table.c.id.in_(ids))
+            .values(change_version=table.c.change_version + 1)
+        )
+
+
+def bump_change_versions(
+    session,
+    project_ids: Iterable[int] = (),
+    issue_ids: Iterable[int] = (),
+):
+    """
+    Bump the version behind the ETag of a project's issue list or an
+    issue's comment/attachment lists. Done with an UPDATE ... SET
+    change_version = change_version + 1 so concurrent writers never lose
+    a bump. Bulk statements that bypass the ORM call this themselves.
+    """
+    _bump(session, models.Project.__table__, project_ids)
+    _bump(session, models.Issue.__table__, issue_ids)
+
+
+@event.listens_for(Session, "before_flush")
+def _bump_change_versions(session, flush_context, instances):
+    project_ids: Set[int] = set()
+    issue_ids: Set[int] = set()
+    changed = list(session.new) + list(session.deleted) + [
+        obj for obj in session.dirty if session.is_modified(obj, include_collections=False)
+    ]
+    for obj in changed:
+        if isinstance(obj, models.Issue) and obj.project_id is not None:
+            project_ids.add(obj.project_id)
+        elif isinstance(obj, (models.Comment, models.Attachment)) and obj.issue_id is not None:
+            issue_ids.add(obj.issue_id)
+
+    bump_change_versions(session, project_ids, issue_ids)
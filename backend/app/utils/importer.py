@@ -0,0 +1,297 @@
+import csv
+import io
+import json
+import logging
+import os
+from itertools import islice
+from typing import Callable, Iterator, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import crud, events, models, schemas
+from app.core.config import settings
+from app.utils.etags import bump_change_versions
+from app.utils.response_cache import invalidate_project
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK_SIZE = 64 * 1024
+
+EXTENSIONS = {
+    ".csv": schemas.ImportFormat.csv,
+    ".ndjson": schemas.ImportFormat.ndjson,
+    ".jsonl": schemas.ImportFormat.ndjson,
+    ".json": schemas.ImportFormat.jira,
+}
+
+
+class ImportFileError(ValueError):
+    """
+    The input as a whole cannot be read (bad encoding or JSON structure).
+    Problems with single rows are reported per row instead.
+    """
+
+
+def guess_format(filename: Optional[str]) -> schemas.ImportFormat:
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension not in EXTENSIONS:
+        raise ImportFileError("Cannot tell the import format; pass format=csv|ndjson|jira")
+    return EXTENSIONS[extension]
+
+
+# ---------- READERS ----------
+# Each yields (row number, raw dict or exception) without loading the
+# whole input. Rows of other record kinds in our own exports are skipped.
+
+def _csv_rows(text) -> Iterator[Tuple[int, object]]:
+    for number, row in enumerate(csv.DictReader(text), start=1):
+        yield number, row
+
+
+def _ndjson_rows(text) -> Iterator[Tuple[int, object]]:
+    for number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError as exc:
+            yield number, exc
+
+
+def _json_array_items(text) -> Iterator[object]:
+    """
+    Yield the items of a top-level JSON array, or of the "issues" array of
+    a JIRA search/export document, decoding one item at a time.
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = "", 0, False
+
+    def fill():
+        nonlocal buffer, pos, eof
+        chunk = text.read(READ_CHUNK_SIZE)
+        eof = not chunk
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    def skip(chars):
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in chars:
+                pos += 1
+            if pos < len(buffer) or eof:
+                return
+            fill()
+
+    fill()
+    skip(" \t\r\n")
+    if buffer[pos:pos + 1] == "{":
+        while True:
+            start = buffer.find('"issues"', pos)
+            if start != -1:
+                pos = start + len('"issues"')
+                skip(" \t\r\n:")
+                break
+            if eof:
+                raise ImportFileError('JIRA JSON has no "issues" array')
+            pos = max(pos, len(buffer) - len('"issues"'))
+            fill()
+    if buffer[pos:pos + 1] != "[":
+        raise ImportFileError("Expected a JSON array of issues")
+    pos += 1
+
+    while True:
+        skip(" \t\r\n,")
+        if buffer[pos:pos + 1] == "]":
+            return
+        if pos >= len(buffer):
+            raise ImportFileError("Unexpected end of JSON input")
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except ValueError:
+            if eof:
+                raise ImportFileError("Malformed JSON input")
+            fill()
+            continue
+        pos = end
+        yield item
+
+
+JIRA_TYPES = {
+    "bug": schemas.IssueTypeEnum.bug,
+    "story": schemas.IssueTypeEnum.feature,
+    "feature": schemas.IssueTypeEnum.feature,
+    "new feature": schemas.IssueTypeEnum.feature,
+    "improvement": schemas.IssueTypeEnum.feature,
+    "epic": schemas.IssueTypeEnum.feature,
+}
+JIRA_PRIORITIES = {"highest": 1, "high": 2, "medium": 3, "low": 4, "lowest": 5}
+JIRA_STATUS_CATEGORIES = {
+    "new": schemas.IssueStatusEnum.todo,
+    "indeterminate": schemas.IssueStatusEnum.in_progress,
+    "done": schemas.IssueStatusEnum.done,
+}
+
+
+def _jira_text(value) -> Optional[str]:
+    # API v3 descriptions are Atlassian Document Format trees
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        text = value.get("text", "")
+        children = "".join(_jira_text(child) or "" for child in value.get("content", []))
+        suffix = "\n" if value.get("type") == "paragraph" else ""
+        return text + children + suffix
+    return str(value)
+
+
+def jira_issue(item: dict) -> dict:
+    fields = item.get("fields") or {}
+
+    def name(key: str) -> str:
+        return ((fields.get(key) or {}).get("name") or "").lower()
+
+    category = ((fields.get("status") or {}).get("statusCategory") or {}).get("key")
+
+    row = {
+        "title": fields.get("summary"),
+        "description": _jira_text(fields.get("description")),
+        "type": JIRA_TYPES.get(name("issuetype"), schemas.IssueTypeEnum.task),
+        "status": JIRA_STATUS_CATEGORIES.get(category, schemas.IssueStatusEnum.todo),
+        "assignee_email": (fields.get("assignee") or {}).get("emailAddress"),
+    }
+    if name("priority") in JIRA_PRIORITIES:
+        row["priority"] = JIRA_PRIORITIES[name("priority")]
+    return row
+
+
+def _jira_rows(text) -> Iterator[Tuple[int, object]]:
+    for number, item in enumerate(_json_array_items(text), start=1):
+        yield number, jira_issue(item) if isinstance(item, dict) else ValueError("Not an object")
+
+
+READERS = {
+    schemas.ImportFormat.csv: _csv_rows,
+    schemas.ImportFormat.ndjson: _ndjson_rows,
+    schemas.ImportFormat.jira: _jira_rows,
+}
+
+
+# ---------- VALIDATION ----------
+
+def _clean(raw: dict) -> dict:
+    # Blank CSV cells mean "not given", so schema defaults apply
+    return {
+        key: value
+        for key, value in raw.items()
+        if key is not None and value is not None and value != ""
+    }
+
+
+def _error(exc: Exception) -> str:
+    if isinstance(exc, ValidationError):
+        first = exc.errors()[0]
+        return f"{'.'.join(str(part) for part in first['loc'])}: {first['msg']}"
+    return str(exc)
+
+
+def _issue_row(project_id: int, raw, emails: dict, user_ids: set) -> dict:
+    if isinstance(raw, Exception):
+        raise raw
+    if not isinstance(raw, dict):
+        raise ValueError("Not an object")
+    item = schemas.IssueImport.parse_obj(_clean(raw))
+    if not item.title.strip():
+        raise ValueError("title: must not be blank")
+
+    assignee_id = item.assignee_id
+    if item.assignee_email:
+        assignee_id = emails.get(item.assignee_email.lower())
+        if assignee_id is None:
+            raise ValueError(f"Unknown assignee {item.assignee_email}")
+    elif assignee_id is not None and assignee_id not in user_ids:
+        raise ValueError("Assignee user not found")
+
+    return {
+        "project_id": project_id,
+        "title": item.title,
+        "description": item.description or None,
+        "status": models.IssueStatus(item.status.value),
+        "type": models.IssueTypeEnum(item.type.value),
+        "priority": item.priority,
+        "assignee_id": assignee_id,
+    }
+
+
+# ---------- IMPORT ----------
+
+def import_issues(
+    db: Session,
+    project_id: int,
+    fileobj,
+    format: schemas.ImportFormat,
+    batch_size: Optional[int] = None,
+    progress: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """
+    Stream `fileobj` (binary) into the project's issues. Rows are
+    validated against schemas.IssueImport and written batch_size at a
+    time, each batch in its own transaction; invalid rows are counted
+    and the first IMPORT_MAX_ERRORS are listed. `progress` gets the
+    running report after every batch.
+    """
+    batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+    report = schemas.ImportReport().dict()
+
+    # Users are few next to issues: resolve every assignee from one query
+    emails, user_ids = {}, set()
+    for user_id, email in db.execute(select(models.User.id, models.User.email)):
+        emails[email.lower()] = user_id
+        user_ids.add(user_id)
+
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    try:
+        rows = (
+            (number, raw)
+            for number, raw in READERS[format](text)
+            if not (isinstance(raw, dict) and raw.get("record") not in (None, "", "issue"))
+        )
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+
+            valid = []
+            for number, raw in batch:
+                try:
+                    valid.append(_issue_row(project_id, raw, emails, user_ids))
+                except (ValueError, TypeError) as exc:
+                    report["failed"] += 1
+                    if len(report["errors"]) < settings.IMPORT_MAX_ERRORS:
+                        report["errors"].append({"row": number, "error": _error(exc)})
+
+            if valid:
+                crud.insert_issue_rows(db, valid)
+                bump_change_versions(db, project_ids=[project_id])
+                db.commit()
+                invalidate_project(project_id)
+
+            report["processed"] += len(batch)
+            report["imported"] += len(valid)
+            logger.info(
+                "Import into project %s: %d processed, %d imported",
+                project_id,
+                report["processed"],
+                report["imported"],
+            )
+            if progress is not None:
+                progress(report)
+    except UnicodeDecodeError as exc:
+        raise ImportFileError(f"Input is not UTF-8: {exc}")
+    finally:
+        text.detach()
+
+    if report["imported"]:
+        events.board_stale(project_id)
+    return report
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app import crud, models
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.utils.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_storage_deletions(session, flush_context, instances):
+    """
+    Queue the objects of deleted attachments, including those removed by
+    an issue or project delete cascading, in the same transaction.
+    """
+    for obj in list(session.deleted):
+        if isinstance(obj, models.Attachment):
+            key = crud.release_blob(session, obj.s3_key)
+            if key is not None:
+                crud.enqueue_storage_deletion(session, key)
+                if obj.thumbnail_key:
+                    crud.enqueue_storage_deletion(session, obj.thumbnail_key)
+
+
+class StorageDeletionWorker:
+    """
+    Drains the storage_deletions outbox in batches. Rows are claimed with
+    FOR UPDATE SKIP LOCKED, so every API process can run a worker; failed
+    batches are retried with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        batch_size: Optional[int] = None,
+        interval: Optional[float] = None,
+        max_backoff: Optional[int] = None,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.STORAGE_DELETE_BATCH_SIZE
+        self.interval = interval or settings.STORAGE_DELETE_INTERVAL_SECONDS
+        self.max_backoff = max_backoff or settings.STORAGE_DELETE_MAX_BACKOFF_SECONDS
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                claimed = await run_in_threadpool(self.run_once)
+            except Exception:
+                logger.exception("Storage deletion batch failed")
+                claimed = 0
+            if claimed < self.batch_size:
+                await asyncio.sleep(self.interval)
+
+    def backoff(self, attempts: int) -> float:
+        return min(self.max_backoff, self.interval * 2 ** (attempts - 1))
+
+    def run_once(self) -> int:
+        """
+        Process one batch of due deletions; returns how many were claimed.
+
+        The claimed rows stay locked until the batch commits. A new blob
+        for one of the keys deletes those rows first, which waits for this
+        batch, so the live check below cannot miss an upload that is about
+        to write the key.
+        """
+        db = self.session_factory()
+        try:
+            rows = (
+                db.query(models.StorageDeletion)
+                .filter(models.StorageDeletion.next_attempt_at <= func.now())
+                .order_by(models.StorageDeletion.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            if not rows:
+                return 0
+
+            keys = {row.key for row in rows}
+            # Keys a blob took over again, or that attachments from before
+            # deduplication still store their object at
+            live = {
+                key
+                for (key,) in db.query(models.StorageBlob.key).filter(
+                    models.StorageBlob.key.in_(keys)
+                )
+            } | {
+                key
+                for (key,) in db.query(models.Attachment.s3_key).filter(
+                    models.Attachment.s3_key.in_(keys)
+                )
+            } | {
+                key
+                for (key,) in db.query(models.Attachment.thumbnail_key).filter(
+                    models.Attachment.thumbnail_key.in_(keys)
+                )
+            }
+            doomed = sorted(keys - live)
+
+            try:
+                if doomed:
+                    get_storage().delete_many(doomed)
+            except Exception as exc:
+                logger.warning("Deleting %d storage objects failed: %s", len(doomed), exc)
+                now = datetime.now(timezone.utc)
+                for row in rows:
+                    if row.key in live:
+                        db.delete(row)
+                        continue
+                    row.attempts += 1
+                    row.last_error = str(exc)[:1000]
+                    row.next_attempt_at = now + timedelta(seconds=self.backoff(row.attempts))
+            else:
+                for row in rows:
+                    db.delete(row)
+
+            db.commit()
+            return len(rows)
+        finally:
+            db.close()
+
+
+deletion_worker = StorageDeletionWorker()
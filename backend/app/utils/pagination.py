@@ -0,0 +1,37 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(value: Any, id_: int, sort: Optional[str] = None) -> str:
+    """
+    Opaque keyset cursor for the last row of a page: (sort value, id),
+    tagged with `sort` when a listing can be ordered more than one way.
+    """
+    if isinstance(value, datetime):
+        value = {"dt": value.isoformat()}
+    parts = [value, id_] if sort is None else [value, id_, sort]
+    raw = json.dumps(parts, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: Optional[str] = None) -> Tuple[Any, int]:
+    """
+    Inverse of encode_cursor; a cursor made under another `sort` is
+    invalid, since its value would be compared with the wrong column.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, id_, *tag = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if tag != ([] if sort is None else [sort]):
+            raise ValueError(tag)
+        if isinstance(value, dict):
+            value = datetime.fromisoformat(value["dt"])
+        return value, int(id_)
+    except Exception:
+        raise InvalidCursor("Invalid cursor")
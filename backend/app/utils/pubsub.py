@@ -0,0 +1,243 @@
+import asyncio
+import json
+import logging
+import queue
+import threading
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes or more.
+PG_NOTIFY_MAX_BYTES = 7999
+
+Handler = Callable[[dict], None]
+
+
+def encode_message(topic: str, payload: dict) -> str:
+    return json.dumps({"topic": topic, "payload": payload}, default=str)
+
+
+class EventBroker:
+    """
+    Topic based pub/sub used to fan realtime events out to every worker.
+
+    `publish` is safe to call from sync route handlers running in the
+    threadpool; handlers are always invoked on the event loop.
+    """
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Handler]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self, topic: str, handler: Handler):
+        self._handlers.setdefault(topic, []).append(handler)
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+
+    async def stop(self):
+        self._loop = None
+
+    def publish(self, topic: str, payload: dict):
+        raise NotImplementedError
+
+    def fits(self, topic: str, payload: dict) -> bool:
+        """
+        Whether the event is small enough for NOTIFY. Checked whatever the
+        broker, so a single worker degrades oversized events the same way
+        a multi-worker deployment has to.
+        """
+        return len(encode_message(topic, payload).encode()) <= PG_NOTIFY_MAX_BYTES
+
+    def _dispatch(self, topic: str, payload: dict):
+        for handler in self._handlers.get(topic, ()):
+            try:
+                handler(payload)
+            except Exception:
+                logger.exception("Event handler for %r failed", topic)
+
+    def _dispatch_threadsafe(self, topic: str, payload: dict):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            self._dispatch(topic, payload)
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._dispatch(topic, payload)
+        else:
+            loop.call_soon_threadsafe(self._dispatch, topic, payload)
+
+
+class InProcessBroker(EventBroker):
+    """
+    Delivers events to subscribers in the current process only.
+    """
+
+    def publish(self, topic: str, payload: dict):
+        self._dispatch_threadsafe(topic, payload)
+
+
+class PostgresBroker(EventBroker):
+    """
+    Uses LISTEN/NOTIFY on the application database so every worker that
+    listens on the channel (including the publisher) receives each event.
+
+    Publishing only queues the event; a sender thread owns the NOTIFY
+    connection and delivers events in order. Events are published after
+    the write has committed, so a slow or failing NOTIFY must neither
+    block the caller (possibly the event loop) nor fail the request.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        channel: str = "tracksys_events",
+        max_queue: Optional[int] = None,
+    ):
+        super().__init__()
+        self.dsn = dsn
+        self.channel = channel
+        self._listen_conn = None
+        self._publish_conn = None
+        self._outbox: "queue.Queue[Optional[str]]" = queue.Queue(
+            max_queue or settings.EVENT_PUBLISH_QUEUE_SIZE
+        )
+        self._sender: Optional[threading.Thread] = None
+        self._sender_lock = threading.Lock()
+
+    async def start(self):
+        await super().start()
+        self._listen()
+
+    async def stop(self):
+        if self._listen_conn is not None and self._loop is not None:
+            self._loop.remove_reader(self._listen_conn.fileno())
+        await asyncio.get_running_loop().run_in_executor(None, self._stop_sender)
+        for conn in (self._listen_conn, self._publish_conn):
+            if conn is not None:
+                conn.close()
+        self._listen_conn = None
+        self._publish_conn = None
+        await super().stop()
+
+    def publish(self, topic: str, payload: dict):
+        message = encode_message(topic, payload)
+        if len(message.encode()) > PG_NOTIFY_MAX_BYTES:
+            logger.warning("Dropping %r event larger than NOTIFY limit", topic)
+            return
+
+        self._start_sender()
+        try:
+            self._outbox.put_nowait(message)
+        except queue.Full:
+            logger.warning("Event publish queue is full, dropping %r event", topic)
+
+    def _start_sender(self):
+        if self._sender is not None and self._sender.is_alive():
+            return
+        with self._sender_lock:
+            if self._sender is None or not self._sender.is_alive():
+                self._sender = threading.Thread(
+                    target=self._send_loop, name="pg-notify-sender", daemon=True
+                )
+                self._sender.start()
+
+    def _stop_sender(self, timeout: float = 5.0):
+        sender = self._sender
+        if sender is None or not sender.is_alive():
+            return
+        try:
+            self._outbox.put(None, timeout=timeout)
+        except queue.Full:
+            logger.warning("Event publish queue still full on shutdown")
+            return
+        sender.join(timeout)
+
+    def _send_loop(self):
+        while True:
+            message = self._outbox.get()
+            if message is None:
+                return
+            self._send(message)
+
+    def _send(self, message: str):
+        for attempt in range(2):
+            try:
+                if self._publish_conn is None or self._publish_conn.closed:
+                    self._publish_conn = self._connect()
+                with self._publish_conn.cursor() as cur:
+                    cur.execute("SELECT pg_notify(%s, %s)", (self.channel, message))
+                return
+            except Exception:
+                conn, self._publish_conn = self._publish_conn, None
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+                if attempt:
+                    logger.exception("Failed to publish event on %r", self.channel)
+
+    def _connect(self):
+        import psycopg2
+        from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+        conn = psycopg2.connect(self.dsn)
+        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        return conn
+
+    def _listen(self):
+        self._listen_conn = self._connect()
+        with self._listen_conn.cursor() as cur:
+            cur.execute(f'LISTEN "{self.channel}"')
+        self._loop.add_reader(self._listen_conn.fileno(), self._on_readable)
+
+    def _on_readable(self):
+        conn = self._listen_conn
+        try:
+            conn.poll()
+        except Exception:
+            logger.exception("Lost LISTEN connection, reconnecting")
+            self._loop.remove_reader(conn.fileno())
+            conn.close()
+            self._loop.create_task(self._reconnect())
+            return
+
+        while conn.notifies:
+            notify = conn.notifies.pop(0)
+            try:
+                message = json.loads(notify.payload)
+            except ValueError:
+                continue
+            self._dispatch(message.get("topic"), message.get("payload") or {})
+
+    async def _reconnect(self):
+        delay = 0.5
+        while self._loop is not None:
+            try:
+                self._listen()
+                return
+            except Exception:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+
+
+def _postgres_dsn(database_url: str) -> str:
+    url = make_url(database_url).set(drivername="postgresql")
+    return url.render_as_string(hide_password=False)
+
+
+def create_broker() -> EventBroker:
+    if settings.EVENT_BROKER == "postgres":
+        return PostgresBroker(_postgres_dsn(settings.DATABASE_URL))
+    return InProcessBroker()
+
+
+broker = create_broker()
@@ -0,0 +1,172 @@
+import threading
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from pydantic import parse_obj_as
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+from app.utils.cache import TTLCache
+from app.utils.pubsub import broker
+
+# Broker topic carrying {"scopes"} when cached responses go stale.
+CACHE_TOPIC = "response_cache"
+
+Scope = Tuple[Hashable, ...]
+
+USERS_SCOPE: Scope = ("users",)
+PROJECTS_SCOPE: Scope = ("projects",)
+
+
+def project_scope(project_id: int) -> Scope:
+    return ("project", project_id)
+
+
+def user_scope(user_id: int) -> Scope:
+    return ("user", user_id)
+
+
+class ResponseCache:
+    """
+    LRU of rendered JSON bodies for read endpoints. Every key embeds the
+    current version of the scopes it depends on (a project, a user's
+    memberships, the user list), so a write only has to bump a version:
+    entries built before it are never looked up again and age out of
+    the LRU.
+    """
+
+    def __init__(self, maxsize: int, ttl: Optional[float]):
+        self.entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._versions: Dict[Scope, int] = {}
+        self._lock = threading.Lock()
+
+    def key(self, name: str, scopes: Iterable[Scope], *params) -> Optional[tuple]:
+        """
+        Cache key for `name` called with `params`, or None when caching is
+        disabled. Build it before querying so a write that lands during
+        the query invalidates the result.
+        """
+        if not settings.RESPONSE_CACHE_ENABLED:
+            return None
+        versions = self._versions
+        return (name, params, tuple((scope, versions.get(scope, 0)) for scope in scopes))
+
+    def get(self, key: Optional[tuple], default: Any = None) -> Any:
+        if key is None:
+            return default
+        return self.entries.get(key, default)
+
+    def set(self, key: Optional[tuple], value: Any):
+        if key is not None:
+            self.entries.set(key, value)
+
+    def response(self, key: Optional[tuple]) -> Optional[Response]:
+        entry = self.get(key)
+        if entry is None:
+            return None
+        body, headers = entry
+        return Response(body, headers=headers, media_type="application/json")
+
+    def render(
+        self,
+        key: Optional[tuple],
+        model,
+        value,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Response:
+        """
+        Validate `value` against the route's response model, render it once
+        and keep the body (and `headers`, e.g. an ETag) for later hits.
+        """
+        response = JSONResponse(jsonable_encoder(parse_obj_as(model, value)), headers=headers)
+        self.set(key, (response.body, headers))
+        return response
+
+    def bump(self, scopes: Iterable[Scope]):
+        with self._lock:
+            for scope in scopes:
+                self._versions[scope] = self._versions.get(scope, 0) + 1
+
+    def invalidate(self, *scopes: Scope):
+        """
+        Bump `scopes` here and, through the broker, in every other worker.
+        """
+        if not scopes:
+            return
+        self.bump(scopes)
+        broker.publish(CACHE_TOPIC, {"scopes": [list(scope) for scope in scopes]})
+
+    def clear(self):
+        with self._lock:
+            self._versions.clear()
+        self.entries.clear()
+
+    def stats(self) -> dict:
+        return self.entries.stats()
+
+
+response_cache = ResponseCache(
+    maxsize=settings.RESPONSE_CACHE_MAX_SIZE,
+    ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_project(project_id: int):
+    """
+    For writes that bypass the ORM unit of work (bulk UPDATE/INSERT).
+    """
+    response_cache.invalidate(project_scope(project_id))
+
+
+broker.subscribe(
+    CACHE_TOPIC,
+    lambda payload: response_cache.bump(tuple(scope) for scope in payload["scopes"]),
+)
+
+
+# ---------- INVALIDATION ----------
+
+_PENDING = "response_cache_scopes"
+
+
+def _scopes_for(obj) -> Tuple[Scope, ...]:
+    if isinstance(obj, models.Issue):
+        return (project_scope(obj.project_id),)
+    if isinstance(obj, models.ProjectMember):
+        return (project_scope(obj.project_id), user_scope(obj.user_id))
+    if isinstance(obj, models.Project):
+        return (project_scope(obj.id), PROJECTS_SCOPE)
+    if isinstance(obj, models.User):
+        return (USERS_SCOPE,)
+    return ()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_scopes(session, flush_context):
+    """
+    Note which cached scopes this transaction touches; they are bumped
+    once it commits. Deletes cascaded by the ORM are included.
+    """
+    pending = session.info.setdefault(_PENDING, set())
+    for obj in session.new:
+        pending.update(_scopes_for(obj))
+    for obj in session.deleted:
+        pending.update(_scopes_for(obj))
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            pending.update(_scopes_for(obj))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    scopes = session.info.pop(_PENDING, None)
+    if scopes:
+        response_cache.invalidate(*scopes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop(_PENDING, None)
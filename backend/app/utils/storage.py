@@ -1,51 +1,448 @@
+import base64
+import hashlib
+import hmac
+import os
+import tempfile
+import time
 import uuid
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import quote, urlencode
+
+import httpx
 from supabase import create_client
 from app.core.config import settings
 
-_supabase = None
+# Supabase's resumable (TUS) endpoint requires 6 MiB parts.
+TUS_CHUNK_SIZE = 6 * 1024 * 1024
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+class StoredObject(NamedTuple):
+    key: str
+    url: str
+    size: int
+    sha256: str
+
+
+class UploadTarget(NamedTuple):
+    url: str
+    method: str
+    headers: Dict[str, str]
+
+
+def _remaining_length(fileobj: BinaryIO) -> int:
+    fileobj.seek(0, os.SEEK_END)
+    length = fileobj.tell()
+    fileobj.seek(0)
+    return length
+
+
+def _check_length(length: int, max_bytes: Optional[int]):
+    if max_bytes is not None and length > max_bytes:
+        raise UploadTooLarge(f"File exceeds {max_bytes} bytes")
+
+
+def iter_chunks(
+    fileobj: BinaryIO,
+    chunk_size: int,
+    hasher,
+    max_bytes: Optional[int] = None,
+) -> Iterator[bytes]:
+    """
+    Yield fixed-size parts of `fileobj`, feeding `hasher` as it goes and
+    raising UploadTooLarge as soon as more than `max_bytes` were read.
+    """
+    total = 0
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            return
+        total += len(chunk)
+        _check_length(total, max_bytes)
+        hasher.update(chunk)
+        yield chunk
+
+
+class StorageBackend(ABC):
+    """
+    Where attachment bytes live. Keys are opaque "/"-separated names.
+    """
+
+    @abstractmethod
+    def put(
+        self,
+        key: str,
+        fileobj: BinaryIO,
+        content_type: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+    ) -> StoredObject:
+        ...
 
+    @abstractmethod
+    def get(self, key: str) -> bytes:
+        ...
 
-def _client():
-    global _supabase
-    if _supabase is None:
+    @abstractmethod
+    def stream(self, key: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    def delete_many(self, keys: List[str]) -> None:
+        for key in keys:
+            self.delete(key)
+
+    @abstractmethod
+    def presign(self, key: str, expires_in: int = 3600) -> str:
+        """
+        Time-limited download URL.
+        """
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        """
+        Long-lived URL stored on the Attachment row.
+        """
+
+    @abstractmethod
+    def presign_upload(
+        self,
+        key: str,
+        expires_in: int = 900,
+        content_type: Optional[str] = None,
+    ) -> UploadTarget:
+        """
+        Where a client can send the object's bytes directly.
+        """
+
+    def digest(self, key: str, max_bytes: Optional[int] = None) -> Tuple[int, str]:
+        """
+        Size and SHA-256 of a stored object.
+        Raises FileNotFoundError if it does not exist.
+        """
+        hasher = hashlib.sha256()
+        size = 0
+        for chunk in self.stream(key):
+            size += len(chunk)
+            _check_length(size, max_bytes)
+            hasher.update(chunk)
+        return size, hasher.hexdigest()
+
+
+# ---------- SUPABASE ----------
+
+def _tus_upload(
+    http: httpx.Client,
+    key: str,
+    fileobj: BinaryIO,
+    length: int,
+    content_type: str,
+    hasher,
+    max_bytes: Optional[int],
+):
+    auth = SupabaseStorage.service_key()
+    headers = {
+        "authorization": f"Bearer {auth}",
+        "apikey": auth,
+        "tus-resumable": "1.0.0",
+    }
+    metadata = {
+        "bucketName": settings.SUPABASE_BUCKET,
+        "objectName": key,
+        "contentType": content_type,
+    }
+    r = http.post(
+        f"{settings.SUPABASE_URL}/storage/v1/upload/resumable",
+        headers={
+            **headers,
+            "upload-length": str(length),
+            # Blob keys are content-addressed, so a concurrent first copy
+            # of the same content writes identical bytes
+            "x-upsert": "true",
+            "upload-metadata": ",".join(
+                f"{name} {base64.b64encode(value.encode()).decode()}"
+                for name, value in metadata.items()
+            ),
+        },
+    )
+    r.raise_for_status()
+    location = r.headers["location"]
+
+    offset = 0
+    try:
+        for chunk in iter_chunks(fileobj, TUS_CHUNK_SIZE, hasher, max_bytes):
+            r = http.patch(
+                location,
+                content=chunk,
+                headers={
+                    **headers,
+                    "upload-offset": str(offset),
+                    "content-type": "application/offset+octet-stream",
+                },
+            )
+            r.raise_for_status()
+            offset += len(chunk)
+    except Exception:
+        try:
+            http.delete(location, headers=headers)
+        except Exception:
+            pass
+        raise
+
+
+class SupabaseStorage(StorageBackend):
+    """
+    Supabase Storage bucket. Bucket must be public for url().
+    """
+
+    def __init__(self):
+        self._supabase = None
+
+    @staticmethod
+    def service_key() -> str:
         storage_key = settings.SUPABASE_SERVICE_ROLE_KEY or settings.SUPABASE_KEY
         if not settings.SUPABASE_URL or not storage_key:
             raise RuntimeError("Supabase credentials not configured")
-        _supabase = create_client(
-            settings.SUPABASE_URL,
-            storage_key,
+        return storage_key
+
+    def _bucket(self):
+        if self._supabase is None:
+            self._supabase = create_client(settings.SUPABASE_URL, self.service_key())
+        return self._supabase.storage.from_(settings.SUPABASE_BUCKET)
+
+    def put(self, key, fileobj, content_type=None, max_bytes=None):
+        length = _remaining_length(fileobj)
+        _check_length(length, max_bytes)
+
+        hasher = hashlib.sha256()
+        with httpx.Client(timeout=settings.STORAGE_TIMEOUT_SECONDS) as http:
+            _tus_upload(
+                http,
+                key,
+                fileobj,
+                length,
+                content_type or "application/octet-stream",
+                hasher,
+                max_bytes,
+            )
+        return StoredObject(key, self.url(key), length, hasher.hexdigest())
+
+    def get(self, key):
+        return self._bucket().download(key)
+
+    def stream(self, key, chunk_size=STREAM_CHUNK_SIZE):
+        auth = self.service_key()
+        with httpx.Client(timeout=settings.STORAGE_TIMEOUT_SECONDS) as http:
+            with http.stream(
+                "GET",
+                f"{settings.SUPABASE_URL}/storage/v1/object/"
+                f"{settings.SUPABASE_BUCKET}/{quote(key)}",
+                headers={"authorization": f"Bearer {auth}", "apikey": auth},
+            ) as r:
+                # Supabase answers 400 with a 404 body for missing objects
+                if r.status_code in (400, 404):
+                    raise FileNotFoundError(key)
+                r.raise_for_status()
+                yield from r.iter_bytes(chunk_size)
+
+    def delete(self, key):
+        self._bucket().remove([key])
+
+    def delete_many(self, keys):
+        self._bucket().remove(list(keys))
+
+    def presign(self, key, expires_in=3600):
+        return self._bucket().create_signed_url(key, expires_in)["signedURL"]
+
+    def url(self, key):
+        return (
+            f"{settings.SUPABASE_URL}/storage/v1/object/public/"
+            f"{settings.SUPABASE_BUCKET}/{key}"
+        )
+
+    def presign_upload(self, key, expires_in=900, content_type=None):
+        # Supabase signed upload URLs have a fixed lifetime; the upload
+        # token issued alongside bounds how long the upload can be completed.
+        signed = self._bucket().create_signed_upload_url(key)
+        return UploadTarget(
+            signed["signed_url"],
+            "PUT",
+            {
+                "content-type": content_type or "application/octet-stream",
+                "x-upsert": "false",
+            },
         )
-    return _supabase
 
 
-def upload_fileobj_to_storage(fileobj, filename: str):
+# ---------- LOCAL FILESYSTEM ----------
+
+class LocalStorage(StorageBackend):
     """
-    Upload file to Supabase Storage.
-    Returns (key, public_url).
-    Bucket must be public.
+    Files under `root`, sharded two levels deep by a hash of the key so no
+    directory grows unbounded. Writes go to a temp file in the target
+    directory and are renamed into place, so readers never see a partial
+    file. URLs point at GET /attachments/files/{key} and carry an HMAC.
     """
-    client = _client()
-    key = f"attachments/{uuid.uuid4().hex}_{filename}"
 
+    def __init__(self, root: str, base_url: str = ""):
+        self.root = os.path.abspath(root)
+        self.base_url = base_url.rstrip("/")
+
+    def path(self, key: str) -> str:
+        parts = key.split("/")
+        if any(part in ("", ".", "..") for part in parts):
+            raise ValueError(f"Invalid storage key: {key!r}")
+        shard = hashlib.sha1(key.encode()).hexdigest()
+        return os.path.join(self.root, shard[:2], shard[2:4], *parts)
+
+    def put(self, key, fileobj, content_type=None, max_bytes=None):
+        _check_length(_remaining_length(fileobj), max_bytes)
+
+        path = self.path(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        hasher = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for chunk in iter_chunks(fileobj, STREAM_CHUNK_SIZE, hasher, max_bytes):
+                    out.write(chunk)
+                    size += len(chunk)
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+        return StoredObject(key, self.url(key), size, hasher.hexdigest())
+
+    def get(self, key):
+        with open(self.path(key), "rb") as f:
+            return f.read()
+
+    def stream(self, key, chunk_size=STREAM_CHUNK_SIZE):
+        with open(self.path(key), "rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def delete(self, key):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def signature(key: str, expires: Optional[int] = None, method: str = "GET") -> str:
+        message = f"{method} {key}:{expires or ''}".encode()
+        return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+    @classmethod
+    def verify(
+        cls,
+        key: str,
+        expires: Optional[int],
+        sig: str,
+        method: str = "GET",
+    ) -> bool:
+        if expires is not None and expires < time.time():
+            return False
+        return hmac.compare_digest(cls.signature(key, expires, method), sig)
+
+    def _signed_url(self, key: str, expires: Optional[int], method: str = "GET") -> str:
+        query = {"sig": self.signature(key, expires, method)}
+        if expires is not None:
+            query["expires"] = expires
+        return f"{self.base_url}/attachments/files/{quote(key)}?{urlencode(query)}"
+
+    def presign(self, key, expires_in=3600):
+        return self._signed_url(key, int(time.time()) + expires_in)
+
+    def url(self, key):
+        return self._signed_url(key, None)
+
+    def presign_upload(self, key, expires_in=900, content_type=None):
+        url = self._signed_url(key, int(time.time()) + expires_in, "PUT")
+        return UploadTarget(
+            url,
+            "PUT",
+            {"content-type": content_type or "application/octet-stream"},
+        )
+
+
+# ---------- MODULE API ----------
+
+_storage: Optional[StorageBackend] = None
+
+
+def get_storage() -> StorageBackend:
+    global _storage
+    if _storage is None:
+        if settings.STORAGE_BACKEND == "local":
+            _storage = LocalStorage(
+                settings.STORAGE_LOCAL_ROOT,
+                settings.STORAGE_PUBLIC_BASE_URL,
+            )
+        elif settings.STORAGE_BACKEND == "supabase":
+            _storage = SupabaseStorage()
+        else:
+            raise RuntimeError(f"Unknown STORAGE_BACKEND {settings.STORAGE_BACKEND!r}")
+    return _storage
+
+
+def blob_key(content_hash: str) -> str:
+    return f"blobs/{content_hash[:2]}/{content_hash[2:4]}/{content_hash}"
+
+
+def hash_fileobj(fileobj: BinaryIO, max_bytes: Optional[int] = None) -> Tuple[int, str]:
+    """
+    Size and SHA-256 of a seekable file, which is left rewound.
+    """
+    fileobj.seek(0)
+    hasher = hashlib.sha256()
+    size = 0
+    for chunk in iter_chunks(fileobj, STREAM_CHUNK_SIZE, hasher, max_bytes):
+        size += len(chunk)
     fileobj.seek(0)
-    data = fileobj.read()
+    return size, hasher.hexdigest()
 
-    client.storage.from_(settings.SUPABASE_BUCKET).upload(
-        path=key,
-        file=data,
-    )
 
-    public_url = (
-        f"{settings.SUPABASE_URL}/storage/v1/object/public/"
-        f"{settings.SUPABASE_BUCKET}/{key}"
-    )
+def new_object_key(filename: str) -> str:
+    return f"attachments/{uuid.uuid4().hex}_{filename.replace('/', '_')}"
+
 
-    return key, public_url
+def upload_fileobj_to_storage(
+    fileobj: BinaryIO,
+    filename: str,
+    content_type: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+) -> StoredObject:
+    """
+    Stream file to the configured backend in bounded parts.
+    Memory use is one part regardless of file size; the SHA-256 is
+    computed while streaming.
+    """
+    if max_bytes is None:
+        max_bytes = settings.UPLOAD_MAX_BYTES
+    return get_storage().put(new_object_key(filename), fileobj, content_type, max_bytes)
 
 
 def delete_file_from_storage(key: str):
     """
-    Best-effort delete from Supabase Storage.
+    Best-effort delete from the configured backend.
     """
-    client = _client()
-    client.storage.from_(settings.SUPABASE_BUCKET).remove([key])
+    get_storage().delete(key)
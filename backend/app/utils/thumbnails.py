@@ -0,0 +1,126 @@
+import io
+import logging
+import mimetypes
+import tempfile
+from typing import NamedTuple, Optional
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; without it only MIME types are recorded
+    Image = None
+
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.utils.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+
+class Thumbnail(NamedTuple):
+    data: bytes
+    extension: str
+    content_type: str
+    mime_type: str
+    width: int
+    height: int
+
+
+def thumbnail_key(key: str, extension: str) -> str:
+    """
+    Thumbnails sit next to their original, so deduplicated attachments
+    share one and it goes away with the blob.
+    """
+    return f"{key}.thumb.{extension}"
+
+
+def render_thumbnail(source, max_size: int) -> Optional[Thumbnail]:
+    """
+    Downscale an image file to fit in max_size x max_size. Returns None
+    for files Pillow cannot read.
+    """
+    try:
+        img = Image.open(source)
+        width, height = img.size
+        mime_type = Image.MIME.get(img.format)
+        # Lets JPEG decode at reduced scale instead of full resolution
+        img.draft("RGB", (max_size, max_size))
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((max_size, max_size))
+    except (Image.UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        return None
+
+    out = io.BytesIO()
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        img.save(out, "PNG", optimize=True)
+        extension, content_type = "png", "image/png"
+    else:
+        img.convert("RGB").save(out, "JPEG", quality=80, optimize=True)
+        extension, content_type = "jpg", "image/jpeg"
+    return Thumbnail(out.getvalue(), extension, content_type, mime_type, width, height)
+
+
+def _fetch(key: str):
+    storage = get_storage()
+    spool = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    for chunk in storage.stream(key):
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+
+def generate_thumbnail(attachment_id: int, bind=None):
+    """
+    Background task run after an attachment is recorded: fill in MIME
+    type, dimensions and a thumbnail for images. Failures only log.
+    `bind` is the engine of the request's session.
+    """
+    db = Session(bind=bind) if bind is not None else SessionLocal()
+    try:
+        attachment = db.query(models.Attachment).get(attachment_id)
+        if attachment is None or attachment.thumbnail_key:
+            return
+
+        if not attachment.mime_type:
+            attachment.mime_type = mimetypes.guess_type(attachment.filename)[0]
+
+        # Same object already processed for another attachment
+        twin = (
+            db.query(models.Attachment)
+            .filter(
+                models.Attachment.s3_key == attachment.s3_key,
+                models.Attachment.thumbnail_key.isnot(None),
+            )
+            .first()
+        )
+        if twin is not None:
+            attachment.mime_type = twin.mime_type
+            attachment.width = twin.width
+            attachment.height = twin.height
+            attachment.thumbnail_key = twin.thumbnail_key
+            attachment.thumbnail_url = twin.thumbnail_url
+        elif (
+            Image is not None
+            and (attachment.mime_type or "").startswith("image/")
+            and (attachment.size or 0) <= settings.THUMBNAIL_MAX_SOURCE_BYTES
+        ):
+            with _fetch(attachment.s3_key) as source:
+                thumb = render_thumbnail(source, settings.THUMBNAIL_SIZE)
+            if thumb is not None:
+                key = thumbnail_key(attachment.s3_key, thumb.extension)
+                storage = get_storage()
+                storage.put(key, io.BytesIO(thumb.data), thumb.content_type)
+                attachment.mime_type = thumb.mime_type or attachment.mime_type
+                attachment.width = thumb.width
+                attachment.height = thumb.height
+                attachment.thumbnail_key = key
+                attachment.thumbnail_url = storage.url(key)
+
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("Thumbnail generation failed for attachment %s", attachment_id)
+    finally:
+        db.close()
@@ -0,0 +1,134 @@
+"""
+Login throughput under concurrency, and how much a login burst slows a
+cheap sync endpoint (GET /users/) served from the same process.
+
+    python benchmarks/login_throughput.py --logins 200 --concurrency 50
+    python benchmarks/login_throughput.py --inline   # bcrypt on the request threadpool
+
+--inline reproduces the previous behaviour, where bcrypt ran inside the
+sync login handler and held a request thread.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import httpx  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from starlette.concurrency import run_in_threadpool  # noqa: E402
+
+from app import models  # noqa: E402
+from app.core import security  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.session import get_db  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+def _percentile(values, pct):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def setup_database(users):
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    hashed = security.get_password_hash("password")
+    db = Session()
+    db.add_all(
+        models.User(email=f"user{i}@example.com", hashed_password=hashed)
+        for i in range(users)
+    )
+    db.commit()
+    db.close()
+
+    def override_get_db():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+
+
+async def run(args):
+    if args.inline:
+        async def inline(fn, *fn_args):
+            return await run_in_threadpool(fn, *fn_args)
+        security._run_password_task = inline
+
+    setup_database(args.users)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        r = await client.post(
+            "/auth/login", data={"username": "user0@example.com", "password": "password"}
+        )
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+        login_latency, statuses = [], []
+        probe_latency = []
+        sem = asyncio.Semaphore(args.concurrency)
+        done = asyncio.Event()
+
+        async def login(i):
+            async with sem:
+                start = time.perf_counter()
+                r = await client.post(
+                    "/auth/login",
+                    data={
+                        "username": f"user{i % args.users}@example.com",
+                        "password": "password",
+                    },
+                )
+                login_latency.append(time.perf_counter() - start)
+                statuses.append(r.status_code)
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/users/", headers=headers)
+                probe_latency.append(time.perf_counter() - start)
+                await asyncio.sleep(0.01)
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(login(i) for i in range(args.logins)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+
+    ok = statuses.count(200)
+    print(f"mode:            {'inline (request threadpool)' if args.inline else 'password pool'}")
+    print(f"logins:          {len(statuses)} in {elapsed:.2f}s "
+          f"({ok / elapsed:.1f} successful/s, {statuses.count(503)} x 503)")
+    print(f"login latency:   p50 {statistics.median(login_latency) * 1000:.0f} ms, "
+          f"p99 {_percentile(login_latency, 99) * 1000:.0f} ms")
+    print(f"GET /users/:     p50 {statistics.median(probe_latency) * 1000:.1f} ms, "
+          f"p99 {_percentile(probe_latency, 99) * 1000:.1f} ms "
+          f"({len(probe_latency)} probes)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--inline", action="store_true")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
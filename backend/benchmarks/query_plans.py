@@ -0,0 +1,202 @@
+"""
+Compare query plans and timings of the hot lookups before and after the
+indexes added in revisions 7c1e2a9b4d3f (hot paths) and e5a9c2f7b1d3
+(comment threads).
+
+Runs against a throwaway database (in-memory SQLite by default):
+
+    python benchmarks/query_plans.py
+    python benchmarks/query_plans.py --url postgresql+psycopg2://.../scratch
+
+Never point --url at a database holding real data: all tables are
+dropped and recreated.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app import models  # noqa: E402
+from app.db.base import Base  # noqa: E402
+
+# Indexes by the revision that added them, in migration order
+NEW_INDEXES = {
+    "7c1e2a9b4d3f": {
+        "ix_project_members_project_id_user_id",
+        "ix_project_members_user_id",
+        "ix_issues_project_id_status",
+        "ix_issues_project_id_created_at",
+        "ix_issues_project_id_priority",
+        "ix_issues_assignee_id",
+        "ix_comments_issue_id_created_at",
+        "ix_attachments_issue_id",
+    },
+    "e5a9c2f7b1d3": {
+        "ix_comments_issue_id_parent_id",
+        "ix_comments_parent_id",
+    },
+}
+
+QUERIES = {
+    "membership lookup": (
+        "SELECT * FROM project_members WHERE project_id = :pid AND user_id = :uid",
+        {"pid": 7, "uid": 7},
+    ),
+    "projects for user": (
+        "SELECT project_id FROM project_members WHERE user_id = :uid",
+        {"uid": 7},
+    ),
+    "board column": (
+        "SELECT * FROM issues WHERE project_id = :pid AND status = 'todo'",
+        {"pid": 7},
+    ),
+    "issue page (keyset)": (
+        "SELECT * FROM issues WHERE project_id = :pid "
+        "ORDER BY created_at, id LIMIT 51",
+        {"pid": 7},
+    ),
+    "comments for issue": (
+        "SELECT * FROM comments WHERE issue_id = :iid ORDER BY created_at",
+        {"iid": 77},
+    ),
+    "top-level comments (page)": (
+        "SELECT id FROM comments WHERE issue_id = :iid AND parent_id IS NULL "
+        "ORDER BY id LIMIT 21",
+        {"iid": 77},
+    ),
+    "replies to comment": (
+        "SELECT id FROM comments WHERE parent_id = "
+        "(SELECT min(id) FROM comments WHERE issue_id = :iid) ORDER BY id LIMIT 21",
+        {"iid": 77},
+    ),
+    "attachments for issue": (
+        "SELECT * FROM attachments WHERE issue_id = :iid",
+        {"iid": 77},
+    ),
+}
+
+
+def _new_indexes(names):
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name in names:
+                yield index
+
+
+def seed(conn, projects, issues_per_project, comments_per_issue):
+    now = datetime(2026, 1, 1)
+    conn.execute(
+        models.User.__table__.insert(),
+        [
+            {"id": i, "email": f"user{i}@example.com", "hashed_password": "x",
+             "role": "developer"}
+            for i in range(1, projects + 1)
+        ],
+    )
+    conn.execute(
+        models.Project.__table__.insert(),
+        [{"id": i, "name": f"project {i}"} for i in range(1, projects + 1)],
+    )
+    conn.execute(
+        models.ProjectMember.__table__.insert(),
+        [
+            {"project_id": p, "user_id": u, "role": "developer"}
+            for p in range(1, projects + 1)
+            for u in range(1, projects + 1)
+            if (p + u) % 5 == 0 or p == u
+        ],
+    )
+
+    issue_rows, comment_rows, attachment_rows = [], [], []
+    issue_id = comment_id = 0
+    statuses = ["todo", "in_progress", "done"]
+    for p in range(1, projects + 1):
+        for n in range(issues_per_project):
+            issue_id += 1
+            issue_rows.append({
+                "id": issue_id, "title": f"issue {issue_id}", "project_id": p,
+                "status": statuses[n % 3], "type": "task", "priority": n % 5,
+                "assignee_id": (n % projects) + 1,
+                "created_at": now + timedelta(seconds=issue_id),
+            })
+            # The first comment on each issue starts a thread the rest reply to
+            thread_id = comment_id + 1
+            for c in range(comments_per_issue):
+                comment_id += 1
+                comment_rows.append({
+                    "id": comment_id, "issue_id": issue_id,
+                    "parent_id": thread_id if c else None,
+                    "author_id": p, "content": "lgtm",
+                    "created_at": now + timedelta(seconds=issue_id, milliseconds=c),
+                })
+            attachment_rows.append({
+                "issue_id": issue_id, "filename": "log.txt",
+                "s3_key": f"k{issue_id}", "url": f"u{issue_id}",
+            })
+    conn.execute(models.Issue.__table__.insert(), issue_rows)
+    conn.execute(models.Comment.__table__.insert(), comment_rows)
+    conn.execute(models.Attachment.__table__.insert(), attachment_rows)
+
+
+def explain(conn, sql, params):
+    if conn.dialect.name == "sqlite":
+        rows = conn.execute(text("EXPLAIN QUERY PLAN " + sql), params)
+        return [row[-1] for row in rows]
+    rows = conn.execute(text("EXPLAIN " + sql), params)
+    return [row[0] for row in rows]
+
+
+def timed(conn, sql, params, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        conn.execute(text(sql), params).fetchall()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def report(conn, label, repeat):
+    print(f"\n=== {label} ===")
+    for name, (sql, params) in QUERIES.items():
+        ms = timed(conn, sql, params, repeat)
+        print(f"\n-- {name}: {ms:.3f} ms/query")
+        for line in explain(conn, sql, params):
+            print(f"   {line}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="sqlite://")
+    parser.add_argument("--projects", type=int, default=200)
+    parser.add_argument("--issues-per-project", type=int, default=250)
+    parser.add_argument("--comments-per-issue", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    with engine.begin() as conn:
+        Base.metadata.drop_all(conn)
+        Base.metadata.create_all(conn)
+        for index in _new_indexes(set().union(*NEW_INDEXES.values())):
+            index.drop(conn)
+        seed(conn, args.projects, args.issues_per_project, args.comments_per_issue)
+        conn.execute(text("ANALYZE"))
+
+    with engine.connect() as conn:
+        report(conn, "before (revision 04593d98ecc8)", args.repeat)
+
+    for revision, names in NEW_INDEXES.items():
+        with engine.begin() as conn:
+            for index in _new_indexes(names):
+                index.create(conn)
+            conn.execute(text("ANALYZE"))
+
+        with engine.connect() as conn:
+            report(conn, f"after (revision {revision})", args.repeat)
+
+
+if __name__ == "__main__":
+    main()
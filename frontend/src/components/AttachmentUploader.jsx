@@ -10,11 +10,19 @@ export default function AttachmentUploader({ issueId, onUploaded }) {
 
     setUploading(true);
     try {
-      const formData = new FormData();
-      formData.append("file", file);
-      await API.post(`/attachments/issues/${issueId}`, formData, {
-        headers: { "Content-Type": "multipart/form-data" },
+      // Bytes go straight to storage; the API only issues the URL and
+      // records the attachment once the object exists.
+      const { data: ticket } = await API.post(
+        `/attachments/issues/${issueId}/upload-url`,
+        { filename: file.name, content_type: file.type || null, size: file.size }
+      );
+      const res = await fetch(new URL(ticket.upload_url, API.defaults.baseURL), {
+        method: ticket.method,
+        headers: ticket.headers,
+        body: file,
       });
+      if (!res.ok) throw new Error(`Upload failed with ${res.status}`);
+      await API.post("/attachments/complete", { token: ticket.token });
 
       setFile(null);
       onUploaded && onUploaded();
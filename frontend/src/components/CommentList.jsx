@@ -41,7 +41,8 @@ export default function CommentList({ comments = [], refresh, issueId }) {
           <div key={c.id} className="p-2 border rounded bg-white">
             <div className="text-xs text-gray-500 flex items-center justify-between">
               <span>
-                User {c.author_id} | {new Date(c.created_at).toLocaleString()}
+                {c.author ? c.author.full_name || c.author.email : `User ${c.author_id}`} |{" "}
+                {new Date(c.created_at).toLocaleString()}
               </span>
               <button
                 onClick={() => removeComment(c.id)}
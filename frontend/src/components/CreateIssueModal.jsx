@@ -20,7 +20,7 @@ export default function CreateIssueModal({ projectId, onClose, onCreated }) {
 
     try {
       setLoading(true);
-      await API.post(`/issues/projects/${projectId}`, {
+      const res = await API.post(`/issues/projects/${projectId}`, {
         title,
         description,
         type: "task",
@@ -28,7 +28,7 @@ export default function CreateIssueModal({ projectId, onClose, onCreated }) {
         assignee_id: assigneeId ? Number(assigneeId) : null,
       });
 
-      onCreated(); // refresh board
+      onCreated(res.data); // add card to board
       onClose();   // close modal
     } catch (err) {
       console.error(err);
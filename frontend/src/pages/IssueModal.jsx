@@ -4,6 +4,7 @@ import CommentList from "../components/CommentList";
 import AttachmentUploader from "../components/AttachmentUploader";
 
 export default function IssueModal({ issue, onClose }) {
+  const [detail, setDetail] = useState(null);
   const [comments, setComments] = useState([]);
   const [attachments, setAttachments] = useState([]);
   const [loading, setLoading] = useState(true);
@@ -26,12 +27,10 @@ export default function IssueModal({ issue, onClose }) {
   async function fetchAll() {
     try {
       setLoading(true);
-      const [c, a] = await Promise.all([
-        API.get(`/comments/issues/${issue.id}`),
-        API.get(`/attachments/issues/${issue.id}`),
-      ]);
-      setComments(c.data);
-      setAttachments(a.data || []);
+      const res = await API.get(`/issues/${issue.id}`);
+      setDetail(res.data);
+      setComments(res.data.comments);
+      setAttachments(res.data.attachments || []);
     } catch (err) {
       console.error(err);
     } finally {
@@ -87,7 +86,12 @@ export default function IssueModal({ issue, onClose }) {
           </div>
         </div>
 
-        <p className="mt-2 text-sm">{issue.description}</p>
+        <p className="mt-2 text-sm">{(detail || issue).description}</p>
+        {detail?.assignee && (
+          <p className="mt-1 text-xs text-gray-500">
+            Assignee: {detail.assignee.full_name || detail.assignee.email}
+          </p>
+        )}
 
         {loading ? (
           <div className="mt-4 text-gray-500">Loading...</div>
@@ -99,11 +103,19 @@ export default function IssueModal({ issue, onClose }) {
                 {attachments.map((a) => (
                   <li key={a.id} className="flex items-center justify-between gap-2">
                     <a
-                      className="text-blue-600 text-sm"
+                      className="text-blue-600 text-sm flex items-center gap-2"
                       href={a.url}
                       target="_blank"
                       rel="noreferrer"
                     >
+                      {a.thumbnail_url && (
+                        <img
+                          src={a.thumbnail_url}
+                          alt=""
+                          loading="lazy"
+                          className="h-10 w-10 object-cover rounded"
+                        />
+                      )}
                       {a.filename}
                     </a>
                     <button
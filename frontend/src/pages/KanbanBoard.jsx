@@ -12,12 +12,16 @@ const columnNames = {
   in_progress: "In Progress",
   done: "Done",
 };
+// Cards loaded per column on first paint; counts cover the whole column.
+const CARDS_PER_COLUMN = 100;
 
 export default function KanbanBoard() {
   const { id: projectId } = useParams();
   const nav = useNavigate();
 
-  const [issues, setIssues] = useState([]);
+  // Counts change together with cards, so both live in one state object.
+  const [board, setBoard] = useState({ issues: [], counts: {} });
+  const { issues, counts } = board;
   const [loading, setLoading] = useState(true);
   const [selectedIssue, setSelectedIssue] = useState(null);
   const wsRef = useRef(null);
@@ -36,10 +40,7 @@ export default function KanbanBoard() {
 
     const ws = createBoardSocket(token, projectId);
     ws.onmessage = (ev) => {
-      const data = JSON.parse(ev.data);
-      if (data.type?.startsWith("issue:")) {
-        fetchIssues();
-      }
+      applyEvent(JSON.parse(ev.data));
     };
 
     ws.onerror = () => {
@@ -55,8 +56,15 @@ export default function KanbanBoard() {
   async function fetchIssues() {
     try {
       setLoading(true);
-      const r = await API.get(`/issues/projects/${projectId}`);
-      setIssues(r.data);
+      const r = await API.get(`/projects/${projectId}/board`, {
+        params: { per_column: CARDS_PER_COLUMN },
+      });
+      const nextCounts = {};
+      r.data.columns.forEach((c) => (nextCounts[c.status] = c.count));
+      setBoard({
+        issues: r.data.columns.flatMap((c) => c.issues),
+        counts: nextCounts,
+      });
     } catch (err) {
       if (err.response?.status === 401) nav("/login");
       console.error(err);
@@ -65,6 +73,83 @@ export default function KanbanBoard() {
     }
   }
 
+  function setIssues(update) {
+    setBoard((curr) => ({ ...curr, issues: update(curr.issues) }));
+  }
+
+  function bump(counts, status, delta) {
+    return { ...counts, [status]: (counts[status] || 0) + delta };
+  }
+
+  function applyEvent(event) {
+    switch (event.type) {
+      case "issue:created":
+        setBoard((curr) =>
+          curr.issues.some((i) => i.id === event.issue.id)
+            ? curr
+            : {
+                issues: [...curr.issues, event.issue],
+                counts: bump(curr.counts, event.issue.status, 1),
+              }
+        );
+        break;
+      case "issue:moved":
+        setBoard((curr) => ({
+          issues: curr.issues.map((i) =>
+            i.id === event.issue_id ? { ...i, status: event.to } : i
+          ),
+          counts: bump(bump(curr.counts, event.from, -1), event.to, 1),
+        }));
+        break;
+      case "issues:created":
+        setBoard((curr) => {
+          const known = new Set(curr.issues.map((i) => i.id));
+          const added = event.issues.filter((i) => !known.has(i.id));
+          return {
+            issues: [...curr.issues, ...added],
+            counts: added.reduce((c, i) => bump(c, i.status, 1), curr.counts),
+          };
+        });
+        break;
+      case "issues:moved": {
+        const moved = new Set(event.moves.map((m) => m.issue_id));
+        setBoard((curr) => ({
+          issues: curr.issues.map((i) =>
+            moved.has(i.id) ? { ...i, status: event.to } : i
+          ),
+          counts: event.moves.reduce(
+            (c, m) => bump(bump(c, m.from, -1), event.to, 1),
+            curr.counts
+          ),
+        }));
+        break;
+      }
+      case "issues:assigned": {
+        const assigned = new Set(event.issue_ids);
+        setIssues((curr) =>
+          curr.map((i) =>
+            assigned.has(i.id) ? { ...i, assignee_id: event.assignee_id } : i
+          )
+        );
+        break;
+      }
+      case "board:stale":
+        fetchIssues();
+        break;
+      case "issue:deleted":
+        setBoard((curr) => {
+          const gone = curr.issues.find((i) => i.id === event.issue_id);
+          return {
+            issues: curr.issues.filter((i) => i.id !== event.issue_id),
+            counts: gone ? bump(curr.counts, gone.status, -1) : curr.counts,
+          };
+        });
+        break;
+      default:
+        break;
+    }
+  }
+
   function grouped() {
     const map = { todo: [], in_progress: [], done: [] };
     issues.forEach((i) => map[i.status]?.push(i));
@@ -91,7 +176,7 @@ export default function KanbanBoard() {
       });
     } catch (err) {
       console.error(err);
-      setIssues(prev);
+      setIssues(() => prev);
       alert("Failed to update issue status");
     }
   }
@@ -129,7 +214,12 @@ export default function KanbanBoard() {
                   {...provided.droppableProps}
                   className="w-80 bg-gray-100 p-3 rounded shadow-sm border"
                 >
-                  <h3 className="font-bold mb-3">{columnNames[col]}</h3>
+                  <h3 className="font-bold mb-3">
+                    {columnNames[col]}{" "}
+                    <span className="text-sm font-normal text-gray-500">
+                      {counts[col] ?? 0}
+                    </span>
+                  </h3>
 
                   {groups[col].map((issue, index) => (
                     <Draggable
@@ -146,8 +236,8 @@ export default function KanbanBoard() {
                           onClick={() => setSelectedIssue(issue)}
                         >
                           <div className="font-medium">{issue.title}</div>
-                          <div className="text-xs text-gray-600 line-clamp-2">
-                            {issue.description}
+                          <div className="text-xs text-gray-600">
+                            {issue.type} · P{issue.priority}
                           </div>
                         </div>
                       )}
@@ -155,6 +245,11 @@ export default function KanbanBoard() {
                   ))}
 
                   {provided.placeholder}
+                  {counts[col] > groups[col].length && (
+                    <div className="text-xs text-gray-500 mt-2">
+                      Showing {groups[col].length} of {counts[col]}
+                    </div>
+                  )}
                 </div>
               )}
             </Droppable>
@@ -165,17 +260,14 @@ export default function KanbanBoard() {
         <CreateIssueModal
           projectId={projectId}
           onClose={() => setShowCreate(false)}
-          onCreated={fetchIssues}
+          onCreated={(issue) => applyEvent({ type: "issue:created", issue })}
         />
       )}
       {selectedIssue && (
         <IssueModal
           issue={selectedIssue}
           projectId={projectId}
-          onClose={() => {
-            setSelectedIssue(null);
-            fetchIssues();
-          }}
+          onClose={() => setSelectedIssue(null)}
         />
       )}
     </div>
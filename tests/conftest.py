@@ -1,17 +1,91 @@
-import asyncio
 import os
-import pytest
-from fastapi.testclient import TestClient
-from backend.app.main import app
-from backend.app.db.session import Base, engine, SessionLocal
+import sys
+
+# The app is imported as the top-level "app" package from backend/, and
+# reads its settings from the environment at import time.
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.api.deps import membership_cache  # noqa: E402
+from app.core.principals import principal_cache  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.session import engine as app_engine, get_db  # noqa: E402
+from app.main import app  # noqa: E402
+from app.utils import storage  # noqa: E402
+from app.utils.pubsub import broker  # noqa: E402
+from app.utils.response_cache import response_cache  # noqa: E402
+
 
 @pytest.fixture(scope="session")
 def anyio_backend():
     return "asyncio"
 
+
 @pytest.fixture(scope="session")
 def client():
     # create tables in test DB (ensure DATABASE_URL points to a test DB locally)
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=app_engine)
     with TestClient(app) as c:
-        yield c
\ No newline at end of file
+        yield c
+
+
+@pytest.fixture()
+def engine():
+    """
+    A fresh in-memory SQLite database served to the app through get_db.
+    The process-wide caches are emptied around each test, since ids repeat
+    from one database to the next.
+    """
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    TestingSession = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = TestingSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    principal_cache.clear()
+    response_cache.clear()
+    membership_cache.clear()
+    app.dependency_overrides[get_db] = override_get_db
+    yield engine
+    app.dependency_overrides.clear()
+    principal_cache.clear()
+    response_cache.clear()
+    membership_cache.clear()
+
+
+@pytest.fixture()
+def session_factory(engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture()
+def local_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "_storage", storage.LocalStorage(str(tmp_path)))
+    return tmp_path
+
+
+@pytest.fixture()
+def published():
+    """
+    Board events published during the test.
+    """
+    received = []
+    broker.subscribe("board", received.append)
+    yield received
+    broker._handlers["board"].remove(received.append)
@@ -0,0 +1,24 @@
+from sqlalchemy import event
+
+
+def auth_headers(client, email, password="pw"):
+    """
+    Register `email` (if needed), log in and return the bearer header.
+    """
+    client.post("/auth/register", json={"email": email, "password": password})
+    r = client.post("/auth/login", data={"username": email, "password": password})
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def capture_statements(engine, fn):
+    """
+    Call `fn` and return its result with the SQL statements it ran.
+    """
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        response = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return response, statements
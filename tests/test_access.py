@@ -0,0 +1,49 @@
+from fastapi.testclient import TestClient
+
+from app import crud
+from app.main import app
+
+from helpers import auth_headers, capture_statements
+
+
+def test_issue_access_is_one_round_trip(engine):
+    client = TestClient(app)
+    owner = auth_headers(client, "owner@example.com")
+    outsider = auth_headers(client, "outsider@example.com")
+    pid = client.post("/projects/", json={"name": "P"}, headers=owner).json()["id"]
+    issue_id = client.post(
+        f"/issues/projects/{pid}", json={"title": "t"}, headers=owner
+    ).json()["id"]
+
+    r, statements = capture_statements(
+        engine, lambda: client.get(f"/comments/issues/{issue_id}", headers=owner)
+    )
+
+    assert r.status_code == 200
+    # current user, issue + membership, comments
+    assert len(statements) == 3
+
+    assert client.get(f"/comments/issues/{issue_id}", headers=outsider).status_code == 403
+    assert client.get("/comments/issues/999", headers=owner).status_code == 404
+    assert client.delete("/attachments/999", headers=owner).status_code == 404
+
+
+
+def test_concurrent_member_adds_are_rejected_not_500(engine, monkeypatch):
+    client = TestClient(app)
+    owner = auth_headers(client, "owner@example.com")
+    auth_headers(client, "guest@example.com")
+    pid = client.post("/projects/", json={"name": "P"}, headers=owner).json()["id"]
+    payload = {"email": "guest@example.com", "role": "viewer"}
+    guest = client.post(f"/projects/{pid}/members", json=payload, headers=owner).json()
+
+    # The second request checks before the first one has committed
+    is_member = crud.is_project_member
+
+    def not_yet(db, project_id, user_id):
+        return None if user_id == guest["id"] else is_member(db, project_id, user_id)
+
+    monkeypatch.setattr(crud, "is_project_member", not_yet)
+    r = client.post(f"/projects/{pid}/members", json=payload, headers=owner)
+    assert r.status_code == 400
+    assert r.json()["detail"] == "User already in project"
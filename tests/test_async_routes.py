@@ -0,0 +1,112 @@
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.api import async_routes, auth
+from app.db.base import Base
+from app.db.session import async_database_url, get_async_db, get_db
+from app.utils.pubsub import PostgresBroker, broker
+
+
+@pytest.fixture()
+def client(tmp_path):
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    SyncSession = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    async_engine = create_async_engine(async_database_url(url), poolclass=NullPool)
+    AsyncSessionLocal = sessionmaker(
+        async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
+
+    def override_get_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(auth.router)
+    for router in async_routes.routers:
+        app.include_router(router)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    return TestClient(app)
+
+
+def test_async_database_url_maps_drivers():
+    assert async_database_url("postgresql+psycopg2://u:p@h/db") == "postgresql+asyncpg://u:p@h/db"
+    assert async_database_url("sqlite:///x.db") == "sqlite+aiosqlite:///x.db"
+
+
+def test_board_flow_over_async_session(client):
+    client.post("/auth/register", json={"email": "hal@example.com", "password": "pw"})
+    token = client.post(
+        "/auth/login", data={"username": "hal@example.com", "password": "pw"}
+    ).json()["access_token"]
+    client.headers["Authorization"] = f"Bearer {token}"
+
+    pid = client.post("/projects/", json={"name": "Async"}).json()["id"]
+    assert [p["id"] for p in client.get("/projects/").json()] == [pid]
+
+    issue = client.post(f"/issues/projects/{pid}", json={"title": "a"}).json()
+    moved = client.patch(f"/issues/{issue['id']}/status", params={"status": "done"})
+    assert moved.json()["status"] == "done"
+
+    page = client.get(f"/issues/projects/{pid}", params={"status": "done"}).json()
+    assert [i["id"] for i in page["items"]] == [issue["id"]]
+
+    comment = client.post(f"/comments/issues/{issue['id']}", json={"content": "hi"}).json()
+    assert [c["id"] for c in client.get(f"/comments/issues/{issue['id']}").json()] == [comment["id"]]
+    detail = client.get(f"/issues/{issue['id']}").json()
+    assert [c["author"]["email"] for c in detail["comments"]] == ["hal@example.com"]
+    reply = client.post(
+        f"/comments/issues/{issue['id']}", json={"content": "re", "parent_id": comment["id"]}
+    ).json()
+    (thread,) = client.get(f"/comments/issues/{issue['id']}/tree").json()["items"]
+    assert thread["id"] == comment["id"]
+    assert [r["id"] for r in thread["replies"]] == [reply["id"]]
+    assert client.delete(f"/comments/{reply['id']}").json() == {"ok": True}
+    assert client.delete(f"/comments/{comment['id']}").json() == {"ok": True}
+
+    members = client.get(f"/projects/{pid}/members").json()
+    assert [m["email"] for m in members] == ["hal@example.com"]
+
+    board = client.get(f"/projects/{pid}/board").json()
+    assert [(c["status"], c["count"]) for c in board["columns"]] == [
+        ("todo", 0), ("in_progress", 0), ("done", 1)
+    ]
+
+
+def test_writes_do_not_wait_for_a_stalled_postgres_broker(client, monkeypatch):
+    stalled = PostgresBroker("postgresql://x")
+    gate = threading.Event()
+    stalled._connect = lambda: gate.wait(10)
+    monkeypatch.setattr(broker, "publish", stalled.publish)
+
+    client.post("/auth/register", json={"email": "ivy@example.com", "password": "pw"})
+    token = client.post(
+        "/auth/login", data={"username": "ivy@example.com", "password": "pw"}
+    ).json()["access_token"]
+    client.headers["Authorization"] = f"Bearer {token}"
+    try:
+        started = time.monotonic()
+        pid = client.post("/projects/", json={"name": "Async"}).json()["id"]
+        issue = client.post(f"/issues/projects/{pid}", json={"title": "a"}).json()
+        client.patch(f"/issues/{issue['id']}/status", params={"status": "done"})
+        assert time.monotonic() - started < 5
+        assert stalled._outbox.qsize() >= 2
+    finally:
+        gate.set()
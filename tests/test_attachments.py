@@ -0,0 +1,359 @@
+import hashlib
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import models
+from app.main import app
+from app.utils import storage
+from app.utils.outbox import StorageDeletionWorker
+
+from helpers import auth_headers
+
+
+@pytest.fixture()
+def client(session_factory, local_storage):
+    return TestClient(app)
+
+
+def _issue(client, headers):
+    pid = client.post("/projects/", json={"name": "P"}, headers=headers).json()["id"]
+    return client.post(f"/issues/projects/{pid}", json={"title": "t"}, headers=headers).json()["id"]
+
+
+def test_presigned_upload_then_complete(client):
+    owner = auth_headers(client, "owner@example.com")
+    issue_id = _issue(client, owner)
+    data = b"direct upload"
+
+    ticket = client.post(
+        f"/attachments/issues/{issue_id}/upload-url",
+        json={"filename": "notes.txt", "content_type": "text/plain"},
+        headers=owner,
+    ).json()
+    assert ticket["key"].startswith("attachments/")
+
+    # Nothing uploaded yet
+    r = client.post("/attachments/complete", json={"token": ticket["token"]}, headers=owner)
+    assert r.status_code == 400
+
+    r = client.request(ticket["method"], ticket["upload_url"], content=data, headers=ticket["headers"])
+    assert r.status_code == 200
+
+    r = client.post("/attachments/complete", json={"token": ticket["token"]}, headers=owner)
+    assert r.status_code == 200
+    attachment = r.json()
+    assert attachment["filename"] == "notes.txt"
+    assert attachment["size"] == len(data)
+    assert attachment["content_hash"] == hashlib.sha256(data).hexdigest()
+    assert client.get(attachment["url"]).content == data
+
+    # Completing twice is idempotent
+    again = client.post("/attachments/complete", json={"token": ticket["token"]}, headers=owner)
+    assert again.json()["id"] == attachment["id"]
+
+
+def test_upload_tokens_are_scoped(client):
+    owner = auth_headers(client, "owner@example.com")
+    other = auth_headers(client, "other@example.com")
+    issue_id = _issue(client, owner)
+
+    ticket = client.post(
+        f"/attachments/issues/{issue_id}/upload-url",
+        json={"filename": "a.txt"},
+        headers=owner,
+    ).json()
+
+    r = client.post("/attachments/complete", json={"token": ticket["token"]}, headers=other)
+    assert r.status_code == 403
+    r = client.post("/attachments/complete", json={"token": "garbage"}, headers=owner)
+    assert r.status_code == 400
+    # Upload tokens are not access tokens
+    r = client.get("/users/", headers={"Authorization": f"Bearer {ticket['token']}"})
+    assert r.status_code == 401
+    # The upload URL only accepts PUT for its own key
+    assert client.get(ticket["upload_url"]).status_code == 404
+    tampered = ticket["upload_url"].replace(ticket["key"], ticket["key"] + "x")
+    assert client.put(tampered, content=b"x").status_code == 404
+
+
+def test_register_ignores_client_url_and_checks_object(client):
+    owner = auth_headers(client, "owner@example.com")
+    issue_id = _issue(client, owner)
+    payload = {
+        "issue_id": issue_id,
+        "filename": "x.bin",
+        "key": "attachments/missing",
+        "url": "https://evil.example.com/x.bin",
+    }
+
+    assert client.post("/attachments/register", json=payload, headers=owner).status_code == 400
+
+    storage.get_storage().put("attachments/present", io.BytesIO(b"abc"))
+    payload["key"] = "attachments/present"
+    r = client.post("/attachments/register", json=payload, headers=owner)
+    assert r.status_code == 200
+    assert r.json()["size"] == 3
+    assert "evil.example.com" not in r.json()["url"]
+
+
+def _stored_files(tmp_path):
+    return [p for p in tmp_path.rglob("*") if p.is_file()]
+
+
+def test_duplicate_uploads_share_one_blob(client, session_factory, tmp_path):
+    worker = StorageDeletionWorker(session_factory)
+    owner = auth_headers(client, "owner@example.com")
+    first, second = _issue(client, owner), _issue(client, owner)
+    data = b"same screenshot"
+
+    a = client.post(
+        f"/attachments/issues/{first}", files={"file": ("a.png", data)}, headers=owner
+    ).json()
+    b = client.post(
+        f"/attachments/issues/{second}", files={"file": ("b.png", data)}, headers=owner
+    ).json()
+
+    assert a["content_hash"] == b["content_hash"] == hashlib.sha256(data).hexdigest()
+    assert a["url"] == b["url"]
+    assert len(_stored_files(tmp_path)) == 1
+
+    # A direct upload of the same bytes is folded into the existing blob
+    ticket = client.post(
+        f"/attachments/issues/{second}/upload-url", json={"filename": "c.png"}, headers=owner
+    ).json()
+    client.put(ticket["upload_url"], content=data)
+    c = client.post("/attachments/complete", json={"token": ticket["token"]}, headers=owner).json()
+    assert c["url"] == a["url"]
+    worker.run_once()
+    assert len(_stored_files(tmp_path)) == 1
+
+    assert client.delete(f"/attachments/{a['id']}", headers=owner).status_code == 200
+    assert client.delete(f"/attachments/{c['id']}", headers=owner).status_code == 200
+    worker.run_once()
+    assert client.get(b["url"]).content == data
+
+    assert client.delete(f"/attachments/{b['id']}", headers=owner).status_code == 200
+    assert len(_stored_files(tmp_path)) == 1
+    worker.run_once()
+    assert _stored_files(tmp_path) == []
+
+
+def test_replayed_completion_of_deduplicated_upload(client, session_factory):
+    owner = auth_headers(client, "owner@example.com")
+    issue_id = _issue(client, owner)
+    data = b"already stored"
+    first = client.post(
+        f"/attachments/issues/{issue_id}", files={"file": ("a.txt", data)}, headers=owner
+    ).json()
+
+    ticket = client.post(
+        f"/attachments/issues/{issue_id}/upload-url", json={"filename": "b.txt"}, headers=owner
+    ).json()
+    client.put(ticket["upload_url"], content=data)
+    completed = [
+        client.post("/attachments/complete", json={"token": ticket["token"]}, headers=owner).json()
+        for _ in range(3)
+    ]
+    # The discarded upload is gone, but replays still find the row
+    StorageDeletionWorker(session_factory).run_once()
+    completed.append(
+        client.post("/attachments/complete", json={"token": ticket["token"]}, headers=owner).json()
+    )
+    payload = {"issue_id": issue_id, "filename": "b.txt", "key": ticket["key"]}
+    completed.append(client.post("/attachments/register", json=payload, headers=owner).json())
+
+    assert {c["id"] for c in completed} == {completed[0]["id"]}
+    assert completed[0]["id"] != first["id"]
+    assert len(client.get(f"/attachments/issues/{issue_id}", headers=owner).json()) == 2
+
+    db = session_factory()
+    assert db.query(models.StorageBlob).one().ref_count == 2
+    db.close()
+
+
+def test_upload_is_written_after_the_blob_is_committed(
+    client, session_factory, tmp_path, monkeypatch
+):
+    owner = auth_headers(client, "owner@example.com")
+    issue_id = _issue(client, owner)
+    backend = storage.get_storage()
+    put = backend.put
+    blobs_during_put = []
+
+    def recording_put(*args, **kwargs):
+        db = session_factory()
+        blobs_during_put.append(db.query(models.StorageBlob).count())
+        db.close()
+        return put(*args, **kwargs)
+
+    monkeypatch.setattr(backend, "put", recording_put)
+    r = client.post(
+        f"/attachments/issues/{issue_id}", files={"file": ("a.txt", b"a")}, headers=owner
+    )
+    assert r.status_code == 200
+    assert blobs_during_put == [1]
+
+    def failing_put(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(backend, "put", failing_put)
+    r = client.post(
+        f"/attachments/issues/{issue_id}", files={"file": ("b.txt", b"b")}, headers=owner
+    )
+    assert r.status_code == 500
+    db = session_factory()
+    assert db.query(models.StorageBlob).count() == 1
+    assert db.query(models.Attachment).count() == 1
+    failed_key = storage.blob_key(hashlib.sha256(b"b").hexdigest())
+    assert [d.key for d in db.query(models.StorageDeletion)] == [failed_key]
+    db.close()
+
+
+def test_reupload_survives_a_pending_deletion(client, session_factory, tmp_path, monkeypatch):
+    worker = StorageDeletionWorker(session_factory)
+    owner = auth_headers(client, "owner@example.com")
+    issue_id = _issue(client, owner)
+    data = b"deleted then uploaded again"
+    first = client.post(
+        f"/attachments/issues/{issue_id}", files={"file": ("a.txt", data)}, headers=owner
+    ).json()
+    assert client.delete(f"/attachments/{first['id']}", headers=owner).status_code == 200
+
+    # The worker runs while the second copy is being stored
+    backend = storage.get_storage()
+    put = backend.put
+
+    def put_then_drain(*args, **kwargs):
+        put(*args, **kwargs)
+        worker.run_once()
+
+    monkeypatch.setattr(backend, "put", put_then_drain)
+    second = client.post(
+        f"/attachments/issues/{issue_id}", files={"file": ("b.txt", data)}, headers=owner
+    ).json()
+    worker.run_once()
+    assert client.get(second["url"]).content == data
+
+
+def _legacy_attachment(session_factory, issue_id, key, data):
+    """
+    An attachment stored before deduplication: no blob row, own key.
+    """
+    storage.get_storage().put(key, io.BytesIO(data))
+    db = session_factory()
+    row = models.Attachment(issue_id=issue_id, filename="old.txt", s3_key=key, url=key)
+    db.add(row)
+    db.commit()
+    attachment_id = row.id
+    db.close()
+    return attachment_id
+
+
+def test_registering_a_legacy_key_keeps_it_alive(client, session_factory):
+    worker = StorageDeletionWorker(session_factory)
+    owner = auth_headers(client, "owner@example.com")
+    first, second = _issue(client, owner), _issue(client, owner)
+    legacy = _legacy_attachment(session_factory, first, "attachments/legacy", b"legacy")
+
+    payload = {"issue_id": second, "filename": "copy.txt", "key": "attachments/legacy"}
+    copy = client.post("/attachments/register", json=payload, headers=owner).json()
+    assert client.delete(f"/attachments/{legacy}", headers=owner).status_code == 200
+    worker.run_once()
+    assert client.get(copy["url"]).content == b"legacy"
+
+    assert client.delete(f"/attachments/{copy['id']}", headers=owner).status_code == 200
+    worker.run_once()
+    with pytest.raises(FileNotFoundError):
+        storage.get_storage().get("attachments/legacy")
+
+
+def test_deduplicating_a_legacy_key_does_not_delete_it(client, session_factory):
+    owner = auth_headers(client, "owner@example.com")
+    issue_id = _issue(client, owner)
+    data = b"stored twice"
+    client.post(
+        f"/attachments/issues/{issue_id}", files={"file": ("a.txt", data)}, headers=owner
+    )
+    _legacy_attachment(session_factory, issue_id, "attachments/legacy", data)
+
+    payload = {"issue_id": _issue(client, owner), "filename": "b.txt", "key": "attachments/legacy"}
+    assert client.post("/attachments/register", json=payload, headers=owner).status_code == 200
+    StorageDeletionWorker(session_factory).run_once()
+    assert storage.get_storage().get("attachments/legacy") == data
+
+
+def test_cascade_deletes_queue_storage_objects(client, session_factory, tmp_path):
+    owner = auth_headers(client, "owner@example.com")
+    pid = client.post("/projects/", json={"name": "P"}, headers=owner).json()["id"]
+    issue_id = client.post(f"/issues/projects/{pid}", json={"title": "t"}, headers=owner).json()["id"]
+    for name in ("a.txt", "b.txt"):
+        client.post(
+            f"/attachments/issues/{issue_id}",
+            files={"file": (name, name.encode())},
+            headers=owner,
+        )
+    assert len(_stored_files(tmp_path)) == 2
+
+    assert client.delete(f"/projects/{pid}", headers=owner).status_code == 200
+
+    db = session_factory()
+    assert db.query(models.StorageBlob).count() == 0
+    assert db.query(models.StorageDeletion).count() == 2
+    db.close()
+
+    assert StorageDeletionWorker(session_factory).run_once() == 2
+    assert _stored_files(tmp_path) == []
+
+
+def test_failed_deletions_back_off(session_factory, monkeypatch):
+    db = session_factory()
+    db.add(models.StorageDeletion(key="attachments/x", attempts=0))
+    db.commit()
+
+    def fail(keys):
+        raise ConnectionError("storage down")
+
+    monkeypatch.setattr(storage.get_storage(), "delete_many", fail)
+    worker = StorageDeletionWorker(session_factory, interval=10, max_backoff=15)
+    assert worker.run_once() == 1
+    # Not due again until the backoff has elapsed
+    assert worker.run_once() == 0
+
+    row = db.query(models.StorageDeletion).one()
+    db.refresh(row)
+    assert row.attempts == 1
+    assert "storage down" in row.last_error
+    assert [worker.backoff(n) for n in (1, 2, 3)] == [10, 15, 15]
+    db.close()
+
+
+def test_image_uploads_get_thumbnails(client, session_factory, tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    owner = auth_headers(client, "owner@example.com")
+    issue_id = _issue(client, owner)
+
+    buf = io.BytesIO()
+    Image.new("RGB", (2000, 1000), "red").save(buf, "PNG")
+    client.post(
+        f"/attachments/issues/{issue_id}",
+        files={"file": ("shot.png", buf.getvalue(), "image/png")},
+        headers=owner,
+    )
+    client.post(
+        f"/attachments/issues/{issue_id}",
+        files={"file": ("notes.txt", b"plain text")},
+        headers=owner,
+    )
+
+    image, text = client.get(f"/attachments/issues/{issue_id}", headers=owner).json()
+    assert (image["mime_type"], image["width"], image["height"]) == ("image/png", 2000, 1000)
+    thumb = Image.open(io.BytesIO(client.get(image["thumbnail_url"]).content))
+    assert max(thumb.size) == 320
+    assert text["mime_type"] == "text/plain"
+    assert text["thumbnail_url"] is None
+
+    client.delete(f"/attachments/{image['id']}", headers=owner)
+    StorageDeletionWorker(session_factory).run_once()
+    assert len(_stored_files(tmp_path)) == 1
@@ -0,0 +1,35 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+
+from helpers import capture_statements
+
+
+@pytest.fixture(autouse=True)
+def stateless_auth(monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_MODE", "stateless")
+
+
+def _user_queries(engine, fn):
+    response, statements = capture_statements(engine, fn)
+    return response, [s for s in statements if "FROM users" in s]
+
+
+def test_cached_principal_skips_user_query_until_revoked(engine):
+    client = TestClient(app)
+    client.post("/auth/register", json={"email": "erin@example.com", "password": "pw"})
+    token = client.post(
+        "/auth/login", data={"username": "erin@example.com", "password": "pw"}
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    r, queries = _user_queries(engine, lambda: client.get("/projects/", headers=headers))
+    assert r.status_code == 200 and len(queries) == 1
+
+    r, queries = _user_queries(engine, lambda: client.get("/projects/", headers=headers))
+    assert r.status_code == 200 and queries == []
+
+    assert client.post("/auth/logout-all", headers=headers).status_code == 200
+    assert client.get("/projects/", headers=headers).status_code == 401
@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.main import app
+
+from helpers import capture_statements
+
+
+def test_board_groups_counts_and_limits_columns(engine):
+    client = TestClient(app)
+    client.post("/auth/register", json={"email": "kim@example.com", "password": "pw"})
+    token = client.post(
+        "/auth/login", data={"username": "kim@example.com", "password": "pw"}
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    pid = client.post("/projects/", json={"name": "P"}, headers=headers).json()["id"]
+
+    db = sessionmaker(bind=engine)()
+    start = datetime(2024, 1, 1)
+    statuses = ["todo"] * 5 + ["in_progress"] * 2
+    db.add_all(
+        models.Issue(
+            project_id=pid,
+            title=f"issue {n}",
+            description="long text " * 100,
+            status=models.IssueStatus(status),
+            created_at=start + timedelta(minutes=n),
+        )
+        for n, status in enumerate(statuses)
+    )
+    db.commit()
+    db.close()
+
+    r, statements = capture_statements(
+        engine,
+        lambda: client.get(f"/projects/{pid}/board", params={"per_column": 3}, headers=headers),
+    )
+
+    assert r.status_code == 200
+    # current user, membership, board
+    assert len(statements) == 3
+
+    todo, in_progress, done = r.json()["columns"]
+    assert (todo["status"], todo["count"]) == ("todo", 5)
+    assert [i["title"] for i in todo["issues"]] == ["issue 0", "issue 1", "issue 2"]
+    assert "description" not in todo["issues"][0]
+    assert (in_progress["count"], len(in_progress["issues"])) == (2, 2)
+    assert (done["count"], done["issues"]) == (0, [])
+
+    full = client.get(f"/projects/{pid}/board", headers=headers).json()
+    assert len(full["columns"][0]["issues"]) == 5
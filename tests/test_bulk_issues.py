@@ -0,0 +1,113 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+from helpers import auth_headers, capture_statements
+
+
+def test_bulk_create_reports_each_item(engine, published):
+    client = TestClient(app)
+    owner = auth_headers(client, "owner@example.com")
+    pid = client.post("/projects/", json={"name": "P"}, headers=owner).json()["id"]
+    items = [{"title": f"issue {n}", "priority": n} for n in range(20)]
+    items[3]["assignee_id"] = 999
+
+    r, statements = capture_statements(
+        engine,
+        lambda: client.post(f"/issues/projects/{pid}/bulk", json={"items": items}, headers=owner),
+    )
+    assert r.status_code == 200
+    results = r.json()["results"]
+    assert [res["index"] for res in results] == list(range(20))
+    assert results[3] == {
+        "index": 3, "id": None, "ok": False, "error": "Assignee user not found", "issue": None
+    }
+    created = [res for res in results if res["ok"]]
+    assert len(created) == 19
+    assert created[0]["issue"]["title"] == "issue 0"
+    assert created[0]["issue"]["created_at"]
+    # current user, membership, assignees, version bump, reload; the
+    # INSERTs themselves are batched into one statement on PostgreSQL
+    others = [s for s in statements if not s.startswith("INSERT INTO issues")]
+    assert len(others) == 5
+
+    bulk = [e["data"] for e in published if e["data"]["type"] == "issues:created"]
+    assert len(bulk) == 1 and len(bulk[0]["issues"]) == 19
+
+    page = client.get(f"/issues/projects/{pid}", params={"limit": 200}, headers=owner).json()
+    assert len(page["items"]) == 19
+
+
+def test_bulk_status_and_assignee(engine, published):
+    client = TestClient(app)
+    owner = auth_headers(client, "owner@example.com")
+    dev = auth_headers(client, "dev@example.com")
+    pid = client.post("/projects/", json={"name": "P"}, headers=owner).json()["id"]
+    other = client.post("/projects/", json={"name": "Q"}, headers=owner).json()["id"]
+    ids = [
+        res["id"]
+        for res in client.post(
+            f"/issues/projects/{pid}/bulk",
+            json={"items": [{"title": "a"}, {"title": "b"}, {"title": "c"}]},
+            headers=owner,
+        ).json()["results"]
+    ]
+    foreign = client.post(f"/issues/projects/{other}", json={"title": "x"}, headers=owner).json()["id"]
+    etag = client.get(f"/issues/projects/{pid}", headers=owner).headers["etag"]
+    published.clear()
+
+    r = client.patch(
+        f"/issues/projects/{pid}/bulk/status",
+        json={"issue_ids": ids[:2] + [foreign], "status": "done"},
+        headers=owner,
+    )
+    assert [res["ok"] for res in r.json()["results"]] == [True, True, False]
+    assert r.json()["results"][2]["error"] == "Issue not found"
+
+    # ETag and cached list both see the bulk UPDATE
+    r = client.get(f"/issues/projects/{pid}", headers={**owner, "If-None-Match": etag})
+    assert r.status_code == 200
+    assert sorted(i["status"] for i in r.json()["items"]) == ["done", "done", "todo"]
+
+    dev_id = next(u["id"] for u in client.get("/users/", headers=owner).json() if u["email"] == "dev@example.com")
+    r = client.patch(
+        f"/issues/projects/{pid}/bulk/assignee",
+        json={"issue_ids": ids, "assignee_id": dev_id},
+        headers=owner,
+    )
+    assert all(res["ok"] for res in r.json()["results"])
+    items = client.get(f"/issues/projects/{pid}", headers=owner).json()["items"]
+    assert {i["assignee_id"] for i in items} == {dev_id}
+
+    r = client.patch(
+        f"/issues/projects/{pid}/bulk/assignee",
+        json={"issue_ids": ids, "assignee_id": 999},
+        headers=owner,
+    )
+    assert r.status_code == 400
+    assert client.patch(
+        f"/issues/projects/{pid}/bulk/status", json={"issue_ids": ids, "status": "todo"}, headers=dev
+    ).status_code == 403
+
+    moved, assigned = [e["data"] for e in published]
+    assert moved["type"] == "issues:moved" and moved["to"] == "done"
+    assert [m["issue_id"] for m in moved["moves"]] == ids[:2]
+    assert assigned == {
+        "type": "issues:assigned", "issue_ids": ids, "assignee_id": dev_id, "project_id": pid
+    }
+
+
+def test_large_bulk_events_degrade_to_stale_hint(engine, published):
+    client = TestClient(app)
+    owner = auth_headers(client, "owner@example.com")
+    pid = client.post("/projects/", json={"name": "P"}, headers=owner).json()["id"]
+
+    # 50 cards with long titles are over the NOTIFY limit; 3 are not
+    title = "Investigate intermittent timeout in the nightly reporting job run "
+    items = [{"title": f"{title}{n}"} for n in range(50)]
+    client.post(f"/issues/projects/{pid}/bulk", json={"items": items}, headers=owner)
+    client.post(f"/issues/projects/{pid}/bulk", json={"items": items[:3]}, headers=owner)
+
+    events = [e["data"] for e in published]
+    assert events[0] == {"type": "board:stale", "project_id": pid}
+    assert events[1]["type"] == "issues:created" and len(events[1]["issues"]) == 3
@@ -0,0 +1,132 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+from helpers import auth_headers, capture_statements
+
+
+def _comment(client, headers, issue_id, content, parent=None):
+    payload = {"content": content, "parent_id": parent}
+    return client.post(f"/comments/issues/{issue_id}", json=payload, headers=headers).json()["id"]
+
+
+@pytest.fixture()
+def thread(engine):
+    """
+    a            b   c
+    +- a1        +- b1
+    |  +- a1x
+    |     +- a1xy
+    +- a2
+    +- a3
+    """
+    client = TestClient(app)
+    headers = auth_headers(client, "owner@example.com")
+    pid = client.post("/projects/", json={"name": "P"}, headers=headers).json()["id"]
+    issue = client.post(f"/issues/projects/{pid}", json={"title": "t"}, headers=headers).json()
+    issue_id = issue["id"]
+    ids = {}
+    ids["a"] = _comment(client, headers, issue_id, "a")
+    ids["b"] = _comment(client, headers, issue_id, "b")
+    ids["a1"] = _comment(client, headers, issue_id, "a1", ids["a"])
+    ids["c"] = _comment(client, headers, issue_id, "c")
+    ids["a1x"] = _comment(client, headers, issue_id, "a1x", ids["a1"])
+    ids["a2"] = _comment(client, headers, issue_id, "a2", ids["a"])
+    ids["b1"] = _comment(client, headers, issue_id, "b1", ids["b"])
+    ids["a1xy"] = _comment(client, headers, issue_id, "a1xy", ids["a1x"])
+    ids["a3"] = _comment(client, headers, issue_id, "a3", ids["a"])
+    client.headers.update(headers)
+    return client, issue_id, ids
+
+
+def _shape(nodes):
+    return [(n["content"], n["reply_count"], _shape(n["replies"])) for n in nodes]
+
+
+def test_tree_nests_pages_and_limits_depth(thread):
+    client, issue_id, ids = thread
+
+    r = client.get(
+        f"/comments/issues/{issue_id}/tree",
+        params={"limit": 2, "max_depth": 1, "replies": 2},
+    )
+    assert r.status_code == 200
+    page = r.json()
+    assert _shape(page["items"]) == [
+        ("a", 3, [("a1", 1, []), ("a2", 0, [])]),
+        ("b", 1, [("b1", 0, [])]),
+    ]
+    a = page["items"][0]
+    assert a["depth"] == 0 and a["replies"][0]["depth"] == 1
+    assert a["replies_cursor"] and a["replies"][1]["replies_cursor"] is None
+    # a1's reply is past max_depth; its cursor starts at the first reply
+    below = client.get(
+        f"/comments/{ids['a1']}/replies", params={"cursor": a["replies"][0]["replies_cursor"]}
+    ).json()
+    assert _shape(below["items"]) == [("a1x", 1, [("a1xy", 0, [])])]
+
+    rest = client.get(
+        f"/comments/issues/{issue_id}/tree", params={"cursor": page["next_cursor"]}
+    ).json()
+    assert _shape(rest["items"]) == [("c", 0, [])] and rest["next_cursor"] is None
+
+    deep = client.get(f"/comments/issues/{issue_id}/tree", params={"limit": 1}).json()
+    assert _shape(deep["items"][0]["replies"][:1]) == [
+        ("a1", 1, [("a1x", 1, [("a1xy", 0, [])])])
+    ]
+
+    etag = r.headers["etag"]
+    params = {"limit": 2, "max_depth": 1, "replies": 2}
+    tree = f"/comments/issues/{issue_id}/tree"
+    again = client.get(tree, params=params, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    # Another page or shape is another representation
+    for other in ({"cursor": page["next_cursor"]}, {"limit": 3}, {"max_depth": 2}, {"replies": 1}):
+        r = client.get(tree, params={**params, **other}, headers={"If-None-Match": etag})
+        assert r.status_code == 200
+    _comment(client, {}, issue_id, "d")
+    assert client.get(tree, params=params, headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_replies_expand_what_the_tree_left_out(thread):
+    client, issue_id, ids = thread
+    a = client.get(
+        f"/comments/issues/{issue_id}/tree", params={"replies": 2, "max_depth": 1}
+    ).json()["items"][0]
+
+    more = client.get(
+        f"/comments/{ids['a']}/replies", params={"cursor": a["replies_cursor"]}
+    ).json()
+    assert _shape(more["items"]) == [("a3", 0, [])]
+
+    hidden = client.get(
+        f"/comments/issues/{issue_id}/tree", params={"replies": 0}
+    ).json()["items"]
+    assert [n["replies"] for n in hidden] == [[], [], []]
+    assert [n["replies_cursor"] is not None for n in hidden] == [True, True, False]
+    first = client.get(
+        f"/comments/{ids['a']}/replies",
+        params={"cursor": hidden[0]["replies_cursor"], "replies": 0},
+    ).json()
+    assert [n["content"] for n in first["items"]] == ["a1", "a2", "a3"]
+
+    a1x = client.get(f"/comments/{ids['a1']}/replies", params={"max_depth": 0}).json()
+    assert _shape(a1x["items"]) == [("a1x", 1, [])]
+
+    assert client.get(f"/comments/{ids['a']}/replies", params={"cursor": "x"}).status_code == 400
+    other = client.post("/issues/projects/1", json={"title": "u"}).json()["id"]
+    r = client.post(f"/comments/issues/{other}", json={"content": "x", "parent_id": ids["a"]})
+    assert r.status_code == 400
+
+
+def test_tree_is_one_statement_regardless_of_size(engine, thread):
+    client, issue_id, ids = thread
+    url = f"/comments/issues/{issue_id}/tree"
+    _, before = capture_statements(engine, lambda: client.get(url))
+    for n in range(10):
+        _comment(client, {}, issue_id, f"a1x{n}", ids["a1x"])
+        _comment(client, {}, issue_id, f"top{n}")
+    _, after = capture_statements(engine, lambda: client.get(url))
+    assert len(after) == len(before)
+    assert sum("comment_tree" in s for s in after) == 1
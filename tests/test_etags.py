@@ -0,0 +1,82 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+
+from helpers import auth_headers, capture_statements
+
+
+@pytest.fixture()
+def engine(engine, local_storage):
+    return engine
+
+
+def _conditional(client, path, headers):
+    first = client.get(path, headers=headers)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+    again = client.get(path, headers={**headers, "If-None-Match": etag})
+    return etag, again
+
+
+@pytest.mark.parametrize("cache_enabled", [True, False])
+def test_issue_list_etag_follows_project_changes(engine, monkeypatch, cache_enabled):
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", cache_enabled)
+    client = TestClient(app)
+    owner = auth_headers(client, "owner@example.com")
+    pid = client.post("/projects/", json={"name": "P"}, headers=owner).json()["id"]
+    issue_id = client.post(f"/issues/projects/{pid}", json={"title": "t"}, headers=owner).json()["id"]
+    path = f"/issues/projects/{pid}"
+
+    etag, again = _conditional(client, path, owner)
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+    # Other filters and pages are other representations
+    for params in ({"status": "todo"}, {"limit": 1}, {"sort": "priority"}):
+        r = client.get(path, params=params, headers={**owner, "If-None-Match": etag})
+        assert r.status_code == 200
+
+    client.patch(f"/issues/{issue_id}/status", params={"status": "done"}, headers=owner)
+    r = client.get(path, headers={**owner, "If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
+    assert r.json()["items"][0]["status"] == "done"
+
+
+def test_comment_and_attachment_lists_are_conditional(engine):
+    client = TestClient(app)
+    owner = auth_headers(client, "owner@example.com")
+    pid = client.post("/projects/", json={"name": "P"}, headers=owner).json()["id"]
+    issue_id = client.post(f"/issues/projects/{pid}", json={"title": "t"}, headers=owner).json()["id"]
+    comments = f"/comments/issues/{issue_id}"
+    attachments = f"/attachments/issues/{issue_id}"
+
+    comments_etag, again = _conditional(client, comments, owner)
+    assert again.status_code == 304
+    attachments_etag, again = _conditional(client, attachments, owner)
+    assert again.status_code == 304
+
+    r, statements = capture_statements(
+        engine,
+        lambda: client.get(comments, headers={**owner, "If-None-Match": f'"x", {comments_etag}'}),
+    )
+    assert r.status_code == 304
+    # current user, issue + membership; the list itself is not queried
+    assert len(statements) == 2
+
+    client.post(comments, json={"content": "hi"}, headers=owner)
+    r = client.get(comments, headers={**owner, "If-None-Match": comments_etag})
+    assert r.status_code == 200 and len(r.json()) == 1
+
+    client.post(attachments, files={"file": ("a.txt", b"a")}, headers=owner)
+    r = client.get(attachments, headers={**owner, "If-None-Match": attachments_etag})
+    assert r.status_code == 200 and len(r.json()) == 1
+
+    # Comments and attachments do not touch the project's issue list
+    etag, again = _conditional(client, f"/issues/projects/{pid}", owner)
+    client.post(comments, json={"content": "again"}, headers=owner)
+    r = client.get(f"/issues/projects/{pid}", headers={**owner, "If-None-Match": etag})
+    assert r.status_code == 304
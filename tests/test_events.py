@@ -0,0 +1,67 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+from helpers import auth_headers
+
+
+@pytest.fixture()
+def client(engine):
+    return TestClient(app)
+
+
+def test_mutations_publish_board_deltas(client, published):
+    headers = auth_headers(client, "carol@example.com")
+    pid = client.post("/projects/", json={"name": "Board"}, headers=headers).json()["id"]
+
+    issue = client.post(
+        f"/issues/projects/{pid}", json={"title": "Ship it"}, headers=headers
+    ).json()
+    client.patch(
+        f"/issues/{issue['id']}/status", params={"status": "done"}, headers=headers
+    )
+    comment = client.post(
+        f"/comments/issues/{issue['id']}", json={"content": "done!"}, headers=headers
+    ).json()
+
+    events = [p["data"] for p in published]
+    assert [e["type"] for e in events] == [
+        "issue:created",
+        "issue:moved",
+        "comment:added",
+    ]
+    assert all(e["project_id"] == pid for e in events)
+    assert events[0]["issue"]["title"] == "Ship it"
+    assert events[1] == {
+        "type": "issue:moved",
+        "issue_id": issue["id"],
+        "from": "todo",
+        "to": "done",
+        "project_id": pid,
+    }
+    assert events[2]["comment"]["id"] == comment["id"]
+
+
+def test_oversized_events_degrade_instead_of_vanishing(client, published):
+    headers = auth_headers(client, "carol@example.com")
+    pid = client.post("/projects/", json={"name": "Board"}, headers=headers).json()["id"]
+    log = "Traceback (most recent call last):\n" * 400
+
+    issue = client.post(
+        f"/issues/projects/{pid}", json={"title": "Crash", "description": log}, headers=headers
+    ).json()
+    comment = client.post(
+        f"/comments/issues/{issue['id']}", json={"content": log}, headers=headers
+    ).json()
+
+    events = [p["data"] for p in published]
+    assert events == [
+        {"type": "board:stale", "project_id": pid},
+        {
+            "type": "comment:added",
+            "issue_id": issue["id"],
+            "comment_id": comment["id"],
+            "project_id": pid,
+        },
+    ]
@@ -0,0 +1,141 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app import cli, models
+from app.core.config import settings
+from app.main import app
+from app.utils import importer
+
+from helpers import auth_headers
+
+
+CSV = """title,description,type,priority,status,assignee_email
+Login fails,"Steps:
+1. log in",bug,1,in_progress,Dev@Example.com
+Add dark mode,,feature,,done,
+,missing title,task,3,todo,
+Bad priority,,task,high,todo,
+Unknown person,,task,2,todo,nobody@example.com
+"""
+
+
+def test_csv_import_reports_rows_and_invalidates(session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "IMPORT_BATCH_SIZE", 2)
+    client = TestClient(app)
+    owner = auth_headers(client, "owner@example.com")
+    auth_headers(client, "dev@example.com")
+    pid = client.post("/projects/", json={"name": "P"}, headers=owner).json()["id"]
+    etag = client.get(f"/issues/projects/{pid}", headers=owner).headers["etag"]
+
+    r = client.post(
+        f"/projects/{pid}/import",
+        files={"file": ("dump.csv", CSV.encode())},
+        headers=owner,
+    )
+    assert r.status_code == 200
+    report = r.json()
+    assert (report["processed"], report["imported"], report["failed"]) == (5, 2, 3)
+    assert [e["row"] for e in report["errors"]] == [3, 4, 5]
+    assert report["errors"][1]["error"].startswith("priority:")
+    assert "nobody@example.com" in report["errors"][2]["error"]
+
+    r = client.get(f"/issues/projects/{pid}", headers={**owner, "If-None-Match": etag})
+    assert r.status_code == 200
+    login, dark = r.json()["items"]
+    assert login["description"] == "Steps:\n1. log in"
+    assert (login["type"], login["priority"], login["status"]) == ("bug", 1, "in_progress")
+    assert login["assignee_id"] is not None
+    assert (dark["description"], dark["priority"], dark["status"]) == (None, 3, "done")
+
+
+def test_export_round_trips_through_import(session_factory):
+    client = TestClient(app)
+    owner = auth_headers(client, "owner@example.com")
+    source = client.post("/projects/", json={"name": "A"}, headers=owner).json()["id"]
+    target = client.post("/projects/", json={"name": "B"}, headers=owner).json()["id"]
+    for title in ("one", "two"):
+        issue = client.post(f"/issues/projects/{source}", json={"title": title}, headers=owner).json()
+        client.post(f"/comments/issues/{issue['id']}", json={"content": "c"}, headers=owner)
+
+    dump = client.get(
+        f"/projects/{source}/export", params={"include": "comments"}, headers=owner
+    ).content
+    report = client.post(
+        f"/projects/{target}/import",
+        params={"format": "ndjson"},
+        files={"file": ("export", dump)},
+        headers=owner,
+    ).json()
+
+    # Comment records are skipped, not counted as failures
+    assert (report["processed"], report["imported"], report["failed"]) == (2, 2, 0)
+    items = client.get(f"/issues/projects/{target}", headers=owner).json()["items"]
+    assert [i["title"] for i in items] == ["one", "two"]
+
+    r = client.post(
+        f"/projects/{target}/import", files={"file": ("dump.xml", b"<x/>")}, headers=owner
+    )
+    assert r.status_code == 400
+
+
+JIRA = {
+    "expand": "names,schema",
+    "total": 3,
+    "issues": [
+        {
+            "key": "OLD-1",
+            "fields": {
+                "summary": "Crash on save",
+                "description": {
+                    "type": "doc",
+                    "content": [{"type": "paragraph", "content": [{"type": "text", "text": "Boom"}]}],
+                },
+                "issuetype": {"name": "Bug"},
+                "priority": {"name": "Highest"},
+                "status": {"name": "Closed", "statusCategory": {"key": "done"}},
+                "assignee": {"emailAddress": "owner@example.com"},
+            },
+        },
+        {
+            "key": "OLD-2",
+            "fields": {
+                "summary": "Write docs",
+                "issuetype": {"name": "Story"},
+                "status": {"statusCategory": {"key": "indeterminate"}},
+            },
+        },
+        {"key": "OLD-3", "fields": {}},
+    ],
+}
+
+
+def test_cli_imports_jira_json(session_factory, monkeypatch, tmp_path, capsys):
+    monkeypatch.setattr(cli, "SessionLocal", session_factory)
+    monkeypatch.setattr(importer, "READ_CHUNK_SIZE", 16)
+    db = session_factory()
+    db.add(models.User(email="owner@example.com", hashed_password="x"))
+    db.add(models.Project(name="P"))
+    db.commit()
+    pid = db.query(models.Project.id).scalar()
+    db.close()
+
+    path = tmp_path / "jira.json"
+    path.write_text(json.dumps(JIRA, indent=2))
+
+    assert cli.main(["import-issues", str(pid), str(path)]) == 0
+    out = capsys.readouterr()
+    report = json.loads(out.out)
+    assert (report["imported"], report["failed"]) == (2, 1)
+    assert "3 rows processed" in out.err
+
+    db = session_factory()
+    crash, docs = db.query(models.Issue).order_by(models.Issue.id).all()
+    assert (crash.type, crash.priority, crash.status) == (
+        models.IssueTypeEnum.bug, 1, models.IssueStatus.done
+    )
+    assert crash.description == "Boom\n" and crash.assignee_id is not None
+    assert (docs.type, docs.status) == (models.IssueTypeEnum.feature, models.IssueStatus.in_progress)
+    db.close()
+
+    assert cli.main(["import-issues", "999", str(path)]) == 1
@@ -0,0 +1,64 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.main import app
+
+from helpers import auth_headers, capture_statements
+
+
+def _issue(client, engine, headers, comments):
+    pid = client.post("/projects/", json={"name": "P"}, headers=headers).json()["id"]
+    issue = client.post(
+        f"/issues/projects/{pid}", json={"title": "t", "assignee_id": 1}, headers=headers
+    ).json()
+    db = sessionmaker(bind=engine)()
+    for n in range(comments):
+        author = models.User(email=f"author{n}.{issue['id']}@example.com", hashed_password="x")
+        db.add(author)
+        db.flush()
+        db.add(models.Comment(issue_id=issue["id"], author_id=author.id, content=f"c{n}"))
+    for n in range(comments):
+        db.add(
+            models.Attachment(
+                issue_id=issue["id"], filename=f"{n}.txt", s3_key="k", url="http://x", size=1
+            )
+        )
+    db.commit()
+    db.close()
+    return issue["id"]
+
+
+def test_issue_detail_embeds_related_rows(engine):
+    client = TestClient(app)
+    owner = auth_headers(client, "owner@example.com")
+    issue_id = _issue(client, engine, owner, comments=2)
+
+    r = client.get(f"/issues/{issue_id}", headers=owner)
+    assert r.status_code == 200
+    detail = r.json()
+    assert detail["title"] == "t"
+    assert detail["assignee"]["email"] == "owner@example.com"
+    assert [c["content"] for c in detail["comments"]] == ["c0", "c1"]
+    assert [c["author"]["email"] for c in detail["comments"]] == [
+        f"author0.{issue_id}@example.com", f"author1.{issue_id}@example.com"
+    ]
+    assert [a["filename"] for a in detail["attachments"]] == ["0.txt", "1.txt"]
+
+    outsider = auth_headers(client, "outsider@example.com")
+    assert client.get(f"/issues/{issue_id}", headers=outsider).status_code == 403
+    assert client.get("/issues/999", headers=owner).status_code == 404
+
+
+def test_issue_detail_statement_count_is_constant(engine):
+    client = TestClient(app)
+    owner = auth_headers(client, "owner@example.com")
+    small = _issue(client, engine, owner, comments=1)
+    large = _issue(client, engine, owner, comments=20)
+
+    _, few = capture_statements(engine, lambda: client.get(f"/issues/{small}", headers=owner))
+    r, many = capture_statements(engine, lambda: client.get(f"/issues/{large}", headers=owner))
+    assert len(r.json()["comments"]) == 20
+    assert len(many) == len(few)
+    # Auth, then issue + assignee, comments + authors, attachments
+    assert len([s for s in many if "comments" in s or "attachments" in s]) == 2
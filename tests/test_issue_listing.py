@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import IntegrityError
+
+from app import models
+from app.main import app
+
+
+@pytest.fixture()
+def board(session_factory):
+    client = TestClient(app)
+    client.post("/auth/register", json={"email": "dan@example.com", "password": "pw"})
+    token = client.post(
+        "/auth/login", data={"username": "dan@example.com", "password": "pw"}
+    ).json()["access_token"]
+    client.headers["Authorization"] = f"Bearer {token}"
+    pid = client.post("/projects/", json={"name": "Big"}).json()["id"]
+
+    db = session_factory()
+    start = datetime(2026, 1, 1)
+    for i in range(7):
+        db.add(
+            models.Issue(
+                title=f"issue {i}",
+                project_id=pid,
+                priority=i % 3,
+                status=models.IssueStatus.done if i % 2 else models.IssueStatus.todo,
+                # two issues per timestamp to exercise the id tiebreaker
+                created_at=start + timedelta(minutes=i // 2),
+            )
+        )
+    db.commit()
+    db.close()
+    return client, pid
+
+
+def _collect(client, url, **params):
+    titles, cursor = [], None
+    while True:
+        page = client.get(url, params={**params, "cursor": cursor} if cursor else params)
+        assert page.status_code == 200
+        body = page.json()
+        titles += [i["title"] for i in body["items"]]
+        cursor = body["next_cursor"]
+        if not cursor:
+            return titles
+
+
+def test_keyset_pages_cover_every_issue_once(board):
+    client, pid = board
+    titles = _collect(client, f"/issues/projects/{pid}", limit=2)
+    assert titles == [f"issue {i}" for i in range(7)]
+
+    newest_first = _collect(client, f"/issues/projects/{pid}", limit=3, sort="-created_at")
+    assert newest_first == [f"issue {i}" for i in reversed(range(7))]
+
+
+def test_filters_and_priority_sort(board):
+    client, pid = board
+    done = _collect(client, f"/issues/projects/{pid}", status="done", limit=2)
+    assert done == ["issue 1", "issue 3", "issue 5"]
+
+    by_priority = _collect(
+        client, f"/issues/projects/{pid}", sort="priority", min_priority=1, limit=2
+    )
+    assert by_priority == ["issue 1", "issue 4", "issue 2", "issue 5"]
+
+
+def test_rejects_garbage_cursor(board):
+    client, pid = board
+    r = client.get(f"/issues/projects/{pid}", params={"cursor": "not-a-cursor"})
+    assert r.status_code == 400
+
+
+def test_cursors_only_resume_their_own_sort(board):
+    client, pid = board
+    url = f"/issues/projects/{pid}"
+    cursor = client.get(url, params={"sort": "priority", "limit": 2}).json()["next_cursor"]
+    for sort in ("created_at", "-priority"):
+        r = client.get(url, params={"sort": sort, "cursor": cursor})
+        assert r.status_code == 400
+    assert client.get(url, params={"sort": "priority", "cursor": cursor}).status_code == 200
+
+
+def test_priority_is_never_null(session_factory):
+    # A NULL would fall outside the (priority, id) keyset
+    db = session_factory()
+    db.add(models.Project(id=1, name="P"))
+    db.commit()
+    with pytest.raises(IntegrityError):
+        db.execute(
+            models.Issue.__table__.insert().values(title="t", project_id=1, priority=None)
+        )
+    db.close()
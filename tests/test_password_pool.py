@@ -0,0 +1,62 @@
+import asyncio
+import threading
+
+from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+
+from app import models
+from app.core import security
+from app.main import app
+
+
+def test_login_rehashes_outdated_cost(session_factory):
+    weak = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("pw")
+    db = session_factory()
+    db.add(models.User(email="fay@example.com", hashed_password=weak))
+    db.commit()
+
+    client = TestClient(app)
+    r = client.post("/auth/login", data={"username": "fay@example.com", "password": "pw"})
+    assert r.status_code == 200
+
+    db.expire_all()
+    stored = db.query(models.User).filter_by(email="fay@example.com").one().hashed_password
+    assert stored != weak
+    assert not security.pwd_context.needs_update(stored)
+    assert security.verify_password("pw", stored)
+    db.close()
+
+
+def test_full_password_queue_fails_fast(session_factory, monkeypatch):
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()
+    monkeypatch.setattr(security, "_password_slots", slots)
+
+    client = TestClient(app)
+    r = client.post("/auth/register", json={"email": "gus@example.com", "password": "pw"})
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "1"
+
+
+def test_cancelled_request_keeps_its_slot_until_the_job_ends(monkeypatch):
+    slots = threading.BoundedSemaphore(1)
+    monkeypatch.setattr(security, "_password_slots", slots)
+    started, finish = threading.Event(), threading.Event()
+
+    def slow_hash():
+        started.set()
+        finish.wait(5)
+        return "hash"
+
+    async def scenario():
+        task = asyncio.ensure_future(security._run_password_task(slow_hash))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        task.cancel()  # the client went away; bcrypt is still running
+        await asyncio.sleep(0)
+        assert not slots.acquire(blocking=False)
+
+        finish.set()
+        await asyncio.sleep(0.1)
+        assert slots.acquire(blocking=False)
+
+    asyncio.run(scenario())
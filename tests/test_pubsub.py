@@ -0,0 +1,113 @@
+import asyncio
+import threading
+
+from starlette.datastructures import State
+
+from app.api.websockets import ConnectionManager
+from app.utils.pubsub import InProcessBroker, PostgresBroker, _postgres_dsn
+
+
+class FakeSocket:
+    def __init__(self):
+        self.state = State()
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, data):
+        self.sent.append(data)
+
+
+def test_in_process_broker_delivers_to_subscribers():
+    broker = InProcessBroker()
+    received = []
+    broker.subscribe("board", received.append)
+    broker.subscribe("other", lambda payload: received.append("wrong topic"))
+
+    broker.publish("board", {"project_id": 1})
+
+    assert received == [{"project_id": 1}]
+
+
+def test_publish_from_worker_thread_reaches_room():
+    async def scenario():
+        broker = InProcessBroker()
+        await broker.start()
+        manager = ConnectionManager(broker)
+        ws = FakeSocket()
+        await manager.connect(ws, user=None, project_id=3)
+
+        thread = threading.Thread(
+            target=manager.publish, args=(3, {"type": "issue:created"})
+        )
+        thread.start()
+        thread.join()
+        await asyncio.sleep(0.01)
+
+        assert ws.sent == [{"type": "issue:created"}]
+        await broker.stop()
+
+    asyncio.run(scenario())
+
+
+def test_postgres_dsn_drops_sqlalchemy_driver():
+    dsn = _postgres_dsn("postgresql+psycopg2://u:p@db:5432/tracksys")
+    assert dsn == "postgresql://u:p@db:5432/tracksys"
+
+
+class FakeConnection:
+    closed = False
+
+    def __init__(self, sent, fail=False):
+        self.sent = sent
+        self.fail = fail
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params):
+        if self.fail:
+            raise RuntimeError("connection lost")
+        self.sent.append(params[1])
+
+    def close(self):
+        self.closed = True
+
+
+def test_postgres_publish_never_blocks_or_raises(caplog):
+    broker = PostgresBroker("postgresql://x", max_queue=10)
+    sent, connects, gate = [], [], threading.Event()
+
+    def connect():
+        gate.wait(5)
+        connects.append(1)
+        # The first two attempts fail: the first event is logged and lost
+        return FakeConnection(sent, fail=len(connects) <= 2)
+
+    broker._connect = connect
+    broker.publish("board", {"n": 1})
+    broker.publish("board", {"n": 2})
+    assert sent == []  # still stuck connecting, but publish returned
+
+    gate.set()
+    asyncio.run(broker.stop())
+    assert sent == ['{"topic": "board", "payload": {"n": 2}}']
+    assert "Failed to publish" in caplog.text
+
+
+def test_postgres_publish_drops_when_queue_is_full(caplog):
+    broker = PostgresBroker("postgresql://x", max_queue=1)
+    gate = threading.Event()
+    broker._connect = lambda: gate.wait(5) and FakeConnection([])
+    for n in range(5):
+        broker.publish("board", {"n": n})
+    assert "queue is full" in caplog.text
+    gate.set()
+    asyncio.run(broker.stop())
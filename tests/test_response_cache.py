@@ -0,0 +1,131 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.core.config import settings
+from app.api.deps import membership_cache
+from app.main import app
+from app.utils.pubsub import broker
+from app.utils.response_cache import CACHE_TOPIC, project_scope, response_cache
+
+from helpers import auth_headers, capture_statements
+
+
+@pytest.fixture(autouse=True)
+def stateless_auth(monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_MODE", "stateless")
+
+
+@pytest.fixture()
+def cached_memberships(monkeypatch):
+    monkeypatch.setattr(settings, "MEMBERSHIP_CACHE_TTL_SECONDS", 2)
+    monkeypatch.setattr(membership_cache, "ttl", 2)
+
+
+def test_repeated_reads_skip_the_database_until_a_write(engine, cached_memberships):
+    client = TestClient(app)
+    owner = auth_headers(client, "owner@example.com")
+    pid = client.post("/projects/", json={"name": "P"}, headers=owner).json()["id"]
+    client.post(f"/issues/projects/{pid}", json={"title": "first"}, headers=owner)
+
+    for path in (f"/projects/{pid}/board", f"/issues/projects/{pid}", "/projects/", "/users/"):
+        first = client.get(path, headers=owner)
+        again, statements = capture_statements(engine, lambda: client.get(path, headers=owner))
+        assert again.status_code == 200
+        assert again.json() == first.json()
+        assert statements == []
+
+    client.post(f"/issues/projects/{pid}", json={"title": "second"}, headers=owner)
+    board, statements = capture_statements(
+        engine, lambda: client.get(f"/projects/{pid}/board", headers=owner)
+    )
+    assert board.json()["columns"][0]["count"] == 2
+    assert statements
+
+    # Filters and pages are cached separately
+    r = client.get(f"/issues/projects/{pid}", params={"limit": 1}, headers=owner).json()
+    assert len(r["items"]) == 1 and r["next_cursor"]
+
+    stats = client.get("/metrics/cache").json()["responses"]
+    assert stats["hits"] >= 4 and stats["misses"] > 0
+
+
+def test_membership_changes_invalidate(engine):
+    client = TestClient(app)
+    owner = auth_headers(client, "owner@example.com")
+    guest = auth_headers(client, "guest@example.com")
+    pid = client.post("/projects/", json={"name": "P"}, headers=owner).json()["id"]
+
+    assert client.get(f"/projects/{pid}/board", headers=guest).status_code == 403
+    assert client.get("/projects/", headers=guest).json() == []
+
+    client.post(
+        f"/projects/{pid}/members",
+        json={"email": "guest@example.com", "role": "viewer"},
+        headers=owner,
+    )
+    assert client.get(f"/projects/{pid}/board", headers=guest).status_code == 200
+    assert [p["id"] for p in client.get("/projects/", headers=guest).json()] == [pid]
+    members = client.get(f"/projects/{pid}/members", headers=owner).json()
+    assert {m["email"] for m in members} == {"owner@example.com", "guest@example.com"}
+
+    guest_id = next(m["id"] for m in members if m["email"] == "guest@example.com")
+    client.delete(f"/projects/{pid}/members/{guest_id}", headers=owner)
+    assert client.get(f"/projects/{pid}/board", headers=guest).status_code == 403
+    assert client.get("/projects/", headers=guest).json() == []
+
+
+def test_memberships_are_checked_every_request_by_default(engine):
+    client = TestClient(app)
+    owner = auth_headers(client, "owner@example.com")
+    guest = auth_headers(client, "guest@example.com")
+    pid = client.post("/projects/", json={"name": "P"}, headers=owner).json()["id"]
+    client.post(
+        f"/projects/{pid}/members",
+        json={"email": "guest@example.com", "role": "viewer"},
+        headers=owner,
+    )
+    assert client.get(f"/projects/{pid}/board", headers=guest).status_code == 200
+
+    # A removal by another worker: no local version bump reaches this one
+    with engine.begin() as conn:
+        conn.execute(
+            models.ProjectMember.__table__.delete().where(
+                models.ProjectMember.project_id == pid,
+                models.ProjectMember.role == models.RoleEnum.viewer,
+            )
+        )
+    assert client.get(f"/projects/{pid}/board", headers=guest).status_code == 403
+
+
+def test_direct_session_writes_and_broker_messages_bump_versions(engine):
+    key = response_cache.key("board", [project_scope(1)])
+
+    db = sessionmaker(bind=engine)()
+    db.add(models.Project(id=1, name="P"))
+    db.flush()
+    assert response_cache.key("board", [project_scope(1)]) == key
+    db.rollback()
+    assert response_cache.key("board", [project_scope(1)]) == key
+
+    db.add(models.Project(id=1, name="P"))
+    db.commit()
+    db.close()
+    committed = response_cache.key("board", [project_scope(1)])
+    assert committed != key
+
+    # Another worker's write
+    broker.publish(CACHE_TOPIC, {"scopes": [["project", 1]]})
+    assert response_cache.key("board", [project_scope(1)]) != committed
+
+
+def test_disabled_cache_is_bypassed(engine, monkeypatch):
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", False)
+    client = TestClient(app)
+    owner = auth_headers(client, "owner@example.com")
+
+    client.get("/users/", headers=owner)
+    r, statements = capture_statements(engine, lambda: client.get("/users/", headers=owner))
+    assert r.status_code == 200 and statements
+    assert response_cache.stats()["size"] == 0
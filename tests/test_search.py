@@ -0,0 +1,73 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from app import crud
+from app.main import app
+
+from helpers import auth_headers
+
+
+@pytest.fixture()
+def client(engine):
+    return TestClient(app)
+
+
+def test_search_ranks_issues_and_comments_within_membership(client):
+    owner = auth_headers(client, "owner@example.com")
+    outsider = auth_headers(client, "outsider@example.com")
+    pid = client.post("/projects/", json={"name": "P"}, headers=owner).json()["id"]
+
+    def issue(title, description=None):
+        return client.post(
+            f"/issues/projects/{pid}",
+            json={"title": title, "description": description},
+            headers=owner,
+        ).json()["id"]
+
+    in_title = issue("Login timeout on Safari")
+    in_body = issue("Flaky session", "users hit a login timeout after idle")
+    issue("Unrelated", "nothing to see")
+    client.post(
+        f"/comments/issues/{in_body}",
+        json={"content": "Same login TIMEOUT here"},
+        headers=owner,
+    )
+
+    r = client.get("/search/", params={"q": "login timeout"}, headers=owner)
+    assert r.status_code == 200
+    hits = [(h["kind"], h["issue_id"]) for h in r.json()["items"]]
+    assert hits[0] == ("issue", in_title)
+    assert sorted(hits[1:]) == [("comment", in_body), ("issue", in_body)]
+
+    assert client.get("/search/", params={"q": "login"}, headers=outsider).json()["items"] == []
+    other = client.get("/search/", params={"q": "login", "project_id": pid + 1}, headers=owner)
+    assert other.json()["items"] == []
+    # LIKE wildcards are matched literally
+    assert client.get("/search/", params={"q": "%"}, headers=owner).json()["items"] == []
+
+    seen, cursor = [], None
+    while True:
+        page = client.get(
+            "/search/", params={"q": "login", "limit": 1, "cursor": cursor}, headers=owner
+        ).json()
+        seen += [(h["kind"], h["id"]) for h in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert len(seen) == len(set(seen)) == 3
+
+    assert client.get("/search/", params={"q": "x", "cursor": "bad"}, headers=owner).status_code == 400
+
+
+def test_postgres_search_uses_tsvector_index():
+    sql = str(
+        crud.select_search_postgres("login timeout", user_id=1, limit=10).compile(
+            dialect=postgresql.dialect()
+        )
+    )
+    assert "issues.search_vector @@ websearch_to_tsquery" in sql
+    assert "comments.search_vector @@ websearch_to_tsquery" in sql
+    assert "ts_headline" in sql
+    # real ranks would not round-trip through the float cursor exactly
+    assert sql.count("CAST(ts_rank_cd(") == 2 and "AS FLOAT(53))" in sql
@@ -0,0 +1,120 @@
+import hashlib
+import io
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.utils import storage
+
+
+@pytest.fixture()
+def supabase(monkeypatch):
+    monkeypatch.setattr(settings, "SUPABASE_URL", "http://storage.test")
+    monkeypatch.setattr(settings, "SUPABASE_KEY", "key")
+    monkeypatch.setattr(settings, "SUPABASE_BUCKET", "bucket")
+    monkeypatch.setattr(storage, "TUS_CHUNK_SIZE", 4)
+
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if request.method == "POST":
+            return httpx.Response(201, headers={"location": "http://storage.test/u/1"})
+        return httpx.Response(204)
+
+    http = httpx.Client(transport=httpx.MockTransport(handler))
+    yield http, requests
+    http.close()
+
+
+def test_tus_upload_streams_bounded_parts(supabase):
+    http, requests = supabase
+    data = b"0123456789"
+    hasher = hashlib.sha256()
+
+    storage._tus_upload(http, "k", io.BytesIO(data), len(data), "text/plain", hasher, None)
+
+    create, *patches = requests
+    assert create.headers["upload-length"] == "10"
+    assert [len(r.content) for r in patches] == [4, 4, 2]
+    assert [r.headers["upload-offset"] for r in patches] == ["0", "4", "8"]
+    assert hasher.hexdigest() == hashlib.sha256(data).hexdigest()
+
+
+def test_tus_upload_aborts_past_size_cap(supabase):
+    http, requests = supabase
+
+    with pytest.raises(storage.UploadTooLarge):
+        storage._tus_upload(
+            http, "k", io.BytesIO(b"x" * 10), 10, "text/plain", hashlib.sha256(), 6
+        )
+
+    assert [r.method for r in requests] == ["POST", "PATCH", "DELETE"]
+
+
+def test_upload_rejects_oversized_file_before_sending(monkeypatch):
+    monkeypatch.setattr(storage, "_storage", storage.SupabaseStorage())
+    monkeypatch.setattr(httpx, "Client", None)
+
+    with pytest.raises(storage.UploadTooLarge):
+        storage.upload_fileobj_to_storage(io.BytesIO(b"x" * 10), "f.txt", max_bytes=5)
+
+
+@pytest.fixture()
+def local(tmp_path, monkeypatch):
+    backend = storage.LocalStorage(str(tmp_path))
+    monkeypatch.setattr(storage, "_storage", backend)
+    return backend
+
+
+def test_local_storage_round_trip(local):
+    data = b"hello" * 1000
+
+    stored = storage.upload_fileobj_to_storage(io.BytesIO(data), "a/b.txt")
+
+    assert stored.size == len(data)
+    assert stored.sha256 == hashlib.sha256(data).hexdigest()
+    assert local.get(stored.key) == data
+    assert b"".join(local.stream(stored.key, chunk_size=7)) == data
+    assert local.path(stored.key).startswith(local.root)
+
+    storage.delete_file_from_storage(stored.key)
+    storage.delete_file_from_storage(stored.key)
+    with pytest.raises(FileNotFoundError):
+        local.get(stored.key)
+
+
+def test_local_storage_leaves_nothing_behind_on_oversized_stream(local, tmp_path):
+    class Unseekable(io.BytesIO):
+        def seek(self, *args):
+            return 0
+
+        def tell(self):
+            return 0
+
+    with pytest.raises(storage.UploadTooLarge):
+        local.put("attachments/big", Unseekable(b"x" * 100), max_bytes=10)
+
+    assert [p for p in tmp_path.rglob("*") if p.is_file()] == []
+
+
+def test_local_storage_rejects_traversal(local):
+    with pytest.raises(ValueError):
+        local.path("attachments/../../etc/passwd")
+
+
+def test_local_files_require_valid_signature(local):
+    local.put("attachments/f.txt", io.BytesIO(b"data"))
+    client = TestClient(app)
+
+    r = client.get(local.presign("attachments/f.txt", expires_in=60))
+    assert r.status_code == 200
+    assert r.content == b"data"
+
+    assert client.get(local.url("attachments/f.txt")).status_code == 200
+    assert client.get("/attachments/files/attachments/f.txt?sig=bad").status_code == 404
+    expired = local.presign("attachments/f.txt", expires_in=-1)
+    assert client.get(expired).status_code == 404
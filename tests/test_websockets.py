@@ -0,0 +1,141 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.datastructures import State
+from starlette.websockets import WebSocketDisconnect
+
+from app.api import websockets
+from app.api.websockets import BoardConnection, ConnectionManager
+from app.main import app
+from app.utils.pubsub import InProcessBroker
+
+from helpers import auth_headers
+
+
+class FakeSocket:
+    def __init__(self, delay=0.0):
+        self.state = State()
+        self.sent = []
+        self.closed_with = None
+        self.delay = delay
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, data):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(data)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+def test_broadcast_only_reaches_project_room():
+    async def scenario():
+        manager = ConnectionManager(InProcessBroker())
+        a, b, other = FakeSocket(), FakeSocket(), FakeSocket()
+        await manager.connect(a, user=None, project_id=1)
+        await manager.connect(b, user=None, project_id=1)
+        await manager.connect(other, user=None, project_id=2)
+
+        manager.broadcast(1, {"type": "issue:moved", "id": 7})
+        await asyncio.sleep(0.01)
+
+        assert a.sent == [{"type": "issue:moved", "id": 7}]
+        assert b.sent == [{"type": "issue:moved", "id": 7}]
+        assert other.sent == []
+
+        manager.disconnect(a)
+        manager.disconnect(b)
+        assert manager.room_size(1) == 0
+        assert 1 not in manager.rooms
+
+    asyncio.run(scenario())
+
+
+def test_slow_consumer_does_not_block_room():
+    async def scenario():
+        manager = ConnectionManager(InProcessBroker())
+        fast, stalled = FakeSocket(), FakeSocket(delay=10)
+        await manager.connect(fast, user=None, project_id=1)
+        await manager.connect(stalled, user=None, project_id=1)
+
+        for i in range(5):
+            manager.broadcast(1, {"n": i})
+        await asyncio.sleep(0.01)
+
+        assert [m["n"] for m in fast.sent] == [0, 1, 2, 3, 4]
+        assert stalled.sent == []
+
+    asyncio.run(scenario())
+
+
+def test_queue_drops_oldest_and_coalesces():
+    async def scenario():
+        conn = BoardConnection(FakeSocket(), project_id=1, max_queue=2)
+        conn.enqueue({"n": 1})
+        conn.enqueue({"n": 2}, coalesce_key="issue:9")
+        conn.enqueue({"n": 3}, coalesce_key="issue:9")
+        assert conn.pending() == 2
+
+        conn.enqueue({"n": 4})
+        assert conn.dropped == 1
+        assert [entry[1]["n"] for entry in conn._queue] == [3, 4]
+
+    asyncio.run(scenario())
+
+
+def test_coalesced_moves_keep_the_first_origin():
+    async def scenario():
+        conn = BoardConnection(FakeSocket(), project_id=1)
+        move = {"type": "issue:moved", "issue_id": 9}
+        conn.enqueue({**move, "from": "todo", "to": "in_progress"}, "issue:9:status")
+        conn.enqueue({**move, "from": "in_progress", "to": "done"}, "issue:9:status")
+
+        (entry,) = conn._queue
+        assert (entry[1]["from"], entry[1]["to"]) == ("todo", "done")
+
+    asyncio.run(scenario())
+
+
+def test_disconnect_policy_evicts_full_queue():
+    async def scenario():
+        manager = ConnectionManager(InProcessBroker())
+        ws = FakeSocket()
+        conn = await manager.connect(ws, user=None, project_id=1)
+        conn.policy = "disconnect"
+        conn.max_queue = 1
+
+        manager.broadcast(1, {"n": 1})
+        manager.broadcast(1, {"n": 2})
+        await asyncio.sleep(0)
+
+        assert manager.room_size(1) == 0
+        assert ws.closed_with == 1013
+
+    asyncio.run(scenario())
+
+
+def test_board_socket_releases_its_session_before_listening(session_factory, monkeypatch):
+    sessions = []
+
+    def recording_session():
+        sessions.append(session_factory())
+        return sessions[-1]
+
+    monkeypatch.setattr(websockets, "SessionLocal", recording_session)
+    client = TestClient(app)
+    owner = auth_headers(client, "owner@example.com")
+    token = owner["Authorization"].split()[1]
+    pid = client.post("/projects/", json={"name": "P"}, headers=owner).json()["id"]
+
+    with client.websocket_connect(f"/ws/boards?token={token}&project_id={pid}") as ws:
+        client.post(f"/issues/projects/{pid}", json={"title": "t"}, headers=owner)
+        assert ws.receive_json()["type"] == "issue:created"
+        assert len(sessions) == 1 and not sessions[0].in_transaction()
+
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect(f"/ws/boards?token={token}&project_id=999") as ws:
+            ws.receive_json()